@@ -1,22 +1,17 @@
-amount = 0
+from tickets import DEFAULT_TARIFF
+
 tickets = int(input("Введите количество билетов:\n"))
-for age in range(tickets):
-    age = int(input("Введите возраст посетителя:\n"))
-    if age < 18:
-        amount += 0
-    elif age >= 18 and age <= 25:
-        amount += 990
-    elif age > 25:
-        amount += 1390
+ages = [int(input("Введите возраст посетителя:\n")) for _ in range(tickets)]
+# Цены возрастных групп и скидка на заказ берутся из тарифа задания (см. tickets.py)
+amount, discount = DEFAULT_TARIFF.order(ages)
 if amount == 0:
     print("Проходите, детки, на конференцию!")
 else:
     print("КОличество билетов:", tickets, "шт.")
 
-if tickets > 3:
-    discount = amount / 100 * 10
+if tickets >= DEFAULT_TARIFF.discount_from:
     print("Скидка составляет:", "%.2f" % discount, "руб.")
     print("К оплате, с учетом скидки:", "%.2f" % (amount -discount), "руб.")
-if tickets < 4:
+else:
     Nodiscount = amount
     print("К оплате:", "%.2f" % Nodiscount, "руб." )
\ No newline at end of file
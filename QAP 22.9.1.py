@@ -1,21 +1,57 @@
-array = list(map(int, input('Введите последовательность целых чисел в произвольном порядке через пробел:').split()))
+# Запуск без аргументов - ввод последовательности и числа с клавиатуры.
+# python "QAP 22.9.1.py" ФАЙЛ [ЧИСЛО ...] - последовательность из файла индекса (python sorted_index.py build ...)
+# или из текстового файла с числами через пробельные символы ('-' - стандартный ввод), числа для поиска из
+# аргументов; если они не указаны, число запрашивается с клавиатуры
 
-def sort_by_ascend(array):
-    for i in range(len(array)):
-        idx_min = i
-        for j in range(i, len(array)):
-            if array[j] < array[idx_min]:
-                idx_min = j
-        if i != idx_min:
-            array[i], array[idx_min] = array[idx_min], array[i]
-    return array
+import sys
 
-print(f'Последовательность отсортирована по возрастанию в следующем виде: {sort_by_ascend(array)}')
+from int_stream import read_array
+from searching import position, positions
+from sorted_index import SortedIndex, is_index
+from sorting import sort
+
+if len(sys.argv) > 1 and sys.argv[1] != '-' and is_index(sys.argv[1]):
+    # Индекс уже отсортирован и не читается в память целиком
+    array = SortedIndex(sys.argv[1])
+    if not len(array):
+        print(f'Индекс {sys.argv[1]} пуст: в нём нет чисел для поиска')
+        sys.exit(1)
+    print(f'Последовательность из индекса {sys.argv[1]}: {len(array)} чисел от {array.min} до {array.max}')
+    # Для поиска используются значения индекса (memoryview поверх файла)
+    values = array.values
+elif len(sys.argv) > 1:
+    # Числа читаются потоково в компактный массив int64 без промежуточного списка
+    array = sort(read_array(sys.argv[1]))
+    if not array:
+        source = 'Стандартный ввод' if sys.argv[1] == '-' else f'Файл {sys.argv[1]}'
+        print(f'{source} не содержит чисел')
+        sys.exit(1)
+    print(f'Прочитано и отсортировано чисел: {len(array)}, от {array[0]} до {array[-1]}')
+    values = array
+else:
+    array = list(map(int, input('Введите последовательность целых чисел в произвольном порядке через пробел:').split()))
+    if not array:
+        print('Последовательность пуста')
+        sys.exit(1)
+
+    # Алгоритм сортировки выбирается по длине последовательности и диапазону значений (см. sorting.py)
+    array = sort(array)
+
+    print(f'Последовательность отсортирована по возрастанию в следующем виде: {array}')
+    values = array
+
+if len(sys.argv) > 2:
+    # Все числа из аргументов ищутся одним пакетным запросом
+    numbers = list(map(int, sys.argv[2:]))
+    for element, index in zip(numbers, positions(values, numbers)):
+        print(f"Номер позиции элемента, который меньше числа {element}, а следующий за ним больше или равен ему: "
+              f"{index}")
+    sys.exit()
 
 while True:
     try:
         element = int(input("Введите любое положительное целое число из полученного списка: "))
-        if element < min(array) or element > max(array):
+        if element < array[0] or element > array[-1]:
             print("Указанное число не входит в диапазон списка!")
         if element <= 0:
             raise Exception
@@ -25,19 +61,10 @@ while True:
     except Exception:
         print("Нужно ввести положительное число!")
 
-def binary_search(array, element, left, right):
-    if left > right:
-        return False
-    middle = (right + left) // 2
-    if array[middle] == element:
-        return middle
-    elif element < array[middle]:
-        return binary_search(array, element, left, middle - 1)
-    else:
-        return binary_search(array, element, middle + 1, right)
-
-if not binary_search(array, element, 0, len(array) - 1):
-    print(f"Указанный элемент {element} отсутствует в последовательности.")
+# Номер позиции элемента, который меньше введённого числа, а следующий за ним больше или равен ему
+index = position(values, element)
+
+if index < 0:
+    print(f"В последовательности нет элементов меньше числа {element}.")
 else:
-    print(f"Индекс числа {element} в отсортированной последовательности равен: \
-{binary_search(array, element, 0, len(array) - 1)}")
\ No newline at end of file
+    print(f"Номер позиции элемента, который меньше числа {element}, а следующий за ним больше или равен ему: {index}")
\ No newline at end of file
@@ -1,9 +1,13 @@
 from api import PetFriends
-from settings import valid_email, valid_password, invalid_email, invalid_password
+from auth_cache import AuthKeyCache
+from metrics import session_metrics
+from response_cache import session_response_cache
+from settings import valid_email, valid_password, invalid_email, invalid_password, auth_cache_path, base_url
 import os
 
 
-pf = PetFriends()
+pf = PetFriends(base_url, auth_cache=AuthKeyCache(path=auth_cache_path), response_cache=session_response_cache,
+                metrics=session_metrics)
 
 
 def test_get_api_key_for_valid_user(email=valid_email, password=valid_password):
@@ -26,35 +30,37 @@ def test_get_api_key_for_invalid_user_successful(email=invalid_email, password=i
 
 
 def test_get_all_pets_list(filter=''):
-    """Проверяем позитивный тест-кейс, что запрос всех питомцев возвращает не пустой список. Для этого сначала получаем api ключ и
-    сохраняем в переменную auth_key. Далее используя этого ключ запрашиваем список всех питомцев и проверяем,
-    что список не пустой. Доступное значение параметра filter - 'my_pets' либо ''"""
+    """Проверяем позитивный тест-кейс, что запрос всех питомцев возвращает не пустой список. Для этого сначала
+    получаем api ключ и сохраняем в переменную auth_key. Далее используя этого ключ запрашиваем список всех питомцев
+    и проверяем, что список не пустой. Доступное значение параметра filter - 'my_pets' либо ''. Список читается
+    потоково, поэтому для проверки достаточно получить первого питомца, не загружая весь ответ."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
-    status, result = pf.get_list_of_pets(auth_key, filter)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
+    first_pet = next(pf.iter_pets(auth_key, filter, fields=('id',)), None)
 
-    assert status == 200
-    assert len(result['pets']) > 0
+    assert first_pet is not None
 
 
 # блок POST-запросов:
 
 
-def test_add_new_pet_with_valid_data(name='Бука', animal_type='невская маскарадная',
-                                     age='6', pet_photo='images/cat1.jpg'):
+def test_add_new_pet_with_valid_data(pet_factory, name='Бука', animal_type='невская маскарадная',
+                                     age='6', pet_photo='Images/cat1.jpg'):
     """Проверяем, что можно создать карточку питомца с полными (включая фотографию), корректными данными."""
 
     pet_photo = os.path.join(os.path.dirname(__file__), pet_photo)
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
 
     status, result = pf.add_new_pet(auth_key, name, animal_type, age, pet_photo)
+    if status == 200:
+        pet_factory.track(result['id'])
 
     assert status == 200
     assert result['name'] == name
 
 
-def test_add_new_pet_with_invalid_data(name='', animal_type='', age='', pet_photo='images/cat1.jpg'):
+def test_add_new_pet_with_invalid_data(pet_factory, name='', animal_type='', age='', pet_photo='Images/cat1.jpg'):
     """Проверяем негативный тест-кейс в случае, когда запрос на добавление питомца содержит некорректные
     параметры (обязательные для заполнения пустые значения). Если система отказывает в запросе - негативный тест-кейс
     пройден. Если система все-таки добавляет карточку питомца с невалидными данными - вызываем исключение и создаем
@@ -62,10 +68,14 @@ def test_add_new_pet_with_invalid_data(name='', animal_type='', age='', pet_phot
 
     pet_photo = os.path.join(os.path.dirname(__file__), pet_photo)
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
 
     status, result = pf.add_new_pet(auth_key, name, animal_type, age, pet_photo)
 
+    # Питомец, которого сервер ошибочно создал, удаляется в конце сессии вместе с остальными
+    if status == 200 and isinstance(result, dict) and 'id' in result:
+        pet_factory.track(result['id'])
+
     if status == 200 and 'name' in result:
         raise Exception('Обнаружена ошибка - возможность создания карточки питомца с пустыми полями.')
     else:
@@ -75,12 +85,12 @@ def test_add_new_pet_with_invalid_data(name='', animal_type='', age='', pet_phot
         # GET-запрос:
 
 
-def test_get_my_pets_list(filter='my_pets'):
+def test_get_my_pets_list(pet_factory, filter='my_pets'):
     """ Проверяем работу запроса при выбранном параметре фильтра - 'my_pets', который выводит список питомцев,
     добавленных пользователем. Для этого сначала получаем API ключ и сохраняем в переменную auth_key. Далее,
     используя этот ключ, запрашиваем список своих питомцев и проверяем, что список не пустой."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
     status, result = pf.get_list_of_pets(auth_key, filter)
 
     assert status == 200
@@ -89,68 +99,72 @@ def test_get_my_pets_list(filter='my_pets'):
     # блок POST-запросов:
 
 
-def test_update_pet_foto_jpg(pet_photo='images/cat1.jpg'):
+def test_update_pet_foto_jpg(pet, pet_photo='Images/cat1.jpg'):
     """Проверяем, что можно добавить фото питомца в ранее созданную карточку в валидном формате
      c расширением xxx.jpg."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
-    _, my_pets = pf.get_list_of_pets(auth_key, 'my_pets')
+    auth_key = pf.get_auth_key(valid_email, valid_password)
     pet_photo = os.path.join(os.path.dirname(__file__), pet_photo)
 
-    if len(my_pets['pets']) > 0:
-        status, result = pf.update_pet_foto(auth_key, my_pets['pets'][0]['id'], pet_photo)
+    status, result = pf.update_pet_foto(auth_key, pet.id, pet_photo)
 
-        _, my_pets = pf.get_list_of_pets(auth_key, 'my_pets')
+    _, my_pets = pf.get_pets(auth_key, 'my_pets')
+    updated = next(item for item in my_pets if item.id == pet.id)
 
-        assert status == 200
-        assert result['pet_photo'] == my_pets['pets'][0]['pet_photo']
-    else:
-        raise Exception('Добавленные вами питомцы в списке отсутствуют.')
+    assert status == 200
+    assert result['pet_photo'] == updated.pet_photo
+    assert updated.pet_photo.mime == 'image/jpeg'
 
 
-def test_update_pet_foto_invalid_bmp(pet_photo='images/cat2.bmp'):
+def test_update_pet_foto_invalid_bmp(pet, pet_photo='Images/cat2.bmp'):
     """Проверяем негативный тест-кейс в случае, когда фото питомца передаётся в невалидном формате графического
     файла c расширением xxx.bmp (в соответствии с требованиями API-документации PetFriends API v1). Если
     система отказывает в запросе - негативный тест-кейс пройден. Если система добавляет в карточку фото
     питомца с некорректным форматом файла - вызываем исключение и создаем баг-репорт."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
-    _, my_pets = pf.get_list_of_pets(auth_key, 'my_pets')
+    auth_key = pf.get_auth_key(valid_email, valid_password)
     pet_photo = os.path.join(os.path.dirname(__file__), pet_photo)
-    status, result = pf.update_pet_foto(auth_key, my_pets['pets'][0]['id'], pet_photo)
-    _, my_pets = pf.get_list_of_pets(auth_key, 'my_pets')
+    status, result = pf.update_pet_foto(auth_key, pet.id, pet_photo)
+    _, my_pets = pf.get_pets(auth_key, 'my_pets')
+    updated = next(item for item in my_pets if item.id == pet.id)
 
-    if status == 200 and result['pet_photo'] == my_pets['pets'][0]['pet_photo']:
+    if status == 200 and result['pet_photo'] == updated.pet_photo:
         raise Exception('Error')
     else:
         assert status != 200
-        assert result['pet_photo'] != my_pets['pets'][0]['pet_photo']
+        assert result['pet_photo'] != updated.pet_photo
 
         # блок POST-запросов:
 
 
-def test_add_new_pet_simple(name='Боб', animal_type='немецкая овчарка', age=2.2):
+def test_add_new_pet_simple(pet_factory, name='Боб', animal_type='немецкая овчарка', age=2.2):
     """Проверяем возможность добавления базовых данных о питомце без фото."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
 
     status, result = pf.create_pet_simple(auth_key, name, animal_type, age)
+    if status == 200:
+        pet_factory.track(result['id'])
 
     assert status == 200
     assert result['name'] == name
 
 
-def test_add_new_pet_simple_invalid_age_data_type(name='Боб', animal_type='немецкая овчкарка', age='три'):
+def test_add_new_pet_simple_invalid_age_data_type(pet_factory, name='Боб', animal_type='немецкая овчкарка', age='три'):
     """Проверяем негативный тест-кейс в случае, когда передаваемое значение переменной age в запросе имеет строковый
     (str) тип данных, тогда как в соответствии с требованиями API-документации PetFriends API v1 значение параметра age
     должно принимать тип данных числа(number). Если система отказывает в запросе - негативный тест-кейс
     пройден. Если система все-таки создает простую карточку питомца с неверным типом переданных данных - вызываем
     исключение и создаем баг-репорт."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
 
     status, result = pf.create_pet_simple(auth_key, name, animal_type, age)
 
+    # Питомец, которого сервер ошибочно создал, удаляется в конце сессии вместе с остальными
+    if status == 200 and isinstance(result, dict) and 'id' in result:
+        pet_factory.track(result['id'])
+
     if status == 200 and result['name'] == name:
         raise Exception('Error')
     else:
@@ -158,17 +172,21 @@ def test_add_new_pet_simple_invalid_age_data_type(name='Боб', animal_type='н
         assert result['name'] != name
 
 
-def test_add_new_pet_simple_invalid_breed_data_type(name='Боб', animal_type=543, age=30):
+def test_add_new_pet_simple_invalid_breed_data_type(pet_factory, name='Боб', animal_type=543, age=30):
     """Проверяем негативный тест-кейс в случае, когда передаваемое значение переменной animal_type в запросе имеет
     числовой (number) тип данных, тогда как в соответствии с требованиями API-документации PetFriends API v1 значение
     параметра animal_type должно принимать строчный тип данных (string). Если система отказывает в запросе -
     негативный тест-кейс пройден. Если система все-таки создает простую карточку питомца с неверным типом
     переданных данных - вызываем исключение и создаем баг-репорт."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
 
     status, result = pf.create_pet_simple(auth_key, name, animal_type, age)
 
+    # Питомец, которого сервер ошибочно создал, удаляется в конце сессии вместе с остальными
+    if status == 200 and isinstance(result, dict) and 'id' in result:
+        pet_factory.track(result['id'])
+
     if status == 200 and result['name'] == name:
         raise Exception('Error')
     else:
@@ -176,16 +194,20 @@ def test_add_new_pet_simple_invalid_breed_data_type(name='Боб', animal_type=5
         assert result['name'] != name
 
 
-def test_add_new_pet_simple_invalid_age_value(name='Боб', animal_type=123, age='999999999999999999999999'):
+def test_add_new_pet_simple_invalid_age_value(pet_factory, name='Боб', animal_type=123, age='999999999999999999999999'):
     """Проверяем негативный тест-кейс в случае, когда переменная age в запросе передает системе любое
      значение из цифр, что будет не соответствовать реальной продолжительности жизни животного.
     Если система отказывает в запросе - негативный тест-кейс пройден. Если система все-таки создает простую
     карточку питомца с неверным типом переданных данных - вызываем исключение и создаем баг-репорт."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
 
     status, result = pf.create_pet_simple(auth_key, name, animal_type, age)
 
+    # Питомец, которого сервер ошибочно создал, удаляется в конце сессии вместе с остальными
+    if status == 200 and isinstance(result, dict) and 'id' in result:
+        pet_factory.track(result['id'])
+
     if status == 200 and result['name'] == name:
         raise Exception('Error')
     else:
@@ -195,51 +217,38 @@ def test_add_new_pet_simple_invalid_age_value(name='Боб', animal_type=123, ag
         # DELETE-запрос:
 
 
-def test_successful_delete_self_pet():
+def test_successful_delete_self_pet(pet):
     """Проверяем позитивный тест-кейс на возможность удаления питомца из списка"""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
-    _, my_pets = pf.get_list_of_pets(auth_key, "my_pets")
-
-    if len(my_pets['pets']) == 0:
-        pf.add_new_pet(auth_key, "Лео", "брауни", "10", "images/cat1.jpg")
-        _, my_pets = pf.get_list_of_pets(auth_key, "my_pets")
+    auth_key = pf.get_auth_key(valid_email, valid_password)
+    status, _ = pf.delete_pet(auth_key, pet.id)
 
-    pet_id = my_pets['pets'][0]['id']
-    status, _ = pf.delete_pet(auth_key, pet_id)
-
-    _, my_pets = pf.get_list_of_pets(auth_key, "my_pets")
+    _, my_pets = pf.get_pets(auth_key, "my_pets")
 
     assert status == 200
-    assert pet_id not in my_pets.values()
+    assert pet.id not in [item.id for item in my_pets]
 
     # блок PUT-запросов:
 
 
-def test_successful_update_self_pet_info(name='Superstar', animal_type='туреций ван', age=12.2):
+def test_successful_update_self_pet_info(pet, name='Superstar', animal_type='туреций ван', age=12.2):
     """Проверяем возможность обновления информации о питомце"""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
-    _, my_pets = pf.get_list_of_pets(auth_key, "my_pets")
-
-    if len(my_pets['pets']) > 0:
-        status, result = pf.update_pet_info(auth_key, my_pets['pets'][0]['id'], name, animal_type, age)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
+    status, result = pf.update_pet_info(auth_key, pet.id, name, animal_type, age)
 
-        assert status == 200
-        assert result['name'] == name
-    else:
-        raise Exception('There is no pets')
+    assert status == 200
+    assert result['name'] == name
 
 
-def test_update_self_pet_invalid_age_value(name='Рыжий', animal_type='полосатый', age=9999999999999999999):
+def test_update_self_pet_invalid_age_value(pet, name='Рыжий', animal_type='полосатый', age=9999999999999999999):
     """Проверяем негативный тест-кейс в случае, когда переменная age в запросе передает системе любое
     значение из цифр, что будет не соответствовать реальной продолжительности жизни любого животного на земле :).
     Если система отказывает в запросе - негативный тест-кейс пройден. Если система все-таки обновляет карточку
     питомца некорректными данными - вызываем исключение и создаем баг-репорт."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
-    _, my_pets = pf.get_list_of_pets(auth_key, "my_pets")
-    status, result = pf.update_pet_info(auth_key, my_pets['pets'][0]['id'], name, animal_type, age)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
+    status, result = pf.update_pet_info(auth_key, pet.id, name, animal_type, age)
 
     if status == 200 and result['name'] == name:
         raise Exception('Error')
@@ -248,16 +257,15 @@ def test_update_self_pet_invalid_age_value(name='Рыжий', animal_type='по
         assert result['name'] != name
 
 
-def test_update_self_pet_invalid_breed_data_type(name='Котенок', animal_type=657, age=3):
+def test_update_self_pet_invalid_breed_data_type(pet, name='Котенок', animal_type=657, age=3):
     """Проверяем негативный тест-кейс в случае, когда передаваемое значение переменной animal_type в запросе имеет
     числовой (number) тип данных, тогда как в соответствии с требованиями API-документации PetFriends API v1 значение
     параметра animal_type должно принимать строчный тип данных (string). Если система отказывает в запросе - негативный
      тест-кейс пройден. Если система обновляет карточку питомца некорректными данными - вызываем исключение
       и создаем баг-репорт."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
-    _, my_pets = pf.get_list_of_pets(auth_key, "my_pets")
-    status, result = pf.update_pet_info(auth_key, my_pets['pets'][0]['id'], name, animal_type, age)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
+    status, result = pf.update_pet_info(auth_key, pet.id, name, animal_type, age)
 
     if status == 200 and result['name'] == name:
         raise Exception('Error')
@@ -266,16 +274,15 @@ def test_update_self_pet_invalid_breed_data_type(name='Котенок', animal_t
         assert result['name'] != name
 
 
-def test_update_self_pet_invalid_age_data_type(name='Гарфилд', animal_type='толстик', age='три'):
+def test_update_self_pet_invalid_age_data_type(pet, name='Гарфилд', animal_type='толстик', age='три'):
     """Проверяем негативный тест-кейс в случае, когда передаваемое значение переменной age в запросе имеет строковый
     (str) тип данных, тогда как в соответствии с требованиями API-документации PetFriends API v1 значение параметра age
     должно принимать тип данных числа(number). Если система отказывает в запросе - негативный тест-кейс
     пройден. Если система создает простую карточку питомца с неверным типом переданных данных - вызываем
     исключение и создаем баг-репорт."""
 
-    _, auth_key = pf.get_api_key(valid_email, valid_password)
-    _, my_pets = pf.get_list_of_pets(auth_key, "my_pets")
-    status, result = pf.update_pet_info(auth_key, my_pets['pets'][0]['id'], name, animal_type, age)
+    auth_key = pf.get_auth_key(valid_email, valid_password)
+    status, result = pf.update_pet_info(auth_key, pet.id, name, animal_type, age)
 
     if status == 200 and result['name'] == name:
         raise Exception('Error')
@@ -1,27 +1,224 @@
 import json
+import random
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from auth_cache import AuthKeyCache
+from metrics import RequestMetrics, install_connect_timer, take_connect_time
+from models import Pet, loads
+from pet_stream import iter_json_array, project
+from photo import PhotoPipeline
+from response_cache import CachedResponse, ResponseCache
+
+
+# Коды ответа сервера, при которых запрос повторяется
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+# Методы, повтор которых не меняет результат. Остальные (POST создаёт питомца) повторяются, только если
+# соединение не удалось установить и запрос заведомо не был отправлен
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+def backoff_delay(attempt: int, factor: float, maximum: float) -> float:
+    """Возвращает паузу перед повторной попыткой номер attempt (начиная с 0): экспоненциальный рост
+    factor * 2 ** attempt, ограниченный сверху значением maximum, со случайным разбросом (full jitter)."""
+
+    return random.uniform(0, min(maximum, factor * 2 ** attempt))
+
+
+def _not_sent(error: requests.exceptions.ConnectionError) -> bool:
+    """Произошла ли ошибка на этапе подключения, до отправки запроса на сервер."""
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0] if error.args else None, 'reason', None)
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
 
 
 class PetFriends:
     """Библиотека методов для тестирования API платформы PetFriends."""
 
-    def __init__(self):
-        self.base_url = "https://petfriends.skillfactory.ru/"
+    def __init__(self, base_url: str = "https://petfriends.skillfactory.ru/", pool_connections: int = 10,
+                 pool_maxsize: int = 10, keep_alive: bool = True, timeout: tuple = (3.05, 30), retries: int = 3,
+                 backoff_factor: float = 0.5, backoff_max: float = 10.0, auth_cache: AuthKeyCache = None,
+                 photo_pipeline: PhotoPipeline = None, response_cache: ResponseCache = None,
+                 metrics: RequestMetrics = None):
+        """base_url - адрес сервера PetFriends (например, локального fake_server).
+        Все запросы клиента идут через общую сессию requests с пулом соединений: pool_connections -
+        количество пулов (по хостам), pool_maxsize - количество соединений в каждом пуле. При keep_alive=False
+        соединение закрывается после каждого запроса. timeout - пара (подключение, чтение) в секундах.
+        Запросы, завершившиеся обрывом соединения или ответом 5xx, повторяются до retries раз с
+        экспоненциальной паузой backoff_factor * 2 ** n (не более backoff_max) и случайным разбросом.
+        Запросы POST повторяются только при ошибке подключения, чтобы не создать питомца дважды.
+        auth_cache - кэш API ключей для get_auth_key; по умолчанию ключи кэшируются в памяти клиента.
+        photo_pipeline - подготовка фото к загрузке; по умолчанию файлы передаются без перекодирования.
+        response_cache - кэш ответов на GET-запросы списка питомцев; по умолчанию ответы не кэшируются.
+        metrics - сборщик длительностей, размеров и кодов ответов по методам API; по умолчанию не ведётся."""
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.auth_cache = auth_cache if auth_cache is not None else AuthKeyCache()
+        self.photo_pipeline = photo_pipeline if photo_pipeline is not None else PhotoPipeline()
+        self.response_cache = response_cache
+        self.metrics = metrics
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        if metrics is not None:
+            install_connect_timer(adapter)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def close(self):
+        """Закрывает все соединения пула."""
+
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, method: str, path: str, headers: dict = None, params: dict = None, data: dict = None,
+                 fields: dict = None, stream: bool = False, endpoint: str = None) -> requests.Response:
+        """Выполняет запрос через пул соединений с повторами при обрыве соединения и ответах 5xx (запрос POST -
+        только при ошибке подключения, см. IDEMPOTENT_METHODS).
+        Если передан fields, тело собирается как multipart/form-data заново для каждой попытки, а файлы
+        из fields перематываются в начало. Если сервер отклонил ключ из кэша ответом 403, ключ обновляется
+        и запрос выполняется ещё раз (если обновить ключ не удалось, возвращается исходный ответ 403).
+        При stream=True тело ответа не загружается заранее. Любой запрос, кроме GET, изменяет данные на сервере,
+        поэтому после него кэш ответов очищается. endpoint - имя метода API для метрик, если путь содержит ID
+        (например, 'api/pets/<id>')."""
+
+        if method != 'GET' and self.response_cache is not None:
+            self.response_cache.clear()
+        headers = dict(headers or {})
+        attempt = 0
+        key_refreshed = False
+        while True:
+            body = data
+            if fields is not None:
+                for value in fields.values():
+                    if isinstance(value, tuple):
+                        value[1].seek(0)
+                body = MultipartEncoder(fields=fields)
+                headers['Content-Type'] = body.content_type
+            try:
+                res = self._send(method, path, endpoint or path, headers, params, body, stream)
+            except requests.exceptions.ConnectionError as error:
+                if attempt >= self.retries or method not in IDEMPOTENT_METHODS and not _not_sent(error):
+                    raise
+            else:
+                if method != 'GET' and self.response_cache is not None:
+                    self.response_cache.clear()
+                if res.status_code == 403 and 'auth_key' in headers and not key_refreshed:
+                    key_refreshed = True
+                    try:
+                        new_key = self.auth_cache.refresh(headers['auth_key'], self.get_api_key)
+                    except Exception:
+                        # Ключ обновить не удалось - вызывающий получает исходный ответ 403
+                        new_key = None
+                    if new_key is not None:
+                        res.close()
+                        headers['auth_key'] = new_key
+                        continue
+                if (res.status_code not in RETRY_STATUSES or attempt >= self.retries
+                        or method not in IDEMPOTENT_METHODS):
+                    return res
+                res.close()
+            time.sleep(backoff_delay(attempt, self.backoff_factor, self.backoff_max))
+            attempt += 1
+
+    def _send(self, method: str, path: str, endpoint: str, headers: dict, params: dict, body,
+              stream: bool) -> requests.Response:
+        """Выполняет одну попытку запроса и, если ведутся метрики, записывает её длительность по этапам
+        (установка соединения, ожидание заголовков ответа, получение тела), размеры и код ответа."""
+
+        if self.metrics is None:
+            return self.session.request(method, self.base_url + path, headers=headers, params=params, data=body,
+                                        timeout=self.timeout, stream=stream)
+
+        take_connect_time()
+        start = time.perf_counter()
+        try:
+            res = self.session.request(method, self.base_url + path, headers=headers, params=params, data=body,
+                                       timeout=self.timeout, stream=stream)
+        except requests.exceptions.RequestException:
+            self.metrics.record(method, endpoint, 'error', {'total': time.perf_counter() - start,
+                                                            'connect': take_connect_time()})
+            raise
+        total = time.perf_counter() - start
+        connect = take_connect_time()
+        # res.elapsed - время до получения заголовков ответа; без stream тело уже прочитано внутри request
+        headers_time = res.elapsed.total_seconds()
+        timings = {'total': total, 'connect': connect, 'wait': max(headers_time - connect, 0.0)}
+        if stream:
+            response_bytes = int(res.headers.get('Content-Length') or 0)
+        else:
+            timings['transfer'] = max(total - headers_time, 0.0)
+            response_bytes = len(res.content)
+        request_bytes = int(res.request.headers.get('Content-Length') or 0)
+        self.metrics.record(method, endpoint, res.status_code, timings, request_bytes, response_bytes)
+        return res
+
+    @staticmethod
+    def _decode(res: requests.Response) -> tuple:
+        """Возвращает код состояния ответа и тело, разобранное из JSON (через orjson, если он установлен),
+        или текст ответа, если тело не является JSON."""
+
+        try:
+            return res.status_code, loads(res.content)
+        except json.decoder.JSONDecodeError:
+            return res.status_code, res.text
+
+    def _cached_get(self, path: str, headers: dict, params: dict) -> tuple:
+        """Выполняет GET-запрос через кэш ответов: свежий ответ берётся из кэша, устаревший перепроверяется
+        условным запросом с If-None-Match / If-Modified-Since. В кэш попадают только ответы 200."""
+
+        key = self.response_cache.key(path, params, headers.get('auth_key'))
+        entry = self.response_cache.get(key)
+        if entry is not None:
+            if self.response_cache.is_fresh(entry):
+                return entry.status, entry.result
+            headers = dict(headers)
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        res = self._request('GET', path, headers=headers, params=params)
+        if res.status_code == 304 and entry is not None:
+            self.response_cache.revalidated(entry)
+            return entry.status, entry.result
+
+        status, result = self._decode(res)
+        if status == 200:
+            self.response_cache.put(key, CachedResponse(status, result, res.headers.get('ETag'),
+                                                        res.headers.get('Last-Modified'), len(res.content)))
+        return status, result
 
     def get_api_key(self, email: str, password: str) -> json:
         """Метод выполняет запрос к API сервера и возвращает статус запроса, а также результат в формате
         JSON с уникальным ключом пользователя, найденного по указанным email и password."""
 
         headers = {'email': email, 'password': password}
-        res = requests.get(self.base_url + 'api/key', headers=headers)
-        status = res.status_code
-        result = ""
-        try:
-            result = res.json()
-        except json.decoder.JSONDecodeError:
-            result = res.text
-        return status, result
+        res = self._request('GET', 'api/key', headers=headers)
+        return self._decode(res)
+
+    def get_auth_key(self, email: str, password: str) -> json:
+        """Метод возвращает API ключ пользователя в формате JSON ({'key': ...}) из кэша клиента, обращаясь к
+        серверу только при первом запросе и после истечения срока жизни ключа. Если сервер не выдал ключ -
+        вызывается исключение."""
+
+        return self.auth_cache.get(email, password, self.get_api_key)
 
     def get_list_of_pets(self, auth_key: json, filter: str = "") -> json:
         """Метод делает запрос к API сервера и возвращает статус запроса и результат в формате JSON
@@ -30,37 +227,57 @@ class PetFriends:
 
         headers = {'auth_key': auth_key['key']}
         filter = {'filter': filter}
-        res = requests.get(self.base_url + 'api/pets', headers=headers, params=filter)
-        status = res.status_code
-        result = ""
+        if self.response_cache is not None:
+            return self._cached_get('api/pets', headers, filter)
+        res = self._request('GET', 'api/pets', headers=headers, params=filter)
+        return self._decode(res)
+
+    def iter_pets(self, auth_key: json, filter: str = "", fields: tuple = None, chunk_size: int = 64 * 1024):
+        """Метод делает тот же запрос, что и get_list_of_pets, но не загружает ответ целиком, а разбирает его
+        по мере получения и возвращает питомцев по одному. Если передан fields, в каждой записи остаются
+        только указанные поля. Если перебор прерван, оставшаяся часть ответа не скачивается. Если сервер
+        не вернул список - вызывается исключение."""
+
+        headers = {'auth_key': auth_key['key']}
+        res = self._request('GET', 'api/pets', headers=headers, params={'filter': filter}, stream=True)
         try:
-            result = res.json()
-        except json.decoder.JSONDecodeError:
-            result = res.text
-        return status, result
+            if res.status_code != 200:
+                raise Exception(f'Не удалось получить список питомцев: {res.status_code} {res.text}')
+            for pet in iter_json_array(res.iter_content(chunk_size), 'pets'):
+                yield pet if fields is None else project(pet, fields)
+        finally:
+            res.close()
+
+    def get_pets(self, auth_key: json, filter: str = "", chunk_size: int = 64 * 1024) -> tuple:
+        """Метод делает тот же запрос, что и get_list_of_pets, и возвращает статус запроса и список питомцев
+        в виде компактных записей Pet (id, name, animal_type, age, pet_photo). Ответ разбирается по мере
+        получения, поэтому словари всех питомцев не находятся в памяти одновременно. Если сервер не вернул
+        список - вместо него возвращается тело ответа, как в get_list_of_pets. Кэш ответов не используется."""
+
+        headers = {'auth_key': auth_key['key']}
+        res = self._request('GET', 'api/pets', headers=headers, params={'filter': filter}, stream=True)
+        try:
+            if res.status_code != 200:
+                return self._decode(res)
+            return res.status_code, [Pet.from_dict(item) for item in iter_json_array(res.iter_content(chunk_size))]
+        finally:
+            res.close()
 
     def add_new_pet(self, auth_key: json, name: str, animal_type: str, age: str, pet_photo: str) -> json:
         """Метод посредством POST запроса отправляет на сервер полные данные о добавляемом питомце, включая фото,
         а также возвращает статус запроса на сервер (код состояния ответа) и результат в формате JSON с данными
         добавленного питомца."""
 
-        data = MultipartEncoder(
-            fields={
+        headers = {'auth_key': auth_key['key']}
+        with self.photo_pipeline.prepare(pet_photo) as photo:
+            fields = {
                 'name': name,
                 'animal_type': animal_type,
                 'age': age,
-                'pet_photo': (pet_photo, open(pet_photo, 'rb'), 'image/jpeg')
-            })
-        headers = {'auth_key': auth_key['key'], 'Content-Type': data.content_type}
-        res = requests.post(self.base_url + 'api/pets', headers=headers, data=data)
-        status = res.status_code
-        result = ""
-        try:
-            result = res.json()
-        except json.decoder.JSONDecodeError:
-            result = res.text
-        print(result)
-        return status, result
+                'pet_photo': (photo.filename, photo.buffer, photo.mime)
+            }
+            res = self._request('POST', 'api/pets', headers=headers, fields=fields)
+        return self._decode(res)
 
     def create_pet_simple(self, auth_key: json, name: str, animal_type: str, age: float) -> json:
         """Метод отправляет на сервер базовую информацию о добавляемом питомце без фотографии.
@@ -68,45 +285,28 @@ class PetFriends:
 
         headers = {'auth_key': auth_key['key']}
         data = {'name': name, 'animal_type': animal_type, 'age': age}
-        res = requests.post(self.base_url + 'api/create_pet_simple', headers=headers, data=data)
-        status = res.status_code
-        result = ""
-        try:
-            result = res.json()
-        except json.decoder.JSONDecodeError:
-            result = res.text
-        return status, result
+        res = self._request('POST', 'api/create_pet_simple', headers=headers, data=data)
+        return self._decode(res)
 
     def update_pet_foto(self, auth_key: json, pet_id: str, pet_photo: str) -> json:
         """Метод отправляет запрос на сервер об обновлении фото добавленного питомца по указанному ID,
         а также возвращает статус запроса (код состояния ответа) и результат в формате JSON с обновлёнными
         данными питомца."""
 
-        data = MultipartEncoder(
-            fields={'pet_photo': (pet_photo, open(pet_photo, 'rb'), 'image/jpeg')})
-        headers = {'auth_key': auth_key['key'], 'Content-Type': data.content_type}
-        res = requests.post(self.base_url + 'api/pets/set_photo/' + pet_id, headers=headers, data=data)
-        status = res.status_code
-        result = ""
-        try:
-            result = res.json()
-        except json.decoder.JSONDecodeError:
-            result = res.text
-        return status, result
+        headers = {'auth_key': auth_key['key']}
+        with self.photo_pipeline.prepare(pet_photo) as photo:
+            fields = {'pet_photo': (photo.filename, photo.buffer, photo.mime)}
+            res = self._request('POST', 'api/pets/set_photo/' + pet_id, headers=headers, fields=fields,
+                                endpoint='api/pets/set_photo/<id>')
+        return self._decode(res)
 
     def delete_pet(self, auth_key: json, pet_id: str) -> json:
         """Метод отправляет на сервер запрос на удаление питомца по указанному ID, а также возвращает статус
         запроса (код состояния ответа) и результат в формате JSON с текстом уведомления об успешном удалении."""
 
         headers = {'auth_key': auth_key['key']}
-        res = requests.delete(self.base_url + 'api/pets/' + pet_id, headers=headers)
-        status = res.status_code
-        result = ""
-        try:
-            result = res.json()
-        except json.decoder.JSONDecodeError:
-            result = res.text
-        return status, result
+        res = self._request('DELETE', 'api/pets/' + pet_id, headers=headers, endpoint='api/pets/<id>')
+        return self._decode(res)
 
     def update_pet_info(self, auth_key: json, pet_id: str, name: str, animal_type: str, age: float) -> json:
         """Метод отправляет запрос на сервер об обновлении данных питомуа по указанному ID, а также возвращает
@@ -114,11 +314,5 @@ class PetFriends:
 
         headers = {'auth_key': auth_key['key']}
         data = {'name': name, 'age': age, 'animal_type': animal_type}
-        res = requests.put(self.base_url + 'api/pets/' + pet_id, headers=headers, data=data)
-        status = res.status_code
-        result = ""
-        try:
-            result = res.json()
-        except json.decoder.JSONDecodeError:
-            result = res.text
-        return status, result
\ No newline at end of file
+        res = self._request('PUT', 'api/pets/' + pet_id, headers=headers, data=data, endpoint='api/pets/<id>')
+        return self._decode(res)
\ No newline at end of file
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import aiohttp
+
+from api import IDEMPOTENT_METHODS, RETRY_STATUSES, backoff_delay
+from photo import PhotoPipeline
+
+
+class AsyncPetFriends:
+    """Асинхронная версия библиотеки методов PetFriends (asyncio + aiohttp) с тем же набором методов, что
+    и у PetFriends, а также пакетными методами для массового создания и удаления питомцев.
+    Используется как асинхронный контекстный менеджер: async with AsyncPetFriends() as pf: ..."""
+
+    def __init__(self, base_url: str = "https://petfriends.skillfactory.ru/", pool_maxsize: int = 100,
+                 keep_alive: bool = True, timeout: tuple = (3.05, 30), retries: int = 3, backoff_factor: float = 0.5,
+                 backoff_max: float = 10.0, concurrency: int = 20, photo_pipeline: PhotoPipeline = None):
+        """pool_maxsize - максимальное количество одновременно открытых соединений, concurrency - количество
+        одновременно выполняемых запросов в пакетных методах по умолчанию. Остальные параметры аналогичны
+        параметрам PetFriends."""
+
+        self.base_url = base_url
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.concurrency = concurrency
+        self.photo_pipeline = photo_pipeline if photo_pipeline is not None else PhotoPipeline()
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_maxsize, force_close=not self.keep_alive)
+        timeout = aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1])
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Закрывает сессию и все соединения пула."""
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _request(self, method: str, path: str, headers: dict = None, params: dict = None,
+                       data: dict = None, photo: str = None) -> tuple:
+        """Выполняет запрос с повторами при обрыве соединения и ответах 5xx (запрос POST - только при ошибке
+        подключения, как в PetFriends) и возвращает код состояния ответа и результат в формате JSON (или текст
+        ответа, если он не является JSON). Если передан photo, файл готовится к загрузке так же, как в PetFriends
+        (photo_pipeline), а тело собирается как multipart/form-data из полей data и фото заново для каждой
+        попытки."""
+
+        # aiohttp, в отличие от requests, принимает в полях формы только строки
+        data = {name: str(value) for name, value in (data or {}).items()}
+        if photo is None:
+            return await self._request_with_retries(method, path, headers, params, lambda: data)
+
+        with self.photo_pipeline.prepare(photo) as prepared:
+            def form():
+                prepared.buffer.seek(0)
+                body = aiohttp.FormData(data)
+                body.add_field('pet_photo', prepared.buffer.read(), filename=prepared.filename,
+                               content_type=prepared.mime)
+                return body
+
+            return await self._request_with_retries(method, path, headers, params, form)
+
+    async def _request_with_retries(self, method, path, headers, params, make_body) -> tuple:
+        attempt = 0
+        while True:
+            try:
+                status, text = await self._send(method, path, headers, params, make_body())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as error:
+                # POST повторяется, только если соединение не удалось установить и запрос не был отправлен
+                not_sent = isinstance(error, (aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError))
+                if attempt >= self.retries or method not in IDEMPOTENT_METHODS and not not_sent:
+                    raise
+            else:
+                if status not in RETRY_STATUSES or attempt >= self.retries or method not in IDEMPOTENT_METHODS:
+                    try:
+                        return status, json.loads(text)
+                    except json.decoder.JSONDecodeError:
+                        return status, text
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_factor, self.backoff_max))
+            attempt += 1
+
+    async def _send(self, method, path, headers, params, data) -> tuple:
+        async with self.session.request(method, self.base_url + path, headers=headers, params=params,
+                                        data=data) as res:
+            return res.status, await res.text()
+
+    async def get_api_key(self, email: str, password: str) -> json:
+        """Асинхронный аналог PetFriends.get_api_key."""
+
+        headers = {'email': email, 'password': password}
+        return await self._request('GET', 'api/key', headers=headers)
+
+    async def get_list_of_pets(self, auth_key: json, filter: str = "") -> json:
+        """Асинхронный аналог PetFriends.get_list_of_pets."""
+
+        headers = {'auth_key': auth_key['key']}
+        return await self._request('GET', 'api/pets', headers=headers, params={'filter': filter})
+
+    async def add_new_pet(self, auth_key: json, name: str, animal_type: str, age: str, pet_photo: str) -> json:
+        """Асинхронный аналог PetFriends.add_new_pet."""
+
+        headers = {'auth_key': auth_key['key']}
+        data = {'name': name, 'animal_type': animal_type, 'age': age}
+        return await self._request('POST', 'api/pets', headers=headers, data=data, photo=pet_photo)
+
+    async def create_pet_simple(self, auth_key: json, name: str, animal_type: str, age: float) -> json:
+        """Асинхронный аналог PetFriends.create_pet_simple."""
+
+        headers = {'auth_key': auth_key['key']}
+        data = {'name': name, 'animal_type': animal_type, 'age': age}
+        return await self._request('POST', 'api/create_pet_simple', headers=headers, data=data)
+
+    async def update_pet_foto(self, auth_key: json, pet_id: str, pet_photo: str) -> json:
+        """Асинхронный аналог PetFriends.update_pet_foto."""
+
+        headers = {'auth_key': auth_key['key']}
+        return await self._request('POST', 'api/pets/set_photo/' + pet_id, headers=headers, photo=pet_photo)
+
+    async def delete_pet(self, auth_key: json, pet_id: str) -> json:
+        """Асинхронный аналог PetFriends.delete_pet."""
+
+        headers = {'auth_key': auth_key['key']}
+        return await self._request('DELETE', 'api/pets/' + pet_id, headers=headers)
+
+    async def update_pet_info(self, auth_key: json, pet_id: str, name: str, animal_type: str, age: float) -> json:
+        """Асинхронный аналог PetFriends.update_pet_info."""
+
+        headers = {'auth_key': auth_key['key']}
+        data = {'name': name, 'age': age, 'animal_type': animal_type}
+        return await self._request('PUT', 'api/pets/' + pet_id, headers=headers, data=data)
+
+    # блок пакетных методов:
+
+    async def gather(self, method, calls, concurrency: int = None) -> list:
+        """Вызывает асинхронный метод method для каждого набора аргументов из calls, выполняя одновременно
+        не более concurrency запросов. Возвращает список пар (статус, результат) в порядке calls; исключение
+        отдельного вызова возвращается на его месте вместо пары."""
+
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def call(args):
+            async with semaphore:
+                return await method(*args)
+
+        return await asyncio.gather(*(call(args) for args in calls), return_exceptions=True)
+
+    async def create_pets_simple(self, auth_key: json, pets, concurrency: int = None) -> list:
+        """Создаёт питомцев без фото по списку кортежей (name, animal_type, age)."""
+
+        return await self.gather(self.create_pet_simple, ((auth_key, *pet) for pet in pets), concurrency)
+
+    async def add_new_pets(self, auth_key: json, pets, concurrency: int = None) -> list:
+        """Создаёт питомцев с фото по списку кортежей (name, animal_type, age, pet_photo)."""
+
+        return await self.gather(self.add_new_pet, ((auth_key, *pet) for pet in pets), concurrency)
+
+    async def delete_pets(self, auth_key: json, pet_ids, concurrency: int = None) -> list:
+        """Удаляет питомцев по списку ID."""
+
+        return await self.gather(self.delete_pet, ((auth_key, pet_id) for pet_id in pet_ids), concurrency)
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+
+
+class AuthKeyCache:
+    """Потокобезопасный кэш API ключей пользователей PetFriends по email.
+
+    Ключ запрашивается у сервера только при первом обращении и после истечения срока жизни ttl (в секундах).
+    Словарь auth_key, выдаваемый кэшем, один и тот же для всех вызовов с одним email: при обновлении ключа
+    (например, после ответа 403) он меняется на месте, и все ранее полученные ссылки сразу видят новый ключ.
+    Если указан path, ключи (без паролей) сохраняются в JSON-файл и используются повторно между запусками.
+    Запрос ключа к серверу выполняется вне общей блокировки: одновременно ключ одного пользователя запрашивает
+    только один поток, а обращения к ключам других пользователей его не ждут."""
+
+    def __init__(self, ttl: float = 3600, path: str = None):
+        self.ttl = ttl
+        self.path = path
+        self._lock = threading.Lock()
+        # email -> блокировка, под которой запрашивается ключ этого пользователя
+        self._fetch_locks = {}
+        # email -> {'auth_key': {'key': ...}, 'password': ..., 'expires': время истечения по time.time()}
+        self._entries = {}
+        if path is not None:
+            self._load()
+
+    def get(self, email: str, password: str, fetch) -> dict:
+        """Возвращает auth_key пользователя из кэша, а если ключа нет или он устарел - получает новый через
+        fetch(email, password), который должен вернуть пару (статус, результат) как PetFriends.get_api_key."""
+
+        auth_key = self._fresh(email, password)
+        if auth_key is not None:
+            return auth_key
+        with self._fetch_lock(email):
+            # Пока поток ждал блокировку, ключ мог получить другой поток
+            auth_key = self._fresh(email, password)
+            if auth_key is not None:
+                return auth_key
+            return self._fetch(email, password, fetch)
+
+    def refresh(self, stale_key: str, fetch):
+        """Обновляет устаревший ключ stale_key, отклонённый сервером, и возвращает новый ключ. Если ключ уже
+        обновлён другим потоком - возвращает текущий. Возвращает None, если ключ кэшу неизвестен."""
+
+        with self._lock:
+            for email, entry in self._entries.items():
+                if entry['auth_key']['key'] == stale_key:
+                    break
+                if entry.get('previous') == stale_key:
+                    return entry['auth_key']['key']
+            else:
+                return None
+        with self._fetch_lock(email):
+            with self._lock:
+                entry = self._entries.get(email)
+                if entry is None:
+                    return None
+                if entry['auth_key']['key'] != stale_key:
+                    return entry['auth_key']['key']
+                password = entry.get('password')
+            if password is None:
+                return None
+            return self._fetch(email, password, fetch)['key']
+
+    def invalidate(self, email: str = None):
+        """Удаляет из кэша ключ указанного пользователя, а без email - все ключи."""
+
+        with self._lock:
+            if email is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(email, None)
+            self._save()
+
+    def _fresh(self, email, password):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry['expires'] > time.time():
+                entry['password'] = password
+                return entry['auth_key']
+        return None
+
+    def _fetch_lock(self, email) -> threading.Lock:
+        with self._lock:
+            return self._fetch_locks.setdefault(email, threading.Lock())
+
+    def _fetch(self, email, password, fetch) -> dict:
+        # Вызывается под блокировкой пользователя email, но не под общей блокировкой
+        status, result = fetch(email, password)
+        if status != 200 or 'key' not in result:
+            raise Exception(f'Не удалось получить API ключ пользователя {email}: {status} {result}')
+
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                entry = self._entries[email] = {'auth_key': {}}
+            else:
+                entry['previous'] = entry['auth_key'].get('key')
+            entry['auth_key']['key'] = result['key']
+            entry['password'] = password
+            entry['expires'] = time.time() + self.ttl
+            self._save()
+            return entry['auth_key']
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return
+        for email, entry in stored.items():
+            self._entries[email] = {'auth_key': {'key': entry['key']}, 'expires': entry['expires']}
+
+    def _save(self):
+        if self.path is None:
+            return
+        stored = {email: {'key': entry['auth_key']['key'], 'expires': entry['expires']}
+                  for email, entry in self._entries.items()}
+        # Запись через временный файл, чтобы параллельные процессы не прочитали файл частично
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(stored, file)
+        os.replace(tmp_path, self.path)
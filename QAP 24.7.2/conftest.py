@@ -0,0 +1,81 @@
+import os
+import sys
+import warnings
+
+import pytest
+
+# Корень репозитория: общие для наборов тестов профилировщик step_profiler и модуль image_types
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import settings
+import step_profiler
+from api import PetFriends
+from auth_cache import AuthKeyCache
+from metrics import session_metrics
+from pet_factory import PetFactory
+from response_cache import session_response_cache
+
+
+fake_server = None
+
+
+def pytest_addoption(parser):
+    parser.addoption('--fake-server', action='store_true',
+                     help='запустить тесты против локального сервера PetFriends (fake_server.py) вместо настоящего')
+    parser.addoption('--metrics-json', metavar='PATH', help='сохранить метрики запросов к API в JSON')
+    parser.addoption('--metrics-prom', metavar='PATH', help='сохранить метрики запросов к API в формате Prometheus')
+    step_profiler.add_options(parser)
+
+
+def pytest_configure(config):
+    global fake_server
+    profiler = step_profiler.configure(config)
+    if profiler is not None:
+        # Получение API ключа в фикстурах - подготовка теста, а в теле теста - обычный запрос к API
+        profiler.instrument(PetFriends, 'get_auth_key', lambda: 'fixture' if profiler.phase != 'call' else 'http')
+    if config.getoption('--fake-server'):
+        from fake_server import FakePetFriendsServer
+
+        # Сервер запускается до импорта тестовых модулей, поэтому клиенты в них получают его адрес
+        fake_server = FakePetFriendsServer(pets=3).start()
+        settings.base_url = fake_server.url
+
+
+def pytest_sessionfinish(session):
+    json_path = session.config.getoption('--metrics-json')
+    if json_path:
+        session_metrics.to_json(json_path)
+    prometheus_path = session.config.getoption('--metrics-prom')
+    if prometheus_path:
+        session_metrics.to_prometheus(prometheus_path)
+
+
+def pytest_unconfigure(config):
+    if fake_server is not None:
+        fake_server.stop()
+
+
+@pytest.fixture(scope='session')
+def pet_factory():
+    """Фабрика питомцев на всю тестовую сессию: питомцы заготавливаются один раз перед первым использующим
+    их тестом и удаляются в конце сессии, даже если тесты или сама заготовка завершились ошибкой. Кэш
+    ответов общий с клиентом тестов, поэтому создание и удаление питомцев фабрикой сбрасывает его."""
+
+    pf = PetFriends(settings.base_url, auth_cache=AuthKeyCache(path=settings.auth_cache_path),
+                    response_cache=session_response_cache, metrics=session_metrics)
+    factory = PetFactory(pf, pf.get_auth_key(settings.valid_email, settings.valid_password))
+    try:
+        factory.seed()
+        yield factory
+    finally:
+        left = factory.teardown()
+        pf.close()
+        if left:
+            warnings.warn(f'Не удалось удалить питомцев: {", ".join(left)}')
+
+
+@pytest.fixture
+def pet(pet_factory):
+    """Отдельный питомец текущего пользователя, которого не использует ни один другой тест."""
+
+    return pet_factory.take()
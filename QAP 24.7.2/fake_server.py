@@ -0,0 +1,476 @@
+"""Локальная замена сервера PetFriends для быстрых прогонов тестов без сети.
+
+Сервер хранит пользователей и питомцев в памяти и реализует методы API (/api/key, /api/pets,
+/api/create_pet_simple, /api/pets/set_photo/<id>) и HTML-страницы /login, /all_pets и /my_pets в той же
+разметке, что и настоящий сайт. Задержка ответов и доля ответов с ошибкой настраиваются.
+
+Запуск отдельным процессом (например, для тестов Selenium):
+    python fake_server.py --port 8000 --pets 5 --latency 0.05 --error-rate 0.01
+    PETFRIENDS_BASE_URL=http://127.0.0.1:8000/ pytest
+"""
+
+import argparse
+import base64
+import email.parser
+import email.policy
+import html
+import itertools
+import json
+import random
+import secrets
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from settings import valid_email, valid_password
+
+
+# Форматы фото, которые принимает API PetFriends v1
+PHOTO_TYPES = {b'\xff\xd8\xff': 'image/jpeg', b'\x89PNG\r\n\x1a\n': 'image/png'}
+
+# Фото заранее создаваемых питомцев: JPEG 1x1 пиксель в виде data URI, как фото, загруженные через API
+SEED_PHOTO = ('data:image/jpeg;base64,'
+              '/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDABALDA4MChAODQ4SERATGCgaGBYWGDEjJR0oOjM9PDkzODdASFxOQERXRTc4UG1RV19i'
+              'Z2hnPk1xeXBkeFxlZ2P/2wBDARESEhgVGC8aGi9jQjhCY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2Nj'
+              'Y2NjY2NjY2P/wAARCAABAAEDASIAAhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUF'
+              'BAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVW'
+              'V1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi'
+              '4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAEC'
+              'AxEEBSExBhJBUQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVm'
+              'Z2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq'
+              '8vP09fb3+Pn6/9oADAMBAAIRAxEAPwDQooorzzuP/9k=')
+
+
+class PetStore:
+    """Потокобезопасное хранилище пользователей, API ключей, сессий и питомцев."""
+
+    def __init__(self, users: dict):
+        self.lock = threading.Lock()
+        self.passwords = dict(users)
+        self.keys = {}
+        self.sessions = {}
+        self.pets = {}
+        self.version = itertools.count(1)
+        self.etag = next(self.version)
+
+    def api_key(self, email_: str, password: str):
+        with self.lock:
+            if self.passwords.get(email_) != password:
+                return None
+            for key, owner in self.keys.items():
+                if owner == email_:
+                    return key
+            key = secrets.token_hex(28)
+            self.keys[key] = email_
+            return key
+
+    def key_owner(self, key: str):
+        with self.lock:
+            return self.keys.get(key)
+
+    def session_owner(self, session: str):
+        with self.lock:
+            return self.sessions.get(session)
+
+    def login(self, email_: str, password: str):
+        with self.lock:
+            if self.passwords.get(email_) != password:
+                return None
+            session = secrets.token_hex(16)
+            self.sessions[session] = email_
+            return session
+
+    def list_pets(self, owner: str = None) -> list:
+        with self.lock:
+            return [dict(pet) for pet in self.pets.values() if owner is None or pet['user_id'] == owner]
+
+    def add_pet(self, owner: str, name: str, animal_type: str, age: str, pet_photo: str = '') -> dict:
+        pet = {'id': str(uuid.uuid4()), 'name': name, 'animal_type': animal_type, 'age': age,
+               'pet_photo': pet_photo, 'user_id': owner, 'created_at': str(time.time())}
+        with self.lock:
+            self.pets[pet['id']] = pet
+            self.etag = next(self.version)
+            return dict(pet)
+
+    def update_pet(self, owner: str, pet_id: str, **fields):
+        with self.lock:
+            pet = self.pets.get(pet_id)
+            if pet is None or pet['user_id'] != owner:
+                return None
+            pet.update(fields)
+            self.etag = next(self.version)
+            return dict(pet)
+
+    def delete_pet(self, owner: str, pet_id: str) -> bool:
+        with self.lock:
+            pet = self.pets.get(pet_id)
+            if pet is None or pet['user_id'] != owner:
+                return False
+            del self.pets[pet_id]
+            self.etag = next(self.version)
+            return True
+
+
+class FakePetFriendsServer:
+    """Локальный сервер PetFriends в отдельном потоке текущего процесса.
+
+    users - словарь email -> пароль (по умолчанию пользователь из settings), latency - задержка каждого ответа
+    в секундах (число или пара (min, max) для случайной задержки), error_rate - доля запросов, на которые
+    сервер отвечает кодом error_status, seed - начальное значение генератора случайных чисел для
+    воспроизводимых прогонов, pets - количество питомцев с фото, заранее создаваемых для первого пользователя.
+    Используется как контекстный менеджер: with FakePetFriendsServer() as server: ..."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, users: dict = None, latency=0.0,
+                 error_rate: float = 0.0, error_status: int = 500, seed: int = None, pets: int = 0):
+        users = users if users is not None else {valid_email: valid_password}
+        self.store = PetStore(users)
+        for number in range(1, pets + 1):
+            self.store.add_pet(next(iter(users)), f'Питомец{number}', 'кот', str(number), SEED_PHOTO)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _delay_and_fail(self) -> bool:
+        """Выдерживает настроенную задержку и решает, нужно ли ответить ошибкой."""
+
+        with self.random_lock:
+            if isinstance(self.latency, (tuple, list)):
+                delay = self.random.uniform(*self.latency)
+            else:
+                delay = self.latency
+            fail = self.error_rate > 0 and self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(PetFriendsHandler):
+            fake = server
+
+        return Handler
+
+
+class PetFriendsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело ответа пишутся отдельно - без этого алгоритм Нейгла задерживает тело на ~40 мс
+    disable_nagle_algorithm = True
+    fake = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # Маршрутизация
+
+    def do_GET(self):
+        self._dispatch({
+            '/api/key': self.api_key,
+            '/api/pets': self.api_list_pets,
+            '/login': self.login_page,
+            '/all_pets': self.all_pets_page,
+            '/my_pets': self.my_pets_page,
+            '/': self.root_page,
+        })
+
+    def do_POST(self):
+        self._dispatch({
+            '/api/pets': self.api_add_pet,
+            '/api/create_pet_simple': self.api_create_pet_simple,
+            '/api/pets/set_photo/': self.api_set_photo,
+            '/login': self.login,
+        })
+
+    def do_PUT(self):
+        self._dispatch({'/api/pets/': self.api_update_pet})
+
+    def do_DELETE(self):
+        self._dispatch({'/api/pets/': self.api_delete_pet})
+
+    def _dispatch(self, routes: dict):
+        url = urlsplit(self.path)
+        self.query = parse_qs(url.query)
+        length = int(self.headers.get('Content-Length') or 0)
+        self.body = self.rfile.read(length) if length else b''
+        if self.fake._delay_and_fail():
+            return self.send_json(self.fake.error_status, {'message': 'Injected error'})
+        for route, handler in routes.items():
+            if url.path == route:
+                return handler()
+            if route.endswith('/') and route != '/' and url.path.startswith(route):
+                return handler(url.path[len(route):])
+        self.send_text(404, 'Not Found')
+
+    # Ответы
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_json(self, status: int, result, headers: dict = None):
+        body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        self.send_body(status, body, 'application/json', headers)
+
+    def send_text(self, status: int, text: str):
+        self.send_body(status, text.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def redirect(self, location: str, headers: dict = None):
+        self.send_body(302, b'', 'text/html; charset=utf-8', dict(headers or {}, Location=location))
+
+    # Разбор запроса
+
+    def form(self) -> dict:
+        """Поля формы application/x-www-form-urlencoded или multipart/form-data. Для файлов значение - пара
+        (имя файла, содержимое)."""
+
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith('multipart/form-data'):
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + self.body)
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param('name', header='content-disposition')
+                payload = part.get_payload(decode=True)
+                if part.get_filename() is not None:
+                    fields[name] = (part.get_filename(), payload)
+                else:
+                    fields[name] = payload.decode('utf-8')
+            return fields
+        return {name: values[0] for name, values in parse_qs(self.body.decode('utf-8')).items()}
+
+    def api_user(self):
+        """Владелец API ключа из заголовка auth_key или None (в этом случае уже отправлен ответ 403)."""
+
+        owner = self.fake.store.key_owner(self.headers.get('auth_key'))
+        if owner is None:
+            self.send_text(403, 'Forbidden. Please provide valid auth_key')
+        return owner
+
+    def session_user(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        session = cookie.get('user_id')
+        return self.fake.store.session_owner(session.value) if session is not None else None
+
+    @staticmethod
+    def photo_data_url(photo):
+        """Преобразует загруженный файл в data URL или возвращает None, если формат не поддерживается."""
+
+        if not isinstance(photo, tuple):
+            return None
+        content = photo[1]
+        for signature, mime in PHOTO_TYPES.items():
+            if content.startswith(signature):
+                return f'data:{mime};base64,' + base64.b64encode(content).decode('ascii')
+        return None
+
+    @staticmethod
+    def valid_pet(name, animal_type, age) -> bool:
+        try:
+            float(age)
+        except (TypeError, ValueError):
+            return False
+        return bool(name) and bool(animal_type)
+
+    # API
+
+    def api_key(self):
+        key = self.fake.store.api_key(self.headers.get('email'), self.headers.get('password'))
+        if key is None:
+            return self.send_text(403, 'This user wasn&#39;t found in database')
+        self.send_json(200, {'key': key})
+
+    def api_list_pets(self):
+        owner = self.api_user()
+        if owner is None:
+            return
+        etag = f'"{self.fake.store.etag}-{owner}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.send_body(304, b'', 'application/json', {'ETag': etag})
+        my_pets = self.query.get('filter', [''])[0] == 'my_pets'
+        pets = self.fake.store.list_pets(owner if my_pets else None)
+        self.send_json(200, {'pets': pets}, {'ETag': etag})
+
+    def api_add_pet(self):
+        owner = self.api_user()
+        if owner is None:
+            return
+        form = self.form()
+        photo = self.photo_data_url(form.get('pet_photo'))
+        if photo is None or not self.valid_pet(form.get('name'), form.get('animal_type'), form.get('age')):
+            return self.send_text(400, 'Bad Request')
+        self.send_json(200, self.fake.store.add_pet(owner, form['name'], form['animal_type'], form['age'], photo))
+
+    def api_create_pet_simple(self):
+        owner = self.api_user()
+        if owner is None:
+            return
+        form = self.form()
+        if not self.valid_pet(form.get('name'), form.get('animal_type'), form.get('age')):
+            return self.send_text(400, 'Bad Request')
+        self.send_json(200, self.fake.store.add_pet(owner, form['name'], form['animal_type'], form['age']))
+
+    def api_set_photo(self, pet_id: str):
+        owner = self.api_user()
+        if owner is None:
+            return
+        photo = self.photo_data_url(self.form().get('pet_photo'))
+        if photo is None:
+            return self.send_text(400, 'Bad Request')
+        pet = self.fake.store.update_pet(owner, pet_id, pet_photo=photo)
+        if pet is None:
+            return self.send_text(400, 'Bad Request')
+        self.send_json(200, pet)
+
+    def api_update_pet(self, pet_id: str):
+        owner = self.api_user()
+        if owner is None:
+            return
+        form = self.form()
+        if not self.valid_pet(form.get('name'), form.get('animal_type'), form.get('age')):
+            return self.send_text(400, 'Bad Request')
+        pet = self.fake.store.update_pet(owner, pet_id, name=form['name'], animal_type=form['animal_type'],
+                                         age=form['age'])
+        if pet is None:
+            return self.send_text(400, 'Bad Request')
+        self.send_json(200, pet)
+
+    def api_delete_pet(self, pet_id: str):
+        owner = self.api_user()
+        if owner is None:
+            return
+        self.fake.store.delete_pet(owner, pet_id)
+        self.send_json(200, '')
+
+    # HTML-страницы
+
+    def root_page(self):
+        self.redirect('/all_pets' if self.session_user() else '/login')
+
+    def login_page(self):
+        self.send_text(200, page('PetFriends: Вход', '''
+<form method="post" action="/login">
+  <input id="email" name="email" type="email" class="form-control">
+  <input id="pass" name="pass" type="password" class="form-control">
+  <button type="submit" class="btn btn-success">Войти</button>
+</form>''', logged_in=False))
+
+    def login(self):
+        form = self.form()
+        session = self.fake.store.login(form.get('email'), form.get('pass'))
+        if session is None:
+            return self.redirect('/login')
+        self.redirect('/all_pets', {'Set-Cookie': f'user_id={session}; Path=/'})
+
+    def all_pets_page(self):
+        if self.session_user() is None:
+            return self.redirect('/login')
+        cards = ''.join(f'''
+  <div class="card" style="width: 15rem;">
+    <img class="card-img-top" src="{html.escape(pet['pet_photo'])}" alt="">
+    <div class="card-body">
+      <h5 class="card-title">{html.escape(pet['name'])}</h5>
+      <p class="card-text">{html.escape(pet['animal_type'])}, {html.escape(pet['age'])} лет</p>
+    </div>
+  </div>''' for pet in self.fake.store.list_pets())
+        self.send_text(200, page('PetFriends', f'<div class="card-deck">{cards}\n</div>'))
+
+    def my_pets_page(self):
+        owner = self.session_user()
+        if owner is None:
+            return self.redirect('/login')
+        pets = self.fake.store.list_pets(owner)
+        rows = ''.join(f'''
+    <tr>
+      <th scope="row"><img src="{html.escape(pet['pet_photo'])}" style="max-width: 100px; max-height: 100px;"></th>
+      <td>{html.escape(pet['name'])}</td>
+      <td>{html.escape(pet['animal_type'])}</td>
+      <td>{html.escape(pet['age'])}</td>
+      <td><div class="delete_pet_button">&times;</div></td>
+    </tr>''' for pet in pets)
+        self.send_text(200, page('PetFriends: Мои питомцы', f'''
+<div class=".col-sm-4 left">
+  <h2>{html.escape(owner.split('@')[0])}</h2>
+  Питомцев: {len(pets)}<br>
+  Друзей: 0<br>
+  Сообщений: 0
+</div>
+<table class="table table-hover">
+  <thead><tr><th scope="col">Фото</th><th scope="col">Имя</th><th scope="col">Порода</th>
+  <th scope="col">Возраст</th><th scope="col"></th></tr></thead>
+  <tbody>{rows}
+  </tbody>
+</table>'''))
+
+
+def page(title: str, content: str, logged_in: bool = True) -> str:
+    navbar = '<a class="nav-link" href="/my_pets">Мои питомцы</a><a class="nav-link" href="/all_pets">Все питомцы</a>' \
+        if logged_in else ''
+    return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><nav class="navbar">{navbar}</nav>
+<div class="container">{content}
+</div></body></html>'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Локальный сервер PetFriends')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--user', action='append', default=[], metavar='EMAIL:PASSWORD',
+                        help='пользователь сервера (можно указать несколько раз)')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка каждого ответа, с')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='доля ответов с ошибкой 500')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--pets', type=int, default=0, help='количество заранее созданных питомцев')
+    args = parser.parse_args()
+
+    users = dict(user.split(':', 1) for user in args.user) or None
+    server = FakePetFriendsServer(args.host, args.port, users, args.latency, args.error_rate, seed=args.seed,
+                                  pets=args.pets)
+    print(f'PetFriends: {server.url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
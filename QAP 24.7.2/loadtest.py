@@ -0,0 +1,244 @@
+"""Нагрузочный прогон API PetFriends через клиент PetFriends.
+
+N виртуальных пользователей (потоков) выполняют операции в заданной пропорции: list - список питомцев,
+create_simple - питомец без фото, create_photo - питомец с фото, update - изменение данных, delete - удаление.
+Пользователи запускаются равномерно в течение ramp-up, общая частота запросов ограничивается target RPS.
+По окончании выводятся пропускная способность, p50/p95/p99 и доля ошибок по методам API, результат
+сохраняется в JSON и может сравниваться с результатом предыдущего прогона.
+
+Пример:
+    python loadtest.py --users 20 --ramp-up 10 --rps 50 --duration 60 \\
+        --mix list=60,create_simple=20,create_photo=5,update=10,delete=5 --output run.json --compare base.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+# Корень репозитория: общий модуль image_types, который использует клиент API
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import PetFriends
+from metrics import RequestMetrics
+from settings import valid_email, valid_password, base_url
+
+
+OPERATIONS = ('list', 'create_simple', 'create_photo', 'update', 'delete')
+DEFAULT_PHOTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Tests', 'Images', 'cat1.jpg')
+
+
+class RateLimiter:
+    """Ограничивает общую частоту запросов всех потоков значением rps (0 - без ограничения): каждый вызов
+    acquire получает свой временной слот и ждёт его наступления."""
+
+    def __init__(self, rps: float):
+        self.interval = 1 / rps if rps > 0 else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class LoadTest:
+    """Нагрузочный прогон: mix - словарь операция -> вес, остальные параметры соответствуют аргументам
+    командной строки."""
+
+    def __init__(self, pf: PetFriends, auth_key: dict, mix: dict, users: int, ramp_up: float, rps: float,
+                 duration: float, photo: str = DEFAULT_PHOTO, seed: int = None):
+        self.pf = pf
+        self.auth_key = auth_key
+        self.operations = list(mix)
+        self.weights = [mix[operation] for operation in self.operations]
+        self.users = users
+        self.ramp_up = ramp_up
+        self.limiter = RateLimiter(rps)
+        self.duration = duration
+        self.photo = photo
+        self.seed = seed
+        # ID питомцев, созданных прогоном: из них берутся питомцы для update и delete
+        self.created = deque()
+        self.stop_at = None
+
+    def run(self) -> float:
+        """Выполняет прогон и возвращает его фактическую длительность в секундах."""
+
+        start = time.monotonic()
+        self.stop_at = start + self.duration
+        threads = [threading.Thread(target=self._user, args=(number,), daemon=True)
+                   for number in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - start
+
+    def cleanup(self):
+        """Удаляет оставшихся питомцев, созданных прогоном."""
+
+        while self.created:
+            self.pf.delete_pet(self.auth_key, self.created.popleft())
+
+    def _user(self, number: int):
+        rng = random.Random(None if self.seed is None else self.seed + number)
+        # Равномерный запуск пользователей в течение ramp-up
+        if self.users > 1:
+            time.sleep(self.ramp_up * number / self.users)
+        while True:
+            self.limiter.acquire()
+            if time.monotonic() >= self.stop_at:
+                return
+            operation = rng.choices(self.operations, self.weights)[0]
+            try:
+                getattr(self, 'do_' + operation)(rng)
+            except Exception:
+                # Ошибка уже учтена в метриках клиента, виртуальный пользователь продолжает работу
+                pass
+
+    def _remember(self, status: int, result):
+        if status == 200 and isinstance(result, dict) and 'id' in result:
+            self.created.append(result['id'])
+
+    def _take(self):
+        try:
+            return self.created.popleft()
+        except IndexError:
+            return None
+
+    def do_list(self, rng):
+        self.pf.get_list_of_pets(self.auth_key, rng.choice(('', 'my_pets')))
+
+    def do_create_simple(self, rng):
+        self._remember(*self.pf.create_pet_simple(self.auth_key, f'load{rng.randrange(10 ** 6)}', 'кот',
+                                                  rng.randrange(1, 20)))
+
+    def do_create_photo(self, rng):
+        self._remember(*self.pf.add_new_pet(self.auth_key, f'load{rng.randrange(10 ** 6)}', 'кот',
+                                            str(rng.randrange(1, 20)), self.photo))
+
+    def do_update(self, rng):
+        pet_id = self._take()
+        if pet_id is None:
+            return self.do_create_simple(rng)
+        self.pf.update_pet_info(self.auth_key, pet_id, f'load{rng.randrange(10 ** 6)}', 'кот', rng.randrange(1, 20))
+        self.created.append(pet_id)
+
+    def do_delete(self, rng):
+        pet_id = self._take()
+        if pet_id is None:
+            return self.do_create_simple(rng)
+        self.pf.delete_pet(self.auth_key, pet_id)
+
+
+def report(metrics: RequestMetrics, duration: float) -> dict:
+    """Сводка прогона по методам API: количество запросов, запросов в секунду, доля ошибок (ответы не 2xx
+    и ошибки соединения) и перцентили длительности в миллисекундах."""
+
+    endpoints = {}
+    for name, stats in metrics.to_dict().items():
+        errors = sum(count for status, count in stats['statuses'].items() if not status.startswith('2'))
+        latency = stats['latency']['total']
+        endpoints[name] = {
+            'count': stats['count'],
+            'rps': stats['count'] / duration,
+            'error_rate': errors / stats['count'],
+            'statuses': stats['statuses'],
+            'p50_ms': latency['p50'] * 1000,
+            'p95_ms': latency['p95'] * 1000,
+            'p99_ms': latency['p99'] * 1000,
+            'max_ms': latency['max'] * 1000,
+        }
+    return endpoints
+
+
+def print_report(endpoints: dict, baseline: dict = None):
+    print(f'{"endpoint":<36}{"count":>8}{"rps":>9}{"errors":>9}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    for name, row in endpoints.items():
+        print(f'{name:<36}{row["count"]:>8}{row["rps"]:>9.1f}{row["error_rate"]:>9.1%}'
+              f'{row["p50_ms"]:>10.1f}{row["p95_ms"]:>10.1f}{row["p99_ms"]:>10.1f}')
+        previous = (baseline or {}).get(name)
+        if previous is not None:
+            changes = []
+            for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+                if previous[key]:
+                    changes.append(f'{key} {(row[key] - previous[key]) / previous[key]:+.1%}')
+            changes.append(f'errors {row["error_rate"] - previous["error_rate"]:+.1%}')
+            print(f'{"":<36}  против базового прогона: ' + ', '.join(changes))
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for item in text.split(','):
+        operation, _, weight = item.partition('=')
+        if operation not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f'неизвестная операция {operation!r}, '
+                                             f'доступны: {", ".join(OPERATIONS)}')
+        mix[operation] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный прогон API PetFriends')
+    parser.add_argument('--base-url', default=base_url)
+    parser.add_argument('--email', default=valid_email)
+    parser.add_argument('--password', default=valid_password)
+    parser.add_argument('--users', type=int, default=10, help='количество виртуальных пользователей')
+    parser.add_argument('--ramp-up', type=float, default=0.0, help='время запуска всех пользователей, с')
+    parser.add_argument('--rps', type=float, default=0.0,
+                        help='целевое число запросов в секунду (0 - без ограничения)')
+    parser.add_argument('--duration', type=float, default=30.0, help='длительность прогона, с')
+    parser.add_argument('--mix', type=parse_mix,
+                        default=parse_mix('list=60,create_simple=20,create_photo=5,update=10,delete=5'),
+                        help='пропорции операций, например list=60,create_simple=20,update=10,delete=10')
+    parser.add_argument('--photo', default=DEFAULT_PHOTO, help='фото для create_photo')
+    parser.add_argument('--retries', type=int, default=0,
+                        help='повторы запросов клиентом (по умолчанию без повторов)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help='сохранить результат в JSON')
+    parser.add_argument('--compare', help='JSON предыдущего прогона для сравнения')
+    parser.add_argument('--no-cleanup', action='store_true', help='не удалять созданных питомцев')
+    args = parser.parse_args()
+
+    pf = PetFriends(args.base_url, pool_connections=1, pool_maxsize=args.users, retries=args.retries,
+                    metrics=RequestMetrics())
+    auth_key = pf.get_auth_key(args.email, args.password)
+    # Получение ключа не входит в нагрузку
+    pf.metrics = RequestMetrics()
+    load = LoadTest(pf, auth_key, args.mix, args.users, args.ramp_up, args.rps, args.duration, args.photo,
+                    args.seed)
+    duration = load.run()
+    endpoints = report(pf.metrics, duration)
+    if not args.no_cleanup:
+        load.cleanup()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)['endpoints']
+    print_report(endpoints, baseline)
+
+    if args.output:
+        result = {
+            'config': {name: value for name, value in vars(args).items() if name not in ('password', 'output',
+                                                                                         'compare')},
+            'duration': duration,
+            'endpoints': endpoints,
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import json
+import threading
+import time
+from collections import Counter
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Границы корзин гистограммы длительности запросов в формате Prometheus, с
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Этапы запроса: установка соединения (TCP + TLS, 0 для соединения из пула), ожидание заголовков ответа
+# и получение тела ответа
+PHASES = ('total', 'connect', 'wait', 'transfer')
+
+
+class LatencyHistogram:
+    """Гистограмма длительностей в духе HdrHistogram: значения в микросекундах раскладываются по корзинам,
+    ширина которых растёт вместе со значением, так что относительная погрешность любого перцентиля не
+    превышает 2 ** -(sub_bucket_bits - 1) (около 1,5% по умолчанию) при любом разбросе значений и
+    фиксированном объёме памяти."""
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = Counter()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value: int) -> int:
+        shift = max(value.bit_length() - self.sub_bucket_bits, 0)
+        return (shift << (self.sub_bucket_bits - 1)) + (value >> shift)
+
+    def _lowest(self, index: int) -> int:
+        """Наименьшее значение, попадающее в корзину index."""
+
+        half = 1 << (self.sub_bucket_bits - 1)
+        if index < 2 * half:
+            return index
+        shift = (index >> (self.sub_bucket_bits - 1)) - 1
+        return (index - (shift << (self.sub_bucket_bits - 1))) << shift
+
+    def record(self, seconds: float):
+        value = max(int(seconds * 1_000_000), 0)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'LatencyHistogram'):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        """Значение перцентиля percent (0-100) в секундах."""
+
+        if not self.count:
+            return 0.0
+        rank = max(percent / 100 * self.count, 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._lowest(index), self.min), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def count_below(self, seconds: float) -> int:
+        """Количество значений не больше seconds (с точностью до корзины)."""
+
+        limit = int(seconds * 1_000_000)
+        return sum(count for index, count in self.counts.items() if self._lowest(index) <= limit)
+
+    def mean(self) -> float:
+        return self.total / self.count / 1_000_000 if self.count else 0.0
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'min': (self.min or 0) / 1_000_000,
+            'mean': self.mean(),
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9),
+            'max': (self.max or 0) / 1_000_000,
+        }
+
+
+class EndpointStats:
+    """Статистика запросов к одному методу API."""
+
+    def __init__(self):
+        self.latency = {phase: LatencyHistogram() for phase in PHASES}
+        self.statuses = Counter()
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.statuses.values())
+
+    def merge(self, other: 'EndpointStats'):
+        for phase in PHASES:
+            self.latency[phase].merge(other.latency[phase])
+        self.statuses.update(other.statuses)
+        self.request_bytes += other.request_bytes
+        self.response_bytes += other.response_bytes
+
+
+class RequestMetrics:
+    """Потокобезопасный сборщик метрик запросов клиента PetFriends по парам (HTTP-метод, метод API):
+    длительность по этапам, размеры запроса и ответа, коды ответа. Ошибки соединения учитываются с кодом
+    'error'. Результаты выгружаются в JSON (to_json) и в текстовый формат Prometheus (to_prometheus)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, method: str, endpoint: str, status, timings: dict, request_bytes: int = 0,
+               response_bytes: int = 0):
+        with self._lock:
+            stats = self.endpoints.get((method, endpoint))
+            if stats is None:
+                stats = self.endpoints[(method, endpoint)] = EndpointStats()
+            for phase, seconds in timings.items():
+                stats.latency[phase].record(seconds)
+            stats.statuses[str(status)] += 1
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+
+    def merge(self, other: 'RequestMetrics'):
+        with self._lock:
+            for key, stats in other.endpoints.items():
+                self.endpoints.setdefault(key, EndpointStats()).merge(stats)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                f'{method} {endpoint}': {
+                    'count': stats.count,
+                    'statuses': dict(stats.statuses),
+                    'request_bytes': stats.request_bytes,
+                    'response_bytes': stats.response_bytes,
+                    'latency': {phase: histogram.summary() for phase, histogram in stats.latency.items()},
+                }
+                for (method, endpoint), stats in sorted(self.endpoints.items())
+            }
+
+    def to_json(self, path: str = None) -> str:
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(text)
+        return text
+
+    def to_prometheus(self, path: str = None) -> str:
+        families = {
+            'petfriends_request_duration_seconds': ('histogram', 'Duration of PetFriends API requests.', []),
+            'petfriends_request_phase_seconds_total': ('counter', 'Time spent in each request phase.', []),
+            'petfriends_requests_total': ('counter', 'PetFriends API requests by status.', []),
+            'petfriends_request_bytes_total': ('counter', 'Bytes sent in PetFriends API requests.', []),
+            'petfriends_response_bytes_total': ('counter', 'Bytes received in PetFriends API responses.', []),
+        }
+        with self._lock:
+            for (method, endpoint), stats in sorted(self.endpoints.items()):
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                total = stats.latency['total']
+                samples = families['petfriends_request_duration_seconds'][2]
+                for bound in PROMETHEUS_BUCKETS:
+                    samples.append(f'_bucket{{{labels},le="{bound}"}} {total.count_below(bound)}')
+                samples.append(f'_bucket{{{labels},le="+Inf"}} {total.count}')
+                samples.append(f'_sum{{{labels}}} {total.total / 1_000_000}')
+                samples.append(f'_count{{{labels}}} {total.count}')
+                for phase in PHASES[1:]:
+                    families['petfriends_request_phase_seconds_total'][2].append(
+                        f'{{{labels},phase="{phase}"}} {stats.latency[phase].total / 1_000_000}')
+                for status, count in sorted(stats.statuses.items()):
+                    families['petfriends_requests_total'][2].append(f'{{{labels},status="{status}"}} {count}')
+                families['petfriends_request_bytes_total'][2].append(f'{{{labels}}} {stats.request_bytes}')
+                families['petfriends_response_bytes_total'][2].append(f'{{{labels}}} {stats.response_bytes}')
+
+        lines = []
+        for name, (kind, description, samples) in families.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines += [name + sample for sample in samples]
+        text = '\n'.join(lines) + '\n'
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(text)
+        return text
+
+
+# Время установки соединений в текущем потоке: urllib3 не сообщает его в ответе, поэтому его накапливают
+# соединения пула (см. install_connect_timer)
+_connect_time = threading.local()
+
+
+def take_connect_time() -> float:
+    """Возвращает время, потраченное на установку соединений в текущем потоке с прошлого вызова."""
+
+    seconds = getattr(_connect_time, 'seconds', 0.0)
+    _connect_time.seconds = 0.0
+    return seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, 'seconds', 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, 'seconds', 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def install_connect_timer(adapter):
+    """Подменяет классы пулов соединений адаптера requests так, чтобы время установки соединений
+    (TCP и TLS) учитывалось в take_connect_time."""
+
+    adapter.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                  'https': _TimedHTTPSConnectionPool}
+
+
+# Общий сборщик метрик тестовой сессии: его используют клиенты в тестах, а conftest выгружает в конце сессии
+session_metrics = RequestMetrics()
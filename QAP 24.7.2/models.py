@@ -0,0 +1,83 @@
+import base64
+import json
+from typing import NamedTuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(content: bytes):
+    """Разбирает JSON из тела ответа. Если установлен orjson, используется он, иначе стандартный json.
+    В обоих случаях при ошибке разбора вызывается json.decoder.JSONDecodeError."""
+
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class PetPhoto:
+    """Фото питомца в виде data URL (data:image/jpeg;base64,...), как его возвращает сервер. Строка
+    хранится без копирования, а MIME-тип и байты изображения извлекаются из неё только при обращении.
+    Сравнивается на равенство со строкой data URL и с другим PetPhoto; пустое фото ложно."""
+
+    __slots__ = ('url',)
+
+    def __init__(self, url: str):
+        self.url = url or ''
+
+    @property
+    def mime(self) -> str:
+        """MIME-тип изображения или пустая строка, если фото нет."""
+
+        if not self.url.startswith('data:'):
+            return ''
+        end = self.url.find(';', 5, 64)
+        return self.url[5:end] if end != -1 else ''
+
+    @property
+    def data(self) -> bytes:
+        """Байты изображения. Декодируются из base64 при каждом обращении и не сохраняются."""
+
+        comma = self.url.find(',', 0, 128)
+        if comma == -1:
+            return b''
+        return base64.b64decode(self.url[comma + 1:])
+
+    def __bool__(self) -> bool:
+        return bool(self.url)
+
+    def __len__(self) -> int:
+        return len(self.url)
+
+    def __str__(self) -> str:
+        return self.url
+
+    def __repr__(self) -> str:
+        return f'PetPhoto({self.mime or "-"}, {len(self.url)} символов)'
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PetPhoto):
+            return self.url == other.url
+        if isinstance(other, str):
+            return self.url == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.url)
+
+
+class Pet(NamedTuple):
+    """Питомец из списка API PetFriends: только используемые в тестах поля, без словаря на каждую запись."""
+
+    id: str
+    name: str
+    animal_type: str
+    age: str
+    pet_photo: PetPhoto
+
+    @classmethod
+    def from_dict(cls, item: dict) -> 'Pet':
+        return cls(item.get('id'), item.get('name'), item.get('animal_type'), item.get('age'),
+                   PetPhoto(item.get('pet_photo')))
@@ -0,0 +1,114 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from api import PetFriends
+from models import Pet
+
+
+class PetSpec(NamedTuple):
+    """Описание питомца для заготовки: photo - путь к фото (None - питомец создаётся без фото)."""
+
+    name: str
+    animal_type: str
+    age: str
+    photo: str = None
+
+
+IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Tests', 'Images')
+
+# Питомцы, заготавливаемые для тестов по умолчанию: по одному на каждый тест, которому нужен свой питомец
+SEED_PETS = (
+    PetSpec('Мурзик', 'британец', '3', os.path.join(IMAGES, 'cat1.jpg')),
+    PetSpec('Барсик', 'сиамский', '5', os.path.join(IMAGES, 'cat1.jpg')),
+    PetSpec('Шарик', 'дворняга', '2'),
+    PetSpec('Рекс', 'овчарка', '4'),
+    PetSpec('Пушок', 'перс', '1'),
+    PetSpec('Тузик', 'такса', '6'),
+    PetSpec('Снежок', 'ангора', '7'),
+    PetSpec('Рыжик', 'мейн-кун', '8'),
+)
+
+
+class PetFactory:
+    """Заготовка питомцев для тестов API на одну тестовую сессию.
+
+    seed создаёт все питомцы из specs одним параллельным проходом (workers запросов одновременно), take
+    выдаёт каждому тесту своего питомца, которого больше не получит ни один другой тест, а teardown одним
+    параллельным проходом удаляет всех созданных фабрикой и зарегистрированных через track питомцев. Так
+    тесты не зависят от содержимого my_pets и друг от друга и могут выполняться в любом порядке."""
+
+    def __init__(self, pf: PetFriends, auth_key: dict, specs: tuple = SEED_PETS, workers: int = 8):
+        self.pf = pf
+        self.auth_key = auth_key
+        self.specs = specs
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._available = []
+        # ID всех питомцев, которых нужно удалить в teardown
+        self._created = []
+
+    def _create(self, spec: PetSpec) -> Pet:
+        if spec.photo is None:
+            status, result = self.pf.create_pet_simple(self.auth_key, spec.name, spec.animal_type, spec.age)
+        else:
+            status, result = self.pf.add_new_pet(self.auth_key, spec.name, spec.animal_type, spec.age, spec.photo)
+        if status != 200 or not isinstance(result, dict):
+            raise Exception(f'Не удалось создать питомца {spec.name}: {status} {result}')
+        self.track(result['id'])
+        return Pet.from_dict(result)
+
+    def seed(self):
+        """Создаёт всех питомцев из specs. Если часть запросов завершилась ошибкой, созданные питомцы всё
+        равно попадают в список на удаление, а затем вызывается исключение."""
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            futures = [executor.submit(self._create, spec) for spec in self.specs]
+        errors = []
+        for future in futures:
+            try:
+                pet = future.result()
+            except Exception as error:
+                errors.append(str(error))
+            else:
+                with self._lock:
+                    self._available.append(pet)
+        if errors:
+            raise Exception('Заготовка питомцев не удалась: ' + '; '.join(errors))
+
+    def take(self, spec: PetSpec = None) -> Pet:
+        """Выдаёт питомца, который больше не достанется ни одному тесту. Если передан spec или заготовленные
+        питомцы закончились, питомец создаётся отдельным запросом."""
+
+        if spec is None:
+            with self._lock:
+                if self._available:
+                    return self._available.pop()
+            spec = self.specs[0] if self.specs else PetSpec('Питомец', 'кот', '1')
+        return self._create(spec)
+
+    def track(self, pet_id: str):
+        """Регистрирует питомца, созданного тестом самостоятельно, для удаления в teardown."""
+
+        with self._lock:
+            self._created.append(pet_id)
+
+    def teardown(self) -> list:
+        """Удаляет всех зарегистрированных питомцев и возвращает ID тех, кого удалить не удалось (кроме уже
+        удалённых самими тестами). Ошибки отдельных запросов не прерывают удаление остальных."""
+
+        with self._lock:
+            pet_ids, self._created = self._created, []
+            self._available = []
+
+        def delete(pet_id: str) -> bool:
+            try:
+                status, _ = self.pf.delete_pet(self.auth_key, pet_id)
+            except Exception:
+                return False
+            return status in (200, 404)
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            results = list(executor.map(delete, pet_ids))
+        return [pet_id for pet_id, deleted in zip(pet_ids, results) if not deleted]
@@ -0,0 +1,109 @@
+import codecs
+import json
+import re
+
+
+# Пробелы и запятые между элементами массива
+SEPARATORS = re.compile(r'[\s,]*')
+# Символы, по которым отслеживается конец элемента: вне строки и внутри строки
+STRUCTURE = re.compile(r'["{}\[\],]')
+STRING_SPECIAL = re.compile(r'["\\]')
+
+
+def iter_json_array(chunks, key: str = 'pets'):
+    """Потоково разбирает JSON-объект вида {"<key>": [...]}, поступающий частями (bytes) из chunks, и по
+    одному возвращает элементы массива key. В памяти одновременно находится только текущий элемент и
+    непрочитанный остаток последней части, поэтому перебор можно прервать после первого элемента, не
+    дочитывая ответ до конца. Конец элемента находится по мере поступления частей с учётом вложенности и строк,
+    каждая часть просматривается один раз, а разбирается элемент только после того, как получен полностью."""
+
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+
+    def read_more() -> bool:
+        nonlocal buffer, pos
+        for chunk in chunks:
+            if chunk:
+                # Уже разобранное начало буфера отбрасывается, чтобы не копировать его при каждом дописывании
+                buffer = buffer[pos:] + text_decoder.decode(chunk)
+                pos = 0
+                return True
+        return False
+
+    start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    while True:
+        match = start.search(buffer)
+        if match is not None:
+            pos = match.end()
+            break
+        if not read_more():
+            raise ValueError(f'В ответе отсутствует массив "{key}"')
+
+    while True:
+        pos = SEPARATORS.match(buffer, pos).end()
+        if pos == len(buffer):
+            if not read_more():
+                raise ValueError(f'Массив "{key}" оборван')
+            continue
+        if buffer[pos] == ']':
+            return
+
+        # Поиск конца элемента. Просмотренная часть элемента отсчитывается от pos, потому что при дочитывании
+        # начало буфера отбрасывается
+        scanned = depth = 0
+        in_string = False
+        end = None
+        while end is None:
+            index = pos + scanned
+            while True:
+                if in_string:
+                    match = STRING_SPECIAL.search(buffer, index)
+                    if match is None:
+                        index = len(buffer)
+                        break
+                    index = match.end()
+                    if match.group() == '"':
+                        in_string = False
+                    elif index == len(buffer):
+                        # Экранированный символ придёт в следующей части
+                        index = match.start()
+                        break
+                    else:
+                        index += 1
+                    continue
+                match = STRUCTURE.search(buffer, index)
+                if match is None:
+                    index = len(buffer)
+                    break
+                token = match.group()
+                index = match.end()
+                if token == '"':
+                    in_string = True
+                elif token in '{[':
+                    depth += 1
+                elif depth == 0:
+                    # Запятая или конец массива после числа, строки или литерала
+                    end = match.start()
+                    break
+                elif token != ',':
+                    depth -= 1
+                    if depth == 0:
+                        end = index
+                        break
+            if end is None:
+                scanned = index - pos
+                if not read_more():
+                    raise ValueError(f'Массив "{key}" оборван')
+
+        item, end = decoder.raw_decode(buffer, pos)
+        pos = end
+        yield item
+
+
+def project(item: dict, fields) -> dict:
+    """Оставляет в записи только поля из fields."""
+
+    return {name: item.get(name) for name in fields}
@@ -0,0 +1,183 @@
+import hashlib
+import io
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Общий для наборов тестов модуль из корня репозитория: путь к нему добавляют conftest.py и loadtest.py
+from image_types import HEADER_SIZE, sniff_mime
+
+
+class MappedFile:
+    """Файл, отображённый в память только для чтения. Атрибут len - количество ещё не прочитанных байт
+    (так размер потока определяют MultipartEncoder и requests), поэтому тело запроса читается прямо из
+    отображения без копирования файла в память процесса."""
+
+    def __init__(self, file):
+        self._file = file
+        size = os.fstat(file.fileno()).st_size
+        # Файл нулевого размера отобразить в память нельзя
+        self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    @property
+    def len(self) -> int:
+        return len(self._map) - self._map.tell() if self._map is not None else 0
+
+    def read(self, size: int = -1) -> bytes:
+        return self._map.read(size) if self._map is not None else b''
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if self._map is not None:
+            self._map.seek(offset, whence)
+        return self.tell()
+
+    def tell(self) -> int:
+        return self._map.tell() if self._map is not None else 0
+
+    def view(self) -> memoryview:
+        """Возвращает содержимое файла без копирования."""
+
+        return memoryview(self._map) if self._map is not None else memoryview(b'')
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class PreparedPhoto:
+    """Подготовленное к загрузке фото: имя файла, MIME-тип и буфер с содержимым (отображённый в память файл
+    или байты в памяти). Используется как контекстный менеджер - при выходе буфер закрывается."""
+
+    def __init__(self, filename: str, mime: str, buffer):
+        self.filename = filename
+        self.mime = mime
+        self.buffer = buffer
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PhotoPipeline:
+    """Подготовка фото питомцев к загрузке на сервер.
+
+    По умолчанию файл передаётся как есть, но с реальным MIME-типом, определённым по содержимому, и читается
+    через отображение в память (mmap). При transcode=True фото перекодируется в JPEG (требуется Pillow):
+    уменьшается так, чтобы большая сторона была не больше max_side, а качество снижается до тех пор, пока
+    размер не станет меньше target_size байт. Перекодированные фото кэшируются по хэшу содержимого в памяти
+    (не более memory_limit байт) и, если указан cache_dir, на диске. Один конвейер можно использовать из
+    нескольких потоков."""
+
+    def __init__(self, transcode: bool = False, max_side: int = 1024, target_size: int = 200 * 1024,
+                 cache_dir: str = None, memory_limit: int = 64 * 1024 * 1024):
+        self.transcode = transcode
+        self.max_side = max_side
+        self.target_size = target_size
+        self.cache_dir = cache_dir
+        self.memory_limit = memory_limit
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def prepare(self, path: str) -> PreparedPhoto:
+        """Возвращает подготовленное к загрузке фото из файла path."""
+
+        file = open(path, 'rb')
+        try:
+            mapped = MappedFile(file)
+        except BaseException:
+            file.close()
+            raise
+
+        with mapped.view() as content:
+            # Файлы неизвестного формата передаются как произвольные двоичные данные
+            mime = sniff_mime(content[:HEADER_SIZE].tobytes()) or 'application/octet-stream'
+            size = len(content)
+        filename = os.path.basename(path)
+        if not self.transcode or mime == 'image/jpeg' and size <= self.target_size:
+            return PreparedPhoto(filename, mime, mapped)
+
+        try:
+            with mapped.view() as content:
+                digest = hashlib.sha256(content).hexdigest()
+                data = self._cached(digest)
+                if data is None:
+                    data = self._transcode(content)
+                    self._store(digest, data)
+        finally:
+            mapped.close()
+
+        # BytesIO, созданный из bytes, не копирует данные, пока в него не пишут
+        return PreparedPhoto(os.path.splitext(filename)[0] + '.jpg', 'image/jpeg', io.BytesIO(data))
+
+    def _cache_key(self, digest: str) -> str:
+        return f'{digest}-{self.max_side}-{self.target_size}'
+
+    def _cache_path(self, digest: str):
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, self._cache_key(digest) + '.jpg')
+
+    def _cached(self, digest: str):
+        key = self._cache_key(digest)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+
+        cache_path = self._cache_path(digest)
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as file:
+                data = file.read()
+            self._remember(key, data)
+        return data
+
+    def _store(self, digest: str, data: bytes):
+        self._remember(self._cache_key(digest), data)
+        cache_path = self._cache_path(digest)
+        if cache_path is not None:
+            tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, cache_path)
+
+    def _remember(self, key: str, data: bytes):
+        with self._lock:
+            # Одно и то же фото могли перекодировать одновременно несколько потоков
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_size -= len(previous)
+            self._memory[key] = data
+            self._memory_size += len(data)
+            while self._memory_size > self.memory_limit and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    def _transcode(self, content: memoryview) -> bytes:
+        if Image is None:
+            raise Exception('Для перекодирования фото требуется библиотека Pillow')
+
+        with Image.open(io.BytesIO(content)) as image:
+            image = image.convert('RGB')
+            image.thumbnail((self.max_side, self.max_side))
+            for quality in (85, 75, 65, 50, 35):
+                output = io.BytesIO()
+                image.save(output, 'JPEG', quality=quality, optimize=True)
+                if output.tell() <= self.target_size:
+                    break
+        return output.getvalue()
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CachedResponse:
+    """Сохранённый ответ сервера: код состояния, результат и валидаторы ETag / Last-Modified."""
+
+    __slots__ = ('status', 'result', 'etag', 'last_modified', 'size', 'stored_at')
+
+    def __init__(self, status: int, result, etag: str, last_modified: str, size: int):
+        self.status = status
+        self.result = result
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = size
+        self.stored_at = time.monotonic()
+
+
+class ResponseCache:
+    """Потокобезопасный LRU-кэш ответов на GET-запросы к API PetFriends.
+
+    Ответ считается свежим ttl секунд и возвращается без обращения к серверу. Устаревший ответ с ETag или
+    Last-Modified перепроверяется условным запросом: при ответе 304 используется сохранённый результат.
+    Кэш хранит не больше max_entries ответов общим размером не больше max_bytes байт и вытесняет давно не
+    использованные. Результат из кэша общий для всех вызовов - изменять его нельзя."""
+
+    def __init__(self, ttl: float = 30, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    @staticmethod
+    def key(path: str, params: dict, auth_key: str) -> tuple:
+        """Ключ кэша: адрес, параметры запроса и API ключ пользователя."""
+
+        return path, tuple(sorted((params or {}).items())), auth_key
+
+    def get(self, key: tuple):
+        """Возвращает сохранённый ответ (свежий или устаревший) или None."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.monotonic() - entry.stored_at < self.ttl
+
+    def put(self, key: tuple, entry: CachedResponse):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._size += entry.size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def revalidated(self, entry: CachedResponse):
+        """Отмечает, что сервер подтвердил актуальность ответа (304 Not Modified)."""
+
+        entry.stored_at = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Общий кэш ответов тестовой сессии: запросы, изменяющие данные, через любой клиент тестов очищают его для всех
+session_response_cache = ResponseCache()
@@ -1,5 +1,13 @@
+import os
+
 valid_email = "bjanka@mail.ru"
 valid_password = "11111"
 
 invalid_email = "jhgknbh@mail.ru"
-invalid_password = "22222"
\ No newline at end of file
+invalid_password = "22222"
+
+# Адрес сервера PetFriends: можно указать локальный fake_server для прогонов без сети
+base_url = os.environ.get('PETFRIENDS_BASE_URL', 'https://petfriends.skillfactory.ru/')
+
+# Файл для хранения API ключей между запусками тестов (если не задан - ключи хранятся только в памяти)
+auth_cache_path = os.environ.get('PETFRIENDS_AUTH_CACHE')
\ No newline at end of file
@@ -1,37 +1,13 @@
 # ЗАДАНИЕ 30.3.1
 # ЯВНЫЕ ОЖИДАНИЯ
 
-import pytest
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
+from invariants import check_pets, UNIQUE_NAMES
 
 
-def test_all_pets_have_different_names(go_to_my_pets):
+def test_all_pets_have_different_names(my_pets_page):
     '''Проверка того, что на странице "Мои питомцы" у всех питомцев разные имена'''
 
-    # Установка явного ожидания
-    element = WebDriverWait(pytest.driver, 10).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, '.table.table-hover tbody tr')))
+    # Имена всех питомцев проверяются за один проход, в отчёте перечисляются строки с повторяющимися именами
+    report = check_pets(my_pets_page.rows, rules=(UNIQUE_NAMES,))
 
-    # Сохранение элементов с данными о питомцах в переменную "pet_data"
-    pet_data = pytest.driver.find_elements(By.CSS_SELECTOR, '.table.table-hover tbody tr')
-
-    # Перебираются данные из переменной "pet_data"
-    # Сохраняются имя, возраст и порода, остальное меняется на пустую строку и разделяется по пробелу
-    # Выбираются имена и добавляются в список "pets_name"
-    pets_name = []
-    for i in range(len(pet_data)):
-        data_pet = pet_data[i].text.replace('\n', '').replace('×', '')
-        split_data_pet = data_pet.split(' ')
-        pets_name.append(split_data_pet[0])
-
-    # Перебираются имена и, если имя повторяется, к счетчику "r" прибавляется единица
-    # Если r == 0, то повторяющихся имен нет
-    r = 0
-    for i in range(len(pets_name)):
-        if pets_name.count(pets_name[i]) > 1:
-            r += 1
-    assert r == 0
-    print(r)
-    print(pets_name)
\ No newline at end of file
+    assert report.ok, report
\ No newline at end of file
@@ -0,0 +1,59 @@
+# Разбор HTML страниц для режима --no-browser: оба парсера (lxml и html.parser) дают одинаковые снимки
+
+import pytest
+
+import html_pages
+from html_pages import parse_pets_page
+from snapshot import PetRow
+
+
+MY_PETS_HTML = '''<html><body>
+<div class=".col-sm-4 left">
+  <h2>bjanka</h2>
+  Питомцев: 2<br>Друзей: 0
+  <div>Сообщений: 0</div>
+</div>
+<table class="table table-hover">
+  <thead><tr><th></th><th>Имя</th><th>Порода</th><th>Возраст</th></tr></thead>
+  <tbody>
+    <tr><th><img src="/photos/1.jpg"></th><td>Барсик</td><td>кот</td><td>3</td></tr>
+    <tr><th><img src=""></th><td> Шарик </td><td>пёс</td><td>5</td></tr>
+  </tbody>
+</table>
+</body></html>'''
+
+ALL_PETS_HTML = '''<html><body><div class="card-deck">
+  <div class="card"><img class="card-img-top" src="data:image/jpeg;base64,/9j/">
+    <div class="card-body"><h5 class="card-title">Барсик</h5><p class="card-text">кот, 3 лет</p></div>
+  </div>
+  <div class="card"><img class="card-img-top" src="">
+    <div class="card-body"><h5 class="card-title">Шарик</h5><p class="card-text">пёс, 5 лет</p></div>
+  </div>
+</div></body></html>'''
+
+MY_PETS_ROWS = [PetRow('Барсик', 'кот', '3', 'http://example.com/photos/1.jpg'), PetRow('Шарик', 'пёс', '5', '')]
+ALL_PETS_ROWS = [PetRow('Барсик', 'кот', '3', 'data:image/jpeg;base64,/9j/'), PetRow('Шарик', 'пёс', '5', '')]
+
+
+@pytest.fixture(params=['lxml', 'html.parser'])
+def parser(request, monkeypatch):
+    if request.param == 'lxml':
+        pytest.importorskip('lxml')
+        assert html_pages.etree is not None
+    else:
+        monkeypatch.setattr(html_pages, 'etree', None)
+    return request.param
+
+
+def test_parse_my_pets(parser):
+    snapshot = parse_pets_page(MY_PETS_HTML, 'http://example.com/my_pets')
+
+    assert snapshot.rows == MY_PETS_ROWS
+    assert snapshot.statistics == 'bjanka\nПитомцев: 2\nДрузей: 0\nСообщений: 0'
+    assert snapshot.pets_count == 2
+
+
+def test_parse_all_pets(parser):
+    snapshot = parse_pets_page(ALL_PETS_HTML, 'http://example.com/all_pets')
+
+    assert snapshot.rows == ALL_PETS_ROWS
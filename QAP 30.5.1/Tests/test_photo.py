@@ -1,40 +1,21 @@
 # ЗАДАНИЕ 30.3.1
 # ЯВНЫЕ ОЖИДАНИЯ
 
-import pytest
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
+from invariants import check_pets, PHOTO_RATIO
 
 
-def test_photo_availability(go_to_my_pets):
-    '''Проверка того, что на странице "Мои питомцы" хотя бы у половины питомцев есть фото'''
+def test_photo_availability(my_pets_page, photo_checker):
+    '''Проверка того, что на странице "Мои питомцы" хотя бы у половины питомцев есть фото и что все фото
+    действительно загружаются и являются изображениями'''
 
-    # Установка явного ожидания
-    element = WebDriverWait(pytest.driver, 10).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, '.\\.col-sm-4.left')))
+    # Все фото страницы проверяются параллельно без браузера
+    results = photo_checker.check_all(row.photo for row in my_pets_page.rows)
+    broken = [f'строка {number}: {results[row.photo].reason}'
+              for number, row in enumerate(my_pets_page.rows) if row.photo and not results[row.photo].ok]
 
-    # Сохранение элементов статистики в переменную "statistic"
-    statistic = pytest.driver.find_elements(By.CSS_SELECTOR, '.\\.col-sm-4.left')
-
-    # Сохранение элементов с атрибутом "img" в переменную "images"
-    images = pytest.driver.find_elements(By.CSS_SELECTOR, '.table.table-hover img')
-
-    # Получение количества питомцев из данных статистики
-    number = statistic[0].text.split('\n')
-    number = number[1].split(' ')
-    number = int(number[1])
-
-    # Нахождение половины от количества питомцев
-    half = number // 2
-
-    # Нахождение количества питомцев с фотографией
-    number_of_photos = 0
-    for i in range(len(images)):
-        if images[i].get_attribute('src') != '':
-            number_of_photos += 1
+    assert not broken, broken
 
     # Проверка того, что количество питомцев с фотографией больше или равно половине количества питомцев
-    assert number_of_photos >= half
-    print(f'Количество фото: {number_of_photos}')
-    print(f'Половина от числа питомцев: {half}')
\ No newline at end of file
+    report = check_pets(my_pets_page.rows, rules=(PHOTO_RATIO,), photo_ratio=0.5)
+
+    assert report.ok, report
\ No newline at end of file
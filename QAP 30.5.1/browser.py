@@ -0,0 +1,171 @@
+import os
+import threading
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+from pages import LoginPage
+from settings import valid_email, valid_password, base_url, worker_accounts
+
+
+CHROMEDRIVER = './chromedriver.exe'
+
+
+def chrome_options(headless: bool = False, profile_dir: str = None, download_dir: str = None):
+    """Параметры запуска Chrome: headless - без окна, profile_dir - отдельный каталог профиля (у каждого
+    запущенного браузера должен быть свой), download_dir - каталог для загружаемых файлов."""
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+        # Размер окна по умолчанию в режиме headless слишком мал для разметки PetFriends
+        options.add_argument('--window-size=1920,1080')
+    if profile_dir is not None:
+        options.add_argument('--user-data-dir=' + profile_dir)
+    if download_dir is not None:
+        options.add_experimental_option('prefs', {'download.default_directory': download_dir,
+                                                  'download.prompt_for_download': False})
+    return options
+
+
+def start_driver(options=None):
+    """Запускает новый экземпляр Chrome. Если рядом нет chromedriver.exe, драйвер находит Selenium Manager."""
+
+    if os.path.exists(CHROMEDRIVER):
+        return webdriver.Chrome(service=Service(CHROMEDRIVER), options=options)
+    return webdriver.Chrome(options=options)
+
+
+def worker_id() -> str:
+    """Имя текущего процесса pytest-xdist ('gw0', 'gw1', ...) или 'master' при запуске без xdist."""
+
+    return os.environ.get('PYTEST_XDIST_WORKER', 'master')
+
+
+def worker_account(accounts: list = worker_accounts) -> tuple:
+    """Учётная запись (email, пароль) для текущего процесса pytest-xdist."""
+
+    if not accounts:
+        return valid_email, valid_password
+    worker = worker_id()
+    number = int(worker[2:]) if worker.startswith('gw') else 0
+    return accounts[number % len(accounts)]
+
+
+def login(driver, email: str = valid_email, password: str = valid_password):
+    """Авторизация через форму на странице входа. После входа открывается страница всех питомцев."""
+
+    page = LoginPage(driver)
+    if not driver.current_url.startswith(base_url + 'login'):
+        page.open()
+
+    # Ожидание всех полей формы одним скриптом в браузере
+    page.wait_loaded()
+    return page.login(email, password)
+
+
+class BrowserPool:
+    """Пул запущенных браузеров на всю тестовую сессию.
+
+    acquire выдаёт свободный браузер или запускает новый, release сбрасывает состояние браузера (cookies,
+    localStorage и sessionStorage, лишние вкладки, неявное ожидание) и возвращает его в пул вместо закрытия.
+    Если сбросить состояние не удалось, браузер закрывается. В пуле хранится не больше max_idle свободных
+    браузеров, close закрывает все браузеры пула."""
+
+    def __init__(self, factory=start_driver, max_idle: int = 2):
+        self.factory = factory
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = []
+        self._all = []
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        driver = self.factory()
+        with self._lock:
+            self._all.append(driver)
+        return driver
+
+    def release(self, driver):
+        try:
+            self.reset(driver)
+        except WebDriverException:
+            self._quit(driver)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(driver)
+                return
+        self._quit(driver)
+
+    @staticmethod
+    def reset(driver):
+        """Возвращает браузер в исходное состояние без перезапуска."""
+
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.implicitly_wait(0)
+        if driver.current_url.startswith('http'):
+            driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+
+    def _quit(self, driver):
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def close(self):
+        with self._lock:
+            drivers, self._all, self._idle = self._all, [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+
+class AuthSession:
+    """Авторизованная сессия PetFriends для браузеров пула: вход через форму выполняется один раз, полученные
+    cookies сохраняются и подставляются в другие браузеры, поэтому тестам не нужно каждый раз заполнять форму.
+    Если сервер не принял сохранённые cookies (сессия истекла), вход через форму повторяется."""
+
+    def __init__(self, email: str = valid_email, password: str = valid_password):
+        self.email = email
+        self.password = password
+        self.cookies = None
+        self._lock = threading.Lock()
+
+    def _login(self, driver):
+        login(driver, self.email, self.password)
+        self.cookies = driver.get_cookies()
+
+    def open(self, driver, path: str = 'all_pets'):
+        """Открывает страницу path в браузере driver от имени пользователя."""
+
+        with self._lock:
+            if self.cookies is None:
+                self._login(driver)
+                driver.get(base_url + path)
+                return
+            cookies = self.cookies
+
+        # Cookies можно установить только для открытого в браузере домена
+        driver.get(base_url + 'login')
+        for cookie in cookies:
+            driver.add_cookie(cookie)
+        driver.get(base_url + path)
+        if driver.current_url.startswith(base_url + 'login'):
+            with self._lock:
+                self._login(driver)
+            driver.get(base_url + path)
@@ -1,51 +1,142 @@
 # ЯВНЫЕ ОЖИДАНИЯ
+# Тесты можно запускать параллельно: pytest -n auto --headless (нужен pytest-xdist). У каждого процесса
+# свои браузеры, каталоги профилей и загрузок, а при заданных PETFRIENDS_WORKER_ACCOUNTS - своя учётная запись.
+# С опцией --no-browser проверки страницы "Мои питомцы" выполняются по HTML без Chrome, а тесты, которым нужен
+# браузер, пропускаются
 
+import os
+import sys
 import pytest
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
-from settings import valid_email, valid_password
-from selenium import webdriver
 
+# Корень репозитория: общие для наборов тестов профилировщик step_profiler и модуль image_types
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-@pytest.fixture(autouse=True)
-def testing():
-    pytest.driver = webdriver.Chrome('./chromedriver.exe')
+import settings
+import step_profiler
+from settings import base_url
+from browser import BrowserPool, AuthSession, chrome_options, start_driver, worker_account, worker_id
+from html_pages import HtmlSession
+from pages import AllPetsPage
+from photo_check import PhotoChecker
+from waits import wait_stats
 
-    # Переход на страницу авторизации
-    pytest.driver.get('http://petfriends.skillfactory.ru/login')
 
-    yield
+def pytest_addoption(parser):
+    parser.addoption('--headless', action='store_true', help='запускать Chrome без окна')
+    parser.addoption('--no-browser', action='store_true',
+                     help='проверять страницы по HTML без запуска Chrome')
+    step_profiler.add_options(parser)
 
-    pytest.driver.quit()
+
+def pytest_configure(config):
+    step_profiler.configure(config)
+
+
+def pytest_terminal_summary(terminalreporter):
+    # Шаги, на ожидание которых ушло больше всего времени
+    if wait_stats.steps:
+        terminalreporter.write_sep('-', f'ожидания: всего {wait_stats.total():.3f} с')
+        terminalreporter.write_line(wait_stats.report())
+
+
+@pytest.fixture(scope='session')
+def browserless(request):
+    return settings.browserless or request.config.getoption('--no-browser')
+
+
+@pytest.fixture(scope='session')
+def browser_pool(request, tmp_path_factory):
+    # Браузеры запускаются один раз на сессию процесса и переиспользуются тестами
+    headless = settings.headless or request.config.getoption('--headless')
+    download_dir = str(tmp_path_factory.mktemp(f'downloads-{worker_id()}'))
+
+    def factory():
+        # Каталог профиля Chrome блокирует, поэтому у каждого браузера он свой
+        profile_dir = str(tmp_path_factory.mktemp(f'profile-{worker_id()}'))
+        return start_driver(chrome_options(headless, profile_dir, download_dir))
+
+    pool = BrowserPool(factory)
+
+    yield pool
+
+    pool.close()
+
+
+@pytest.fixture(scope='session')
+def auth_session():
+    # Вход через форму выполняется один раз, дальше в браузеры подставляются сохранённые cookies
+    return AuthSession(*worker_account())
+
+
+@pytest.fixture(scope='session')
+def html_session():
+    # Сессия без браузера: вход через форму обычным HTTP-запросом
+    session = HtmlSession(*worker_account())
+
+    yield session
+
+    session.close()
+
+
+@pytest.fixture(scope='session')
+def photo_checker():
+    # Проверка фото без браузера, результаты кэшируются на всю сессию
+    checker = PhotoChecker()
+
+    yield checker
+
+    checker.close()
+
+
+@pytest.fixture()
+def driver(request, browserless):
+    if browserless:
+        pytest.skip('тест выполняется только в браузере')
+    browser_pool = request.getfixturevalue('browser_pool')
+    # Страницу открывает AuthSession.open или сам тест: лишняя загрузка страницы входа здесь удваивала бы время
+    driver = browser_pool.acquire()
+
+    yield driver
+
+    # Сброс состояния браузера и возврат в пул
+    browser_pool.release(driver)
+
+
+@pytest.fixture()
+def authorized(driver, auth_session):
+    # Открытие главной страницы пользователя с сохранёнными cookies вместо ввода эл.почты и пароля
+    auth_session.open(driver, 'all_pets')
 
 
 @pytest.fixture()
-def go_to_my_pets():
-    # Установка явного ожидания
-    element = WebDriverWait(pytest.driver, 10).until(
-        EC.presence_of_element_located((By.ID, 'email')))
+def go_to_my_pets(driver, authorized):
+    # Ожидание ссылки "Мои питомцы" и клик по ней
+    return AllPetsPage(driver).go_to_my_pets()
 
-    # Ввод эл.почты
-    pytest.driver.find_element(By.ID, 'email').send_keys(valid_email)
 
-    # Установка явного ожидания
-    element = WebDriverWait(pytest.driver, 10).until(
-        EC.presence_of_element_located((By.ID, 'pass')))
+@pytest.fixture()
+def my_pets_page(request, browserless):
+    # Снимок страницы "Мои питомцы": без браузера - по HTML страницы, иначе - из открытой в браузере страницы
+    if browserless:
+        return request.getfixturevalue('html_session').my_pets()
+
+    # Ожидание статистики и таблицы питомцев одним скриптом в браузере
+    page = request.getfixturevalue('go_to_my_pets').wait_loaded()
 
-    # Ввод пароля
-    pytest.driver.find_element(By.ID, 'pass').send_keys(valid_password)
+    return page.snapshot()
 
-    # Установка явного ожидания
-    element = WebDriverWait(pytest.driver, 10).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, "button[type='submit']")))
 
-    # Клик по кнопе "Войти"
-    pytest.driver.find_element(By.CSS_SELECTOR, 'button[type="submit"]').click()
+@pytest.fixture()
+def all_pets_page(request, browserless):
+    # Снимок страницы всех питомцев: без браузера - по HTML страницы, иначе - из открытой в браузере страницы
+    if browserless:
+        return request.getfixturevalue('html_session').all_pets()
+
+    driver = request.getfixturevalue('driver')
+    request.getfixturevalue('authorized')
 
-    # Установка явного ожидания
-    element = WebDriverWait(pytest.driver, 10).until(
-        EC.presence_of_element_located((By.LINK_TEXT, 'Мои питомцы')))
+    # Проверка того, что осуществлен переход на главную страницу пользователя
+    assert driver.current_url == base_url + 'all_pets'
 
-    # Клик по ссылке "Мои питомцы"
-    pytest.driver.find_element(By.LINK_TEXT, 'Мои питомцы').click()
\ No newline at end of file
+    # Ожидание карточек питомцев одним скриптом в браузере
+    return AllPetsPage(driver).wait_loaded().snapshot()
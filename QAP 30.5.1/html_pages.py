@@ -0,0 +1,215 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+from settings import valid_email, valid_password, base_url
+from snapshot import PetRow, PageSnapshot
+
+
+# Блочные элементы: в тексте блока статистики они начинаются с новой строки и после них начинается новая строка
+BLOCK_TAGS = frozenset({'div', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'tr'})
+
+
+class _PetsTarget:
+    """Разбор страниц "Мои питомцы" и всех питомцев по событиям парсера (начало и конец тега, текст) в те же
+    строки PetRow, что возвращают снимки страниц в браузере. Один и тот же разбор используется и с парсером
+    lxml (интерфейс target), и со стандартным html.parser."""
+
+    def __init__(self, page_url: str):
+        self.page_url = page_url
+        self.rows = []
+        self.statistics = []
+        # Текущая строка таблицы или карточка: [имя, порода, возраст, фото] или описание карточки
+        self.row = None
+        self.card = None
+        # Поле, текст которого собирается сейчас: (ключ, тег, вложенность тега)
+        self.field = None
+        self.text = []
+        self.cell = 0
+        self.in_table = 0
+        self.in_tbody = False
+        self.in_statistics = 0
+        self.card_depth = 0
+
+    def _photo(self, attrs: dict) -> str:
+        src = attrs.get('src') or ''
+        return urljoin(self.page_url, src) if src else ''
+
+    def start(self, tag: str, attrs: dict):
+        classes = (attrs.get('class') or '').split()
+        if self.field is not None and tag == self.field[1]:
+            self.field = (self.field[0], tag, self.field[2] + 1)
+
+        if self.in_statistics:
+            if tag == 'div':
+                self.in_statistics += 1
+            # Блочный элемент, как и перевод строки, начинается с новой строки
+            if tag == 'br' or tag in BLOCK_TAGS:
+                self.statistics.append('\n')
+        elif tag == 'div' and '.col-sm-4' in classes and 'left' in classes:
+            self.in_statistics = 1
+
+        if tag == 'table' and 'table-hover' in classes:
+            self.in_table += 1
+        elif self.in_table and tag == 'tbody':
+            self.in_tbody = True
+        elif self.in_tbody and tag == 'tr':
+            self.row = ['', '', '', '']
+            self.cell = 0
+        elif self.row is not None:
+            if tag == 'td':
+                self._begin(self.cell, tag)
+                self.cell += 1
+            elif tag == 'img' and not self.row[3]:
+                self.row[3] = self._photo(attrs)
+
+        if self.card is not None:
+            if tag == 'div':
+                self.card_depth += 1
+            if 'card-title' in classes:
+                self._begin('name', tag)
+            elif 'card-text' in classes:
+                self._begin('description', tag)
+            elif tag == 'img' and 'card-img-top' in classes:
+                self.card['photo'] = self._photo(attrs)
+        elif tag == 'div' and 'card' in classes:
+            self.card = {'name': '', 'description': '', 'photo': ''}
+            self.card_depth = 1
+
+    def _begin(self, key, tag: str):
+        self.field = (key, tag, 1)
+        self.text = []
+
+    def end(self, tag: str):
+        if self.field is not None and tag == self.field[1]:
+            key, _, depth = self.field
+            if depth > 1:
+                self.field = (key, tag, depth - 1)
+            else:
+                self.field = None
+                value = ' '.join(''.join(self.text).split())
+                if self.card is not None:
+                    self.card[key] = value
+                elif self.row is not None and key < 3:
+                    self.row[key] = value
+
+        if self.in_statistics:
+            if tag in BLOCK_TAGS:
+                self.statistics.append('\n')
+            if tag == 'div':
+                self.in_statistics -= 1
+        if tag == 'table' and self.in_table:
+            self.in_table -= 1
+        elif tag == 'tbody':
+            self.in_tbody = False
+        elif tag == 'tr' and self.row is not None:
+            self.rows.append(PetRow(*self.row))
+            self.row = None
+        if self.card is not None and tag == 'div':
+            self.card_depth -= 1
+            if not self.card_depth:
+                self._end_card()
+
+    def _end_card(self):
+        # Описание карточки имеет вид "порода, возраст лет"
+        animal_type, comma, age = self.card['description'].rpartition(',')
+        if not comma:
+            animal_type, age = age, ''
+        self.rows.append(PetRow(self.card['name'], animal_type.strip(), re.sub(r'\s*лет$', '', age.strip()),
+                                self.card['photo']))
+        self.card = None
+
+    def data(self, text: str):
+        if self.field is not None:
+            self.text.append(text)
+        if self.in_statistics:
+            # Переводы строк в разметке не видны на странице, как и в тексте элемента в браузере
+            self.statistics.append(' '.join(text.split()) if text.strip() else ' ')
+
+    def close(self) -> PageSnapshot:
+        lines = (line.strip() for line in ''.join(self.statistics).split('\n'))
+        return PageSnapshot(self.rows, '\n'.join(line for line in lines if line))
+
+
+class _StdlibParser(HTMLParser):
+    """Передаёт события html.parser в _PetsTarget."""
+
+    def __init__(self, target: _PetsTarget):
+        super().__init__()
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def parse_pets_page(html: str, page_url: str = base_url) -> PageSnapshot:
+    """Разбирает HTML страницы "Мои питомцы" или всех питомцев. Если установлен lxml, используется его
+    парсер, иначе стандартный html.parser. Адреса фото дополняются до абсолютных относительно page_url, как
+    это делает браузер."""
+
+    target = _PetsTarget(page_url)
+    if etree is not None:
+        return etree.fromstring(html, etree.HTMLParser(target=target))
+    parser = _StdlibParser(target)
+    parser.feed(html)
+    parser.close()
+    return target.close()
+
+
+class HtmlSession:
+    """Авторизованная сессия PetFriends без браузера: вход выполняется отправкой формы входа обычным HTTP-запросом,
+    а страницы "Мои питомцы" и всех питомцев загружаются и разбираются в PageSnapshot."""
+
+    def __init__(self, email: str = valid_email, password: str = valid_password, url: str = None):
+        self.email = email
+        self.password = password
+        self.base_url = url or base_url
+        self.session = requests.Session()
+        self.logged_in = False
+
+    def login(self) -> str:
+        """Выполняет вход через форму и возвращает адрес страницы, на которую перенаправил сервер. Если вход
+        не удался - вызывается исключение."""
+
+        res = self.session.post(self.base_url + 'login', data={'email': self.email, 'pass': self.password})
+        if res.status_code != 200 or res.url.startswith(self.base_url + 'login'):
+            raise Exception(f'Не удалось войти как {self.email}: {res.status_code} {res.url}')
+        self.logged_in = True
+        return res.url
+
+    def page(self, path: str) -> PageSnapshot:
+        if not self.logged_in:
+            self.login()
+        res = self.session.get(self.base_url + path)
+        if res.url.startswith(self.base_url + 'login'):
+            # Сессия истекла - вход выполняется заново
+            self.login()
+            res = self.session.get(self.base_url + path)
+        res.raise_for_status()
+        return parse_pets_page(res.text, res.url)
+
+    def my_pets(self) -> PageSnapshot:
+        return self.page('my_pets')
+
+    def all_pets(self) -> PageSnapshot:
+        return self.page('all_pets')
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,102 @@
+from typing import NamedTuple
+
+
+# Правила проверки списка питомцев
+UNIQUE_NAMES = 'unique_names'
+UNIQUE_PETS = 'unique_pets'
+REQUIRED = 'required'
+PHOTO_RATIO = 'photo_ratio'
+COUNT = 'count'
+
+RULES = (UNIQUE_NAMES, UNIQUE_PETS, REQUIRED, PHOTO_RATIO, COUNT)
+
+
+class Violation(NamedTuple):
+    """Нарушение правила: номера строк (с 0), на которых оно обнаружено, и описание."""
+
+    rule: str
+    rows: tuple
+    message: str
+
+
+class InvariantReport:
+    """Результат проверки списка питомцев: нарушения по правилам. При выводе (например, в сообщении assert)
+    перечисляет все нарушения с номерами строк."""
+
+    def __init__(self, checked: tuple):
+        self.checked = checked
+        self.violations = []
+
+    def add(self, rule: str, rows, message: str):
+        self.violations.append(Violation(rule, tuple(rows), message))
+
+    def __getitem__(self, rule: str) -> list:
+        return [violation for violation in self.violations if violation.rule == rule]
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def __str__(self) -> str:
+        if self.ok:
+            return 'Нарушений нет: ' + ', '.join(self.checked)
+        lines = []
+        for violation in self.violations:
+            rows = f' (строки {", ".join(map(str, violation.rows))})' if violation.rows else ''
+            lines.append(f'{violation.rule}: {violation.message}{rows}')
+        return '\n'.join(lines)
+
+    # pytest выводит сообщение assert через repr
+    __repr__ = __str__
+
+
+def check_pets(rows, rules: tuple = RULES, required: tuple = ('name', 'animal_type', 'age'),
+               photo_ratio: float = 0.5, expected_count: int = None, photo_field: str = 'photo',
+               max_rows: int = 20) -> InvariantReport:
+    """Проверяет список питомцев rows (PetRow или любые записи с полями name, animal_type, age и photo_field)
+    за один проход со словарями, то есть за линейное время:
+    UNIQUE_NAMES - имена всех питомцев разные;
+    UNIQUE_PETS - нет питомцев с одинаковыми именем, породой и возрастом;
+    REQUIRED - у каждого питомца заполнены поля required;
+    PHOTO_RATIO - фото есть не меньше чем у доли photo_ratio питомцев (с округлением вниз);
+    COUNT - количество питомцев равно expected_count (например, числу из блока статистики; правило
+    проверяется, только если expected_count передан).
+    В отчёте для каждой группы одинаковых питомцев указываются все её строки, а для правил, нарушенных на
+    отдельных строках, - не больше max_rows номеров."""
+
+    report = InvariantReport(rules)
+    names = {} if UNIQUE_NAMES in rules else None
+    pets = {} if UNIQUE_PETS in rules else None
+    missing = {}
+    photos = 0
+    count = 0
+
+    for number, row in enumerate(rows):
+        count += 1
+        if names is not None:
+            names.setdefault(row.name, []).append(number)
+        if pets is not None:
+            pets.setdefault((row.name, row.animal_type, row.age), []).append(number)
+        if REQUIRED in rules:
+            for field in required:
+                if not getattr(row, field):
+                    missing.setdefault(field, []).append(number)
+        if getattr(row, photo_field):
+            photos += 1
+
+    if names is not None:
+        for name, numbers in names.items():
+            if len(numbers) > 1:
+                report.add(UNIQUE_NAMES, numbers, f'повторяется имя {name!r}')
+    if pets is not None:
+        for (name, animal_type, age), numbers in pets.items():
+            if len(numbers) > 1:
+                report.add(UNIQUE_PETS, numbers, f'повторяется питомец {name!r}, {animal_type!r}, {age!r}')
+    for field, numbers in missing.items():
+        report.add(REQUIRED, numbers[:max_rows], f'не заполнено поле {field} (питомцев: {len(numbers)})')
+    if PHOTO_RATIO in rules and photos < int(photo_ratio * count):
+        report.add(PHOTO_RATIO, (), f'фото есть у {photos} из {count} питомцев, требуется не меньше '
+                                    f'{int(photo_ratio * count)}')
+    if COUNT in rules and expected_count is not None and count != expected_count:
+        report.add(COUNT, (), f'на странице {count} питомцев, ожидалось {expected_count}')
+    return report
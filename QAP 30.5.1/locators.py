@@ -0,0 +1,21 @@
+from selenium.webdriver.common.by import By
+
+
+# Селекторы страниц PetFriends: используются объектами страниц (pages.py) и снимками страниц (snapshot.py)
+
+# Страница входа
+EMAIL = '#email'
+PASSWORD = '#pass'
+SUBMIT = 'button[type="submit"]'
+
+# Меню пользователя
+MY_PETS_LINK = (By.LINK_TEXT, 'Мои питомцы')
+
+# Страница "Мои питомцы"
+STATISTICS = '.\\.col-sm-4.left'
+PETS_TABLE = '.table.table-hover'
+PET_ROWS = '.table.table-hover tbody tr'
+
+# Страница всех питомцев
+PET_CARDS = '.card-deck .card'
+CARD_TITLES = '.card-deck .card-title'
@@ -0,0 +1,158 @@
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.support import expected_conditions as EC
+
+from locators import EMAIL, PASSWORD, SUBMIT, MY_PETS_LINK, STATISTICS, PETS_TABLE, PET_ROWS, CARD_TITLES
+from settings import base_url
+from snapshot import PageSnapshot, snapshot_my_pets, snapshot_all_pets
+from waits import wait_all, wait_for_selectors
+
+
+# Поиск элементов по нескольким CSS-селекторам одним вызовом WebDriver. Вместе с элементами возвращается
+# метка документа: она записывается в window при первом поиске и пропадает после перехода на другую страницу
+FIND_ALL_JS = r'''
+var token = window.__pageToken || (window.__pageToken = Math.random().toString(36).slice(2));
+return [token, arguments[0].map(function (selector) {
+    return Array.prototype.slice.call(document.querySelectorAll(selector));
+})];
+'''
+
+
+class Page:
+    """Объект страницы PetFriends.
+
+    Найденные элементы хранятся до ухода со страницы, поэтому повторный доступ к ним не требует запросов к
+    браузеру. Элементы по нескольким CSS-селекторам ищутся одним вызовом WebDriver (find_all, find), локаторы
+    других видов (кортеж (By, значение)) - обычным поиском. Кэш сбрасывается при переходах через методы
+    страницы (open, navigate), а также при поиске, если браузер успел перейти на другой документ. После
+    перехода в обход объекта страницы нужно вызвать invalidate или создать новый объект."""
+
+    path = ''
+    # Селекторы, появления которых нужно дождаться после открытия страницы, и название страницы для учёта ожиданий
+    ready = ()
+    title = ''
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._elements = {}
+        self._token = None
+        self._snapshot = None
+
+    def invalidate(self):
+        self._elements.clear()
+        self._token = None
+        self._snapshot = None
+
+    def open(self):
+        self.driver.get(base_url + self.path)
+        self.invalidate()
+        return self
+
+    def wait_loaded(self, timeout: float = 10):
+        """Ожидает появления элементов ready одним скриптом в браузере."""
+
+        wait_for_selectors(self.driver, self.ready, timeout, step=self.title or self.path)
+        return self
+
+    def find_all(self, *locators) -> list:
+        """Возвращает для каждого локатора список найденных элементов. Элементы, которых ещё нет в кэше, по всем
+        CSS-селекторам ищутся одним вызовом WebDriver. Если браузер перешёл на другой документ, поиск повторяется
+        один раз, а если документ сменился и во время повтора - вызывается StaleElementReferenceException."""
+
+        for attempt in range(2):
+            selectors = [locator for locator in locators if isinstance(locator, str) and locator not in self._elements]
+            if not selectors:
+                break
+            token, found = self.driver.execute_script(FIND_ALL_JS, selectors)
+            if self._token is not None and token != self._token:
+                # Браузер перешёл на другой документ: ранее найденные элементы недействительны
+                self.invalidate()
+                if attempt:
+                    raise StaleElementReferenceException('Документ в браузере сменился во время поиска элементов '
+                                                         + ', '.join(map(str, locators)))
+            self._token = token
+            self._elements.update(zip(selectors, found))
+        missing = [locator for locator in locators if locator not in self._elements]
+        for locator in missing:
+            if not isinstance(locator, str):
+                self._elements[locator] = self.driver.find_elements(*locator)
+        return [self._elements[locator] for locator in locators]
+
+    def find(self, *locators) -> list:
+        """Возвращает первый элемент по каждому локатору. Если какой-то элемент не найден - вызывается
+        NoSuchElementException."""
+
+        elements = []
+        for locator, found in zip(locators, self.find_all(*locators)):
+            if not found:
+                raise NoSuchElementException(f'Не найден элемент {locator}')
+            elements.append(found[0])
+        return elements
+
+    def navigate(self, element, page: type) -> 'Page':
+        """Клик по элементу, выполняющий переход на страницу класса page. Кэш текущей страницы сбрасывается."""
+
+        element.click()
+        self.invalidate()
+        return page(self.driver)
+
+
+class LoginPage(Page):
+    path = 'login'
+    ready = (EMAIL, PASSWORD, SUBMIT)
+    title = 'форма входа'
+
+    def login(self, email: str, password: str) -> 'AllPetsPage':
+        """Авторизация через форму. После входа открывается страница всех питомцев."""
+
+        # Все поля формы находятся одним запросом к браузеру
+        email_field, password_field, submit = self.find(EMAIL, PASSWORD, SUBMIT)
+        email_field.send_keys(email)
+        password_field.send_keys(password)
+        page = self.navigate(submit, AllPetsPage)
+
+        # Ожидание перехода на страницу пользователя
+        page.my_pets_link(step='вход')
+        return page
+
+
+class UserPage(Page):
+    """Страница авторизованного пользователя с меню."""
+
+    def my_pets_link(self, timeout: float = 10, step: str = 'ссылка "Мои питомцы"'):
+        # Ожидание возвращает найденную ссылку, она сразу сохраняется в кэше страницы
+        if MY_PETS_LINK not in self._elements:
+            link, = wait_all(self.driver, [EC.presence_of_element_located(MY_PETS_LINK)], timeout, step=step)
+            self._elements[MY_PETS_LINK] = [link]
+        return self._elements[MY_PETS_LINK][0]
+
+    def go_to_my_pets(self) -> 'MyPetsPage':
+        return self.navigate(self.my_pets_link(), MyPetsPage)
+
+
+class MyPetsPage(UserPage):
+    path = 'my_pets'
+    ready = (STATISTICS, PETS_TABLE)
+    title = 'страница "Мои питомцы"'
+
+    def rows(self) -> list:
+        return self.find_all(PET_ROWS)[0]
+
+    def snapshot(self) -> PageSnapshot:
+        """Статистика и строки таблицы питомцев, полученные одним запросом к браузеру."""
+
+        if self._snapshot is None:
+            self._snapshot = snapshot_my_pets(self.driver)
+        return self._snapshot
+
+
+class AllPetsPage(UserPage):
+    path = 'all_pets'
+    ready = (CARD_TITLES,)
+    title = 'карточки питомцев'
+
+    def snapshot(self) -> PageSnapshot:
+        """Имена, описания и фото всех карточек, полученные одним запросом к браузеру."""
+
+        if self._snapshot is None:
+            self._snapshot = snapshot_all_pets(self.driver)
+        return self._snapshot
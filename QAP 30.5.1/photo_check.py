@@ -0,0 +1,119 @@
+import base64
+import binascii
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from image_types import HEADER_SIZE, sniff_mime
+
+
+# Сколько первых символов data URI нужно для проверки: тип и первые 24 символа base64 (18 байт)
+DATA_PREFIX = 64
+
+
+class PhotoResult(NamedTuple):
+    """Результат проверки фото: ok - изображение доступно и распознано, mime - его тип, reason - описание
+    ошибки."""
+
+    ok: bool
+    mime: str = ''
+    reason: str = ''
+
+
+class PhotoChecker:
+    """Проверка фото питомцев без браузера с кэшем результатов на всю тестовую сессию.
+
+    Фото по адресу http(s) проверяется запросом HEAD, а если сервер не сообщил тип изображения - запросом GET
+    первых HEADER_SIZE байт (Range) с проверкой сигнатуры формата. Фото в виде data URI декодируется без
+    обращения к сети, сигнатура проверяется по первым байтам. Запросы выполняются параллельно (workers
+    потоков) через общий пул соединений. Результаты кэшируются по адресу, а для data URI - по началу и длине
+    (результат проверки зависит только от начала), поэтому одно и то же фото на разных страницах и в разных тестах
+    проверяется один раз."""
+
+    def __init__(self, session: requests.Session = None, workers: int = 16, timeout: tuple = (3.05, 10)):
+        """session - сессия requests (например, авторизованная HtmlSession.session), её пул соединений и
+        настройки не меняются, и close её не закрывает; по умолчанию создаётся новая сессия с пулом на workers
+        соединений."""
+
+        self.workers = workers
+        self.timeout = timeout
+        self._own_session = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    @staticmethod
+    def _key(url: str):
+        if url.startswith('data:'):
+            return url[:DATA_PREFIX], len(url)
+        return url
+
+    def check(self, url: str) -> PhotoResult:
+        """Проверяет одно фото (адрес или data URI)."""
+
+        key = self._key(url)
+        with self._lock:
+            result = self._cache.get(key)
+        if result is None:
+            result = self._check_data(url) if url.startswith('data:') else self._check_url(url)
+            with self._lock:
+                self._cache[key] = result
+        return result
+
+    def check_all(self, urls) -> dict:
+        """Проверяет все фото из urls параллельно и возвращает словарь адрес -> PhotoResult. Пустые адреса
+        (питомцы без фото) пропускаются, повторяющиеся проверяются один раз."""
+
+        unique = list(dict.fromkeys(url for url in urls if url))
+        with ThreadPoolExecutor(self.workers) as executor:
+            return dict(zip(unique, executor.map(self.check, unique)))
+
+    @staticmethod
+    def _check_data(url: str) -> PhotoResult:
+        header, comma, payload = url[:DATA_PREFIX].partition(',')
+        if not comma or not header.endswith(';base64'):
+            return PhotoResult(False, reason='data URI не в формате base64')
+        declared = header[5:-7]
+        # Для сигнатуры достаточно первых 24 символов base64 (18 байт)
+        try:
+            data = base64.b64decode(payload[:24])
+        except (binascii.Error, ValueError):
+            return PhotoResult(False, reason='некорректный base64')
+        mime = sniff_mime(data)
+        if not mime:
+            return PhotoResult(False, reason=f'содержимое не является изображением ({declared})')
+        if declared and declared != mime:
+            return PhotoResult(False, mime, f'тип {declared} не совпадает с содержимым {mime}')
+        return PhotoResult(True, mime)
+
+    def _check_url(self, url: str) -> PhotoResult:
+        try:
+            res = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            if res.status_code < 400 and res.headers.get('Content-Type', '').startswith('image/'):
+                return PhotoResult(True, res.headers['Content-Type'].split(';')[0])
+            res = self.session.get(url, headers={'Range': f'bytes=0-{HEADER_SIZE - 1}'}, timeout=self.timeout,
+                                   stream=True)
+            try:
+                if res.status_code >= 400:
+                    return PhotoResult(False, reason=f'ответ {res.status_code}')
+                header = res.raw.read(HEADER_SIZE, decode_content=True)
+            finally:
+                res.close()
+        except requests.exceptions.RequestException as error:
+            return PhotoResult(False, reason=f'ошибка запроса: {error.__class__.__name__}')
+        mime = sniff_mime(header)
+        if not mime:
+            return PhotoResult(False, reason='содержимое не является изображением')
+        return PhotoResult(True, mime)
+
+    def close(self):
+        if self._own_session:
+            self.session.close()
@@ -1,2 +1,19 @@
+import os
+
 valid_email = "bjanka@mail.ru"
-valid_password = "11111"
\ No newline at end of file
+valid_password = "11111"
+
+# Адрес сервера PetFriends: можно указать локальный fake_server из QAP 24.7.2 для прогонов без сети
+base_url = os.environ.get('PETFRIENDS_BASE_URL', 'https://petfriends.skillfactory.ru/')
+
+# Запуск Chrome без окна (также включается опцией --headless)
+headless = os.environ.get('PETFRIENDS_HEADLESS', '') not in ('', '0')
+
+# Проверка страниц по HTML без запуска Chrome (также включается опцией --no-browser)
+browserless = os.environ.get('PETFRIENDS_NO_BROWSER', '') not in ('', '0')
+
+# Отдельные учётные записи для параллельных процессов pytest-xdist в формате "email:пароль,email:пароль":
+# процесс с номером N использует запись N по кругу, чтобы процессы не меняли одни и те же "Мои питомцы".
+# Если не заданы - все процессы используют valid_email и valid_password
+worker_accounts = [tuple(account.split(':', 1))
+                   for account in os.environ.get('PETFRIENDS_WORKER_ACCOUNTS', '').split(',') if account]
@@ -0,0 +1,90 @@
+import re
+from typing import NamedTuple
+
+from locators import STATISTICS, PET_ROWS, PET_CARDS
+
+
+class PetRow(NamedTuple):
+    """Питомец, как он показан на странице: имя, порода, возраст и адрес фото (src картинки, пустая строка -
+    фото нет)."""
+
+    name: str
+    animal_type: str
+    age: str
+    photo: str
+
+
+class PageSnapshot(NamedTuple):
+    """Данные страницы со списком питомцев: строки питомцев и текст блока статистики пользователя (для
+    страницы всех питомцев - пустая строка)."""
+
+    rows: list
+    statistics: str
+
+    @property
+    def pets_count(self) -> int:
+        """Количество питомцев из блока статистики ("Питомцев: N") или None, если его нет на странице."""
+
+        match = re.search(r'Питомцев:\s*(\d+)', self.statistics)
+        return int(match.group(1)) if match else None
+
+
+# Скрипты выполняются в браузере за один вызов WebDriver и возвращают все данные страницы разом, вместо
+# отдельного запроса к браузеру за каждым элементом и каждым его атрибутом. Селекторы передаются аргументами
+# из locators.py
+_PHOTO_JS = r'''
+function photo(img) {
+    // Пустой атрибут src браузер может достраивать до адреса страницы, поэтому он проверяется отдельно
+    return img && img.getAttribute('src') ? img.src : '';
+}
+'''
+
+MY_PETS_JS = _PHOTO_JS + r'''
+var statistics = document.querySelector(arguments[0]);
+var rows = [];
+document.querySelectorAll(arguments[1]).forEach(function (tr) {
+    var cells = tr.querySelectorAll('td');
+    rows.push([
+        cells.length > 0 ? cells[0].textContent.trim() : '',
+        cells.length > 1 ? cells[1].textContent.trim() : '',
+        cells.length > 2 ? cells[2].textContent.trim() : '',
+        photo(tr.querySelector('img'))
+    ]);
+});
+return {rows: rows, statistics: statistics ? statistics.innerText : ''};
+'''
+
+ALL_PETS_JS = _PHOTO_JS + r'''
+var rows = [];
+document.querySelectorAll(arguments[0]).forEach(function (card) {
+    var title = card.querySelector('.card-title');
+    var text = card.querySelector('.card-text');
+    // Описание карточки имеет вид "порода, возраст лет"
+    var description = text ? text.textContent.trim() : '';
+    var comma = description.lastIndexOf(',');
+    rows.push([
+        title ? title.textContent.trim() : '',
+        comma === -1 ? description : description.slice(0, comma).trim(),
+        comma === -1 ? '' : description.slice(comma + 1).replace(/\s*лет$/, '').trim(),
+        photo(card.querySelector('.card-img-top'))
+    ]);
+});
+return {rows: rows, statistics: ''};
+'''
+
+
+def _snapshot(driver, script: str, *selectors) -> PageSnapshot:
+    data = driver.execute_script(script, *selectors)
+    return PageSnapshot([PetRow(*row) for row in data['rows']], data['statistics'])
+
+
+def snapshot_my_pets(driver) -> PageSnapshot:
+    """Снимок открытой страницы "Мои питомцы": строки таблицы питомцев и блок статистики."""
+
+    return _snapshot(driver, MY_PETS_JS, STATISTICS, PET_ROWS)
+
+
+def snapshot_all_pets(driver) -> PageSnapshot:
+    """Снимок открытой страницы всех питомцев: карточки питомцев."""
+
+    return _snapshot(driver, ALL_PETS_JS, PET_CARDS)
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+try:
+    from step_profiler import span
+except ImportError:
+    from contextlib import nullcontext
+
+    def span(bucket: str, name: str):
+        return nullcontext()
+
+
+# Ожидание в браузере: одним вызовом WebDriver дожидается готовности документа и появления всех элементов
+# по селекторам, отслеживая изменения DOM через MutationObserver вместо периодических запросов из теста
+WAIT_FOR_SELECTORS_JS = r'''
+var selectors = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+function ready() {
+    return document.readyState !== 'loading' && selectors.every(function (selector) {
+        return document.querySelector(selector) !== null;
+    });
+}
+if (ready()) {
+    return done(true);
+}
+var finished = false;
+function finish(result) {
+    if (!finished) {
+        finished = true;
+        observer.disconnect();
+        document.removeEventListener('readystatechange', check);
+        done(result);
+    }
+}
+function check() {
+    if (ready()) {
+        finish(true);
+    }
+}
+var observer = new MutationObserver(check);
+observer.observe(document, {childList: true, subtree: true, attributes: true});
+document.addEventListener('readystatechange', check);
+setTimeout(function () { finish(false); }, timeout);
+'''
+
+
+class WaitStats:
+    """Потокобезопасный учёт времени, которое тесты провели в ожиданиях: по тесту и шагу - количество
+    ожиданий, суммарное и максимальное время блокировки и количество истёкших ожиданий."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps = defaultdict(lambda: {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+
+    def record(self, step: str, seconds: float, timed_out: bool = False):
+        # pytest указывает выполняемый тест и его этап в PYTEST_CURRENT_TEST: "path::name (setup)"
+        test = os.environ.get('PYTEST_CURRENT_TEST', '-')
+        with self._lock:
+            stats = self.steps[(test, step)]
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            stats['timeouts'] += timed_out
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(stats['total'] for stats in self.steps.values())
+
+    def report(self, limit: int = 10) -> str:
+        """Таблица шагов с наибольшим суммарным временем ожидания."""
+
+        with self._lock:
+            items = sorted(self.steps.items(), key=lambda item: item[1]['total'], reverse=True)[:limit]
+        lines = [f'{"ожидание, с":>12}{"макс, с":>9}{"раз":>5}{"истекло":>9}  тест / шаг']
+        for (test, step), stats in items:
+            lines.append(f'{stats["total"]:>12.3f}{stats["max"]:>9.3f}{stats["count"]:>5}{stats["timeouts"]:>9}'
+                         f'  {test} / {step}')
+        return '\n'.join(lines)
+
+
+# Общий учёт ожиданий тестовой сессии, выводится в конце прогона (см. conftest)
+wait_stats = WaitStats()
+
+
+def wait_all(driver, conditions, timeout: float = 10, step: str = None, poll: float = 0.01,
+             max_poll: float = 0.25, stats: WaitStats = wait_stats) -> list:
+    """Ожидает выполнения всех условий conditions (функций от driver, например из expected_conditions) в одном
+    цикле опроса и возвращает их результаты в том же порядке. Выполненные условия больше не проверяются.
+    Интервал опроса начинается с poll и удваивается после каждой неудачной проверки до max_poll, поэтому
+    быстро выполняющиеся условия почти не задерживают тест, а долгие не нагружают браузер. Время ожидания
+    записывается в stats под именем step. Если за timeout секунд выполнились не все условия - вызывается
+    TimeoutException."""
+
+    start = time.perf_counter()
+    deadline = start + timeout
+    results = [None] * len(conditions)
+    pending = list(range(len(conditions)))
+    interval = poll
+    with span('wait', step or 'wait_all'):
+        while True:
+            for index in list(pending):
+                try:
+                    value = conditions[index](driver)
+                except (NoSuchElementException, StaleElementReferenceException):
+                    value = False
+                if value:
+                    results[index] = value
+                    pending.remove(index)
+            now = time.perf_counter()
+            if not pending or now >= deadline:
+                break
+            time.sleep(min(interval, deadline - now))
+            interval = min(interval * 2, max_poll)
+
+    elapsed = time.perf_counter() - start
+    stats.record(step or 'wait_all', elapsed, bool(pending))
+    if pending:
+        raise TimeoutException(f'За {timeout} с не выполнены условия: '
+                               + ', '.join(_describe(conditions[index]) for index in pending))
+    return results
+
+
+def wait_for_selectors(driver, selectors, timeout: float = 10, step: str = None,
+                       stats: WaitStats = wait_stats):
+    """Ожидает загрузки документа и появления элементов по всем CSS-селекторам selectors одним асинхронным
+    скриптом в браузере (MutationObserver): тест блокируется ровно до момента изменения DOM, без опроса.
+    Время ожидания записывается в stats под именем step. Если за timeout секунд элементы не появились -
+    вызывается TimeoutException. Таймаут асинхронных скриптов браузера после ожидания восстанавливается."""
+
+    previous_timeout = driver.timeouts.script
+    driver.set_script_timeout(timeout + 5)
+    start = time.perf_counter()
+    try:
+        with span('wait', step or 'wait_for_selectors'):
+            found = driver.execute_async_script(WAIT_FOR_SELECTORS_JS, list(selectors), int(timeout * 1000))
+    finally:
+        driver.set_script_timeout(previous_timeout)
+    stats.record(step or 'wait_for_selectors', time.perf_counter() - start, not found)
+    if not found:
+        raise TimeoutException(f'За {timeout} с не появились элементы: {", ".join(selectors)}')
+
+
+def _describe(condition) -> str:
+    # Условия из expected_conditions хранят локатор в замыкании
+    locator = None
+    for cell in getattr(condition, '__closure__', None) or ():
+        if isinstance(cell.cell_contents, tuple):
+            locator = cell.cell_contents
+    name = getattr(condition, '__qualname__', repr(condition)).split('.<locals>')[0]
+    return f'{name}{locator}' if locator else name
@@ -0,0 +1,7 @@
+# Тесты модулей из корня репозитория (задания 18.8.19 и 22.9.1): python -m pytest Tests
+
+import os
+import sys
+
+# Корень репозитория: проверяемые модули sorting, searching, sorted_index, int_stream, tickets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
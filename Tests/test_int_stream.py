@@ -0,0 +1,113 @@
+# Потоковое чтение целых чисел задания 22.9.1: границы блоков, отрицательные числа и точный разбор без numpy
+
+import io
+import random
+
+import pytest
+
+import int_stream
+from int_stream import INT64_MAX, INT64_MIN, iter_blocks, iter_chunks, parse_block, read_array
+
+
+@pytest.fixture(params=['numpy', 'exact'])
+def backend(request, monkeypatch):
+    """Разбор блоков через numpy.fromstring и без numpy."""
+
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(int_stream, 'np', None)
+    return request.param
+
+
+def test_negative_numbers(backend):
+    assert list(parse_block(b'-5 0 17\n-1\t-300\r\n')) == [-5, 0, 17, -1, -300]
+
+
+def test_empty_block(backend):
+    assert list(parse_block(b'')) == []
+    assert list(parse_block(b' \n\t ')) == []
+
+
+def test_int64_bounds(backend):
+    # numpy заменяет числа вне int64 на границу диапазона, поэтому сами границы проверяются точным разбором
+    block = f'{INT64_MIN} 1 {INT64_MAX}'.encode()
+
+    assert list(parse_block(block)) == [INT64_MIN, 1, INT64_MAX]
+
+
+@pytest.mark.parametrize('number', [INT64_MAX + 1, INT64_MIN - 1, 10 ** 30])
+def test_out_of_range(backend, number):
+    with pytest.raises(Exception, match='вне диапазона int64'):
+        parse_block(f'1 {number} 2'.encode())
+
+
+@pytest.mark.parametrize('token', ['abc', '1.5', '12x'])
+def test_not_an_integer(backend, token):
+    # numpy сообщает о нераспознанных данных предупреждением, разбор переходит на точный и называет число
+    with pytest.raises(Exception, match='Не целое число'):
+        parse_block(f'1 2 {token} 3'.encode())
+
+
+@pytest.mark.parametrize('block, fallback', [
+    (b'1 -2 3', False),
+    (b'1 x 3', True),
+    (f'1 {INT64_MAX}'.encode(), True),
+])
+def test_numpy_falls_back_to_exact(monkeypatch, block, fallback):
+    pytest.importorskip('numpy')
+    calls = []
+    exact = int_stream._parse_exact
+
+    def spy(data):
+        calls.append(data)
+        return exact(data)
+
+    monkeypatch.setattr(int_stream, '_parse_exact', spy)
+    try:
+        parse_block(block)
+    except Exception:
+        pass
+
+    assert calls == ([block] if fallback else [])
+
+
+def test_numbers_split_between_blocks():
+    data = b'123 -4567 89\n-10 11111 '
+    blocks = list(iter_blocks(io.BytesIO(data), block_size=4))
+
+    # Каждый блок заканчивается на границе между числами
+    assert b''.join(blocks) == data
+    assert [value for block in blocks for value in block.split()] == data.split()
+
+
+@pytest.mark.parametrize('block_size', [1, 3, 7, 64])
+def test_read_array_small_blocks(backend, block_size):
+    generator = random.Random(block_size)
+    numbers = [generator.randrange(-10 ** 12, 10 ** 12) for _ in range(500)]
+    data = '\n'.join(' '.join(map(str, numbers[start:start + 9])) for start in range(0, len(numbers), 9))
+
+    assert list(read_array(io.BytesIO(data.encode()), block_size)) == numbers
+
+
+def test_read_array_without_trailing_separator(backend):
+    assert list(read_array(io.BytesIO(b'-1 22 -333'), block_size=2)) == [-1, 22, -333]
+
+
+def test_iter_chunks(backend, tmp_path):
+    path = tmp_path / 'numbers.txt'
+    path.write_text(' '.join(map(str, range(-20, 25))))
+
+    chunks = list(iter_chunks(str(path), chunk_size=10, block_size=5))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 10, 10, 5]
+    assert [value for chunk in chunks for value in chunk] == list(range(-20, 25))
+    assert all(chunk.typecode == 'q' for chunk in chunks)
+
+
+def test_text_file_source(backend, tmp_path):
+    path = tmp_path / 'numbers.txt'
+    path.write_text('3 -2 1\n')
+
+    with open(path) as file:
+        assert list(read_array(file)) == [3, -2, 1]
@@ -0,0 +1,121 @@
+# Двоичный поиск задания 22.9.1: границы, дубликаты и значения вне диапазона последовательности
+
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+
+import pytest
+
+import searching
+from searching import LEFT, RIGHT, count_range, lower_bound, position, positions, searchsorted, upper_bound
+
+
+SEQUENCE = [-5, -1, 0, 0, 0, 3, 7, 7, 10]
+
+
+@pytest.mark.parametrize('x, lower, upper', [
+    (-100, 0, 0),  # меньше всех элементов
+    (-5, 0, 1),
+    (-3, 1, 1),
+    (0, 2, 5),  # дубликаты
+    (7, 6, 8),
+    (10, 8, 9),
+    (100, 9, 9),  # больше всех элементов
+])
+def test_bounds(x, lower, upper):
+    assert lower_bound(SEQUENCE, x) == lower
+    assert upper_bound(SEQUENCE, x) == upper
+
+
+def test_bounds_in_range():
+    assert lower_bound(SEQUENCE, 0, 3) == 3
+    assert upper_bound(SEQUENCE, 0, 0, 4) == 4
+
+
+@pytest.mark.parametrize('x, expected', [
+    (-100, -1),  # все элементы больше или равны x
+    (-5, -1),
+    (-4, 0),
+    (0, 1),  # индекс последнего элемента меньше x, а не первого из равных
+    (1, 4),
+    (7, 5),
+    (11, 8),  # все элементы меньше x
+])
+def test_position(x, expected):
+    index = position(SEQUENCE, x)
+
+    assert index == expected
+    # sequence[i] < x <= sequence[i + 1]
+    if index >= 0:
+        assert SEQUENCE[index] < x
+    if index + 1 < len(SEQUENCE):
+        assert x <= SEQUENCE[index + 1]
+
+
+@pytest.mark.parametrize('low, high, expected', [
+    (0, 0, 3),
+    (-5, 10, 9),
+    (-100, 100, 9),
+    (1, 2, 0),
+    (8, 20, 1),
+    (5, -5, 0),  # пустой диапазон
+])
+def test_count_range(low, high, expected):
+    assert count_range(SEQUENCE, low, high) == expected
+
+
+def test_empty_sequence():
+    assert lower_bound([], 1) == upper_bound([], 1) == 0
+    assert position([], 1) == -1
+    assert count_range([], 0, 10) == 0
+
+
+@pytest.fixture(params=['numpy', 'bisect'])
+def backend(request, monkeypatch):
+    """Пакетный поиск с numpy и без него."""
+
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(searching, 'np', None)
+    return request.param
+
+
+@pytest.mark.parametrize('side, search', [(LEFT, bisect_left), (RIGHT, bisect_right)])
+def test_searchsorted_small_batch(backend, side, search):
+    queries = [100, -100, 0, 7, -3, 0]
+
+    assert list(searchsorted(SEQUENCE, queries, side)) == [search(SEQUENCE, x) for x in queries]
+
+
+@pytest.mark.parametrize('side, search', [(LEFT, bisect_left), (RIGHT, bisect_right)])
+def test_searchsorted_large_unsorted_batch(backend, side, search):
+    # С SORT_QUERIES_MIN запросов вразброс numpy сначала сортирует их, а ответы возвращаются в исходном порядке
+    generator = random.Random(22)
+    sequence = array('q', sorted(generator.randrange(-1000, 1000) for _ in range(5000)))
+    queries = [generator.randrange(-1200, 1200) for _ in range(searching.SORT_QUERIES_MIN * 3)]
+
+    assert list(searchsorted(sequence, queries, side)) == [search(sequence, x) for x in queries]
+
+
+def test_searchsorted_sorted_batch(backend):
+    queries = list(range(-10, 12))
+
+    assert list(searchsorted(SEQUENCE, queries)) == [bisect_left(SEQUENCE, x) for x in queries]
+
+
+def test_positions(backend):
+    queries = [-100, -5, -4, 0, 1, 7, 11]
+
+    assert list(positions(SEQUENCE, queries)) == [position(SEQUENCE, x) for x in queries]
+
+
+def test_searchsorted_memoryview(backend):
+    values = memoryview(array('q', SEQUENCE))
+
+    assert list(searchsorted(values, [0, 7], RIGHT)) == [5, 8]
+
+
+def test_searchsorted_invalid_side():
+    with pytest.raises(Exception, match='side'):
+        searchsorted(SEQUENCE, [1], 'middle')
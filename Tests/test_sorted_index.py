@@ -0,0 +1,114 @@
+# Файл отсортированного индекса задания 22.9.1: построение внешней сортировкой, формат и командная строка
+
+import os
+import random
+import struct
+import subprocess
+import sys
+from array import array
+
+import pytest
+
+import sorted_index
+from sorted_index import HEADER, HEADER_SIZE, MAGIC, SortedIndex, build_index, build_index_from_chunks, is_index
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def values():
+    generator = random.Random(23)
+    return [generator.randrange(-10 ** 12, 10 ** 12) for _ in range(3000)] + [0, 0, -7, -7]
+
+
+def test_build_from_chunks(tmp_path, values, monkeypatch):
+    # Маленький блок, чтобы слияние частей записывало индекс несколькими блоками
+    monkeypatch.setattr(sorted_index, 'BLOCK_SIZE', 64)
+    path = str(tmp_path / 'values.idx')
+    chunks = [array('q', values[start:start + 700]) for start in range(0, len(values), 700)]
+
+    assert build_index_from_chunks(iter(chunks), path, str(tmp_path)) == len(values)
+
+    assert is_index(path)
+    assert os.path.getsize(path) == HEADER_SIZE + len(values) * 8
+    with SortedIndex(path) as index:
+        assert len(index) == len(values)
+        assert index.min == min(values) and index.max == max(values)
+        assert list(index.values) == sorted(values)
+        assert index.count_range(-7, 0) == sum(-7 <= value <= 0 for value in values)
+        assert list(index.positions([min(values), 0, max(values) + 1])) == [-1, sorted(values).index(0) - 1,
+                                                                             len(values) - 1]
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_header_format(tmp_path):
+    path = str(tmp_path / 'small.idx')
+
+    build_index([5, -3, 9, -3], path, chunk_size=2)
+
+    with open(path, 'rb') as file:
+        data = file.read()
+    assert HEADER.unpack_from(data) == (MAGIC, 4, -3, 9)
+    assert struct.unpack('<4q', data[HEADER_SIZE:]) == (-3, -3, 5, 9)
+
+
+def test_single_chunk_and_empty(tmp_path):
+    path = str(tmp_path / 'one.idx')
+    assert build_index([3, 1, 2], path) == 3
+    with SortedIndex(path) as index:
+        assert list(index.values) == [1, 2, 3]
+
+    empty = str(tmp_path / 'empty.idx')
+    assert build_index([], empty) == 0
+    with SortedIndex(empty) as index:
+        assert len(index) == 0
+
+
+def test_failed_build_leaves_no_files(tmp_path):
+    path = str(tmp_path / 'broken.idx')
+
+    def chunks():
+        yield array('q', [1, 2])
+        yield array('q', [3])
+        raise OSError('чтение прервано')
+
+    with pytest.raises(OSError):
+        build_index_from_chunks(chunks(), path, str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_merge_removes_tmp(tmp_path, monkeypatch):
+    path = str(tmp_path / 'broken.idx')
+
+    def broken_merge(*streams):
+        yield 1
+        raise OSError('диск заполнен')
+
+    monkeypatch.setattr(sorted_index.heapq, 'merge', broken_merge)
+    with pytest.raises(OSError):
+        build_index([3, 1, 2, 4], path, chunk_size=2, tmp_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_not_an_index(tmp_path):
+    path = tmp_path / 'numbers.txt'
+    path.write_bytes(b'1 2 3' * 10)
+
+    assert not is_index(str(path))
+    with pytest.raises(Exception, match='не является файлом индекса'):
+        SortedIndex(str(path))
+
+
+def test_cli(tmp_path):
+    source = tmp_path / 'numbers.txt'
+    source.write_text('10 -4 7\n7 0\n')
+    index = str(tmp_path / 'numbers.idx')
+
+    def run(*args):
+        return subprocess.run([sys.executable, os.path.join(ROOT, 'sorted_index.py'), *args], check=True,
+                              capture_output=True, text=True).stdout.split('\n')
+
+    assert run('build', str(source), index, '--chunk-size', '2')[0].endswith(': 5')
+    assert run('query', index, '7', '-10')[:2] == ['7: 1', '-10: -1']
+    assert run('count', index, '0', '7')[0] == '3'
@@ -0,0 +1,98 @@
+# Сортировка задания 22.9.1: каждая стратегия и автоматический выбор дают тот же результат, что и sorted()
+
+import random
+from array import array
+
+import pytest
+
+import sorting
+from sorting import AUTO, NUMPY, RADIX, SELECTION, TIMSORT, choose_strategy, sort
+
+
+STRATEGIES = [TIMSORT, RADIX, SELECTION, AUTO,
+              pytest.param(NUMPY, marks=pytest.mark.skipif(sorting.np is None, reason='numpy не установлен'))]
+
+generator = random.Random(2209)
+
+CASES = {
+    'random': [generator.randrange(10 ** 9) for _ in range(500)],
+    'negative': [generator.randrange(-10 ** 6, 10 ** 6) for _ in range(500)],
+    'duplicates': [generator.randrange(10) for _ in range(500)],
+    'narrow range': [generator.randrange(-50, 50) for _ in range(2000)],
+    'wide range': [generator.randrange(-2 ** 40, 2 ** 40) for _ in range(300)],
+    'short': [5, -3, 5, 0, -3],
+    'sorted': list(range(-100, 100)),
+    'reversed': list(range(100, -100, -1)),
+    'empty': [],
+    'single': [42],
+}
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+@pytest.mark.parametrize('case', CASES)
+def test_strategy_matches_sorted(strategy, case):
+    values = CASES[case]
+    original = list(values)
+
+    result = sort(values, strategy)
+
+    assert list(result) == sorted(original)
+    # Входные данные не изменяются
+    assert values == original
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_array_keeps_type(strategy):
+    values = array('q', CASES['negative'])
+
+    result = sort(values, strategy)
+
+    assert isinstance(result, array) and result.typecode == 'q'
+    assert list(result) == sorted(values)
+
+
+def test_numpy_array_keeps_type():
+    np = pytest.importorskip('numpy')
+    values = np.array(CASES['negative'], dtype=np.int64)
+
+    result = sort(values)
+
+    assert isinstance(result, np.ndarray) and result.dtype == np.int64
+    assert result.tolist() == sorted(CASES['negative'])
+
+
+def test_radix_sort_narrow_bits():
+    values = CASES['wide range']
+
+    # Узкие разряды - много проходов LSD-сортировки
+    assert sorting.radix_sort(values, 4) == sorted(values)
+
+
+def test_choose_strategy(monkeypatch):
+    assert choose_strategy([3, 1, 2]) == TIMSORT
+    assert choose_strategy(['b', 'a'] * 100) == TIMSORT
+    assert choose_strategy([1.5, 0.5] * 100) == TIMSORT
+
+    monkeypatch.setattr(sorting, 'np', None)
+    # Диапазон не больше длины - сортировка подсчётом
+    assert choose_strategy(CASES['narrow range']) == RADIX
+    assert choose_strategy(CASES['random']) == TIMSORT
+
+
+def test_choose_numpy_for_large_integers():
+    pytest.importorskip('numpy')
+
+    assert choose_strategy(CASES['narrow range']) == NUMPY
+    # Значения вне int64 numpy не сортирует без потери точности
+    assert choose_strategy([2 ** 70 + i for i in range(2000)]) != NUMPY
+
+
+def test_auto_sorts_non_integers():
+    values = [generator.random() for _ in range(200)]
+
+    assert sort(values) == sorted(values)
+
+
+def test_unknown_strategy():
+    with pytest.raises(Exception, match='Неизвестная стратегия'):
+        sort([2, 1], 'bogo')
@@ -0,0 +1,180 @@
+# Пакетный расчёт стоимости билетов задания 18.8.19: векторный расчёт сверяется с построчным расчётом на Python
+
+import io
+import json
+import random
+
+import pytest
+
+import tickets
+from tickets import CSV, JSONL, OUTPUT_HEADER, Tariff, price_orders, price_stream, read_orders
+
+
+CUSTOM_TARIFF = Tariff(((3, 100), (12, 250.5), (65, 150)), 0.25, 2)
+
+
+def reference(orders, tariff: Tariff = tickets.DEFAULT_TARIFF) -> list:
+    """Стоимость и скидка каждого заказа, посчитанные по одному билету."""
+
+    result = []
+    for ages in orders:
+        amount = 0
+        for age in ages:
+            price = tariff.bands[0][1]
+            for band_age, band_price in tariff.bands:
+                if age >= band_age:
+                    price = band_price
+            amount += price
+        result.append((amount, amount * tariff.discount if len(ages) >= tariff.discount_from else 0))
+    return result
+
+
+def flatten(orders) -> tuple:
+    return [age for ages in orders for age in ages], [len(ages) for ages in orders]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    """Расчёт через numpy (bincount по заказам) и без него."""
+
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(tickets, 'np', None)
+    return request.param
+
+
+def random_orders(seed: int, count: int = 300) -> list:
+    generator = random.Random(seed)
+    return [[generator.randint(0, 90) for _ in range(generator.randint(0, 9))] for _ in range(count)]
+
+
+@pytest.mark.parametrize('tariff', [tickets.DEFAULT_TARIFF, CUSTOM_TARIFF], ids=['default', 'custom'])
+def test_price_orders_matches_reference(backend, tariff):
+    orders = random_orders(18)
+
+    amounts, discounts = price_orders(*flatten(orders), tariff)
+
+    assert list(zip(amounts, discounts)) == pytest.approx(reference(orders, tariff))
+
+
+@pytest.mark.parametrize('age, price', [(0, 0), (17, 0), (18, 990), (25, 990), (26, 1390), (120, 1390)])
+def test_default_bands(backend, age, price):
+    amounts, discounts = price_orders([age], [1])
+
+    assert list(amounts) == [price]
+    assert list(discounts) == [0]
+
+
+def test_age_below_first_band(backend):
+    # Посетители младше первой группы платят по её цене
+    amounts, _ = price_orders([1, 3], [2], CUSTOM_TARIFF)
+
+    assert list(amounts) == [200]
+
+
+def test_discount_threshold(backend):
+    orders = [[30] * 3, [30] * 4, [10] * 5, []]
+
+    amounts, discounts = price_orders(*flatten(orders))
+
+    assert list(amounts) == [4170, 5560, 0, 0]
+    assert list(discounts) == pytest.approx([0, 556, 0, 0])
+
+
+def read_all(data: bytes, fmt: str = CSV, batch_size: int = 4) -> tuple:
+    ids, orders = [], []
+    for batch in read_orders(io.BytesIO(data), fmt, batch_size):
+        ages = list(batch.ages)
+        start = 0
+        for order_id, length in zip(batch.ids, batch.lengths):
+            ids.append(order_id)
+            orders.append(ages[start:start + int(length)])
+            start += int(length)
+    return ids, orders
+
+
+def test_read_csv(backend):
+    ids, orders = read_all(b'20,30\n5\n-1,40,41\n18\n77\n')
+
+    assert ids == [1, 2, 3, 4, 5]
+    assert orders == [[20, 30], [5], [-1, 40, 41], [18], [77]]
+
+
+def test_read_csv_header_and_blank_lines(backend):
+    ids, orders = read_all(b'age1, age2\n20,30\n\n5\n   \n40\n')
+
+    # Пустые строки пропускаются, номер заказа - номер строки без заголовка
+    assert ids == [1, 3, 5]
+    assert orders == [[20, 30], [5], [40]]
+
+
+@pytest.mark.parametrize('data', [b'20,abc\n', b'1\n2,,3\n'])
+def test_read_csv_malformed(backend, data):
+    with pytest.raises(Exception, match='возрасты должны быть целыми числами'):
+        read_all(data)
+
+
+@pytest.mark.parametrize('line, expected', [
+    (b'age,name\n', True),
+    (b' id , ages \n', True),
+    (b'20,30\n', False),
+    (b'20,abc\n', False),  # ошибочный заказ, а не заголовок
+    (b'\n', False),
+    (b' , \n', False),
+])
+def test_is_header(line, expected):
+    assert tickets._is_header(line) is expected
+
+
+def test_read_jsonl():
+    data = b'[20, 30]\n\n{"id": "A-1", "ages": [5]}\n{"ages": []}\n[40]\n'
+
+    ids, orders = read_all(data, JSONL, batch_size=2)
+
+    assert ids == [1, 'A-1', 4, 5]
+    assert orders == [[20, 30], [5], [], [40]]
+
+
+@pytest.mark.parametrize('line, message', [(b'[20, "x"]\n', 'списком целых чисел'), (b'{20}\n', 'не является JSON')])
+def test_read_jsonl_malformed(line, message):
+    with pytest.raises(Exception, match=message):
+        read_all(b'[1]\n' + line, JSONL)
+
+
+@pytest.mark.parametrize('fmt', [CSV, JSONL])
+def test_price_stream(backend, fmt):
+    orders = [ages for ages in random_orders(19, 50) if ages]
+    lines = [json.dumps(ages) if fmt == JSONL else ','.join(map(str, ages)) for ages in orders]
+    data = ('\n'.join(lines) + '\n').encode()
+    output = io.StringIO()
+
+    summary = price_stream(io.BytesIO(data), output, fmt, CUSTOM_TARIFF, batch_size=16)
+
+    expected = reference(orders, CUSTOM_TARIFF)
+    amount = sum(amount for amount, _ in expected)
+    discount = sum(discount for _, discount in expected)
+    assert summary['orders'] == len(orders)
+    assert summary['tickets'] == sum(map(len, orders))
+    assert summary['amount'] == pytest.approx(amount)
+    assert summary['discount'] == pytest.approx(discount)
+    assert summary['total'] == pytest.approx(amount - discount)
+
+    rows = output.getvalue().splitlines()
+    assert rows[0] + '\n' == OUTPUT_HEADER
+    assert len(rows) == len(orders) + 1
+    number, count, row_amount, row_discount, total = rows[1].split(',')
+    assert (int(number), int(count)) == (1, len(orders[0]))
+    assert float(total) == pytest.approx(float(row_amount) - float(row_discount))
+    assert float(row_amount) == pytest.approx(expected[0][0], abs=0.005)
+
+
+def test_tariff_load(tmp_path):
+    path = tmp_path / 'tariff.json'
+    path.write_text(json.dumps({'bands': [[3, 100], [12, 250.5], [65, 150]], 'discount': 0.25, 'discount_from': 2}))
+
+    assert Tariff.load(str(path)) == CUSTOM_TARIFF
+
+    path.write_text(json.dumps({'bands': [[18, 990], [0, 0]]}))
+    with pytest.raises(Exception, match='по возрастанию'):
+        Tariff.load(str(path))
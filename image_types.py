@@ -0,0 +1,29 @@
+"""Определение формата изображения по сигнатуре (magic bytes) для наборов QAP 24.7.2 и QAP 30.5.1.
+
+Используется при загрузке фото питомцев через API (QAP 24.7.2/photo.py) и при проверке фото на страницах
+(QAP 30.5.1/photo_check.py), поэтому оба набора одинаково распознают форматы.
+"""
+
+
+# Сигнатуры (magic bytes) форматов изображений
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+)
+
+# Сколько первых байт изображения нужно для определения формата
+HEADER_SIZE = 16
+
+
+def sniff_mime(header: bytes) -> str:
+    """Определяет MIME-тип изображения по первым байтам или возвращает пустую строку."""
+
+    for signature, mime in SIGNATURES:
+        if header.startswith(signature):
+            return mime
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    return ''
@@ -0,0 +1,129 @@
+"""Потоковое чтение целых чисел, разделённых пробельными символами, из файла или стандартного ввода.
+
+Данные читаются блоками по block_size байт (граница блока переносится на ближайший пробельный символ, чтобы не
+разрезать число) и разбираются сразу в компактные массивы array('q') (int64, 8 байт на число) без
+промежуточных списков объектов int. Если установлен numpy, блок разбирается numpy.fromstring, иначе - int по
+каждому числу. Массивы можно передавать в sorting.sort, функции searching и sorted_index.build_index_from_chunks.
+"""
+
+import sys
+import warnings
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Размер блока чтения, байт, и количество чисел в части, которую возвращает iter_chunks
+BLOCK_SIZE = 1 << 20
+CHUNK_SIZE = 1 << 20
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def iter_blocks(file, block_size: int = BLOCK_SIZE):
+    """Блоки байт из двоичного файла file, каждый заканчивается на границе между числами."""
+
+    tail = b''
+    while True:
+        data = file.read(block_size)
+        if not data:
+            break
+        data = tail + data
+        # Последнее число блока может продолжаться в следующем блоке
+        cut = max(data.rfind(separator) for separator in (b' ', b'\n', b'\t', b'\r'))
+        if cut < 0:
+            tail = data
+            continue
+        tail = data[cut + 1:]
+        yield data[:cut + 1]
+    if tail:
+        yield tail
+
+
+def _parse_exact(block: bytes) -> array:
+    try:
+        return array('q', map(int, block.split()))
+    except (ValueError, OverflowError):
+        pass
+    # Поиск числа, которое не удалось разобрать, для сообщения об ошибке
+    for token in block.split():
+        try:
+            value = int(token)
+        except ValueError:
+            raise Exception(f'Не целое число: {token.decode("utf-8", "replace")!r}')
+        if not INT64_MIN <= value <= INT64_MAX:
+            raise Exception(f'Число вне диапазона int64: {value}')
+    raise Exception('Не удалось разобрать блок чисел')
+
+
+def parse_block(block: bytes) -> array:
+    """Разбирает блок байт с целыми числами через пробельные символы в array('q')."""
+
+    if np is None:
+        return _parse_exact(block)
+    if not block.strip():
+        return array('q')
+    try:
+        with warnings.catch_warnings():
+            # Нераспознанные данные numpy сообщает предупреждением, а не исключением
+            warnings.simplefilter('error', DeprecationWarning)
+            values = np.fromstring(block, dtype=np.int64, sep=' ')
+    except (ValueError, DeprecationWarning):
+        return _parse_exact(block)
+    # Числа вне диапазона int64 numpy заменяет на границу диапазона без ошибки
+    if len(values) and (values.min() == INT64_MIN or values.max() == INT64_MAX):
+        return _parse_exact(block)
+    return array('q', values.tobytes())
+
+
+class _Source:
+    """Двоичный файл для source: путь к файлу, '-' - стандартный ввод, или уже открытый файл."""
+
+    def __init__(self, source):
+        self.close_file = False
+        if source == '-':
+            self.file = sys.stdin.buffer
+        elif isinstance(source, str):
+            self.file = open(source, 'rb')
+            self.close_file = True
+        else:
+            # Текстовые файлы читаются через их двоичный буфер
+            self.file = getattr(source, 'buffer', source)
+
+    def __enter__(self):
+        return self.file
+
+    def __exit__(self, *exc_info):
+        if self.close_file:
+            self.file.close()
+
+
+def iter_chunks(source, chunk_size: int = CHUNK_SIZE, block_size: int = BLOCK_SIZE):
+    """Числа из source частями array('q') по chunk_size (последняя часть может быть короче)."""
+
+    chunk = array('q')
+    with _Source(source) as file:
+        for block in iter_blocks(file, block_size):
+            chunk.extend(parse_block(block))
+            start = 0
+            while len(chunk) - start >= chunk_size:
+                yield chunk[start:start + chunk_size]
+                start += chunk_size
+            if start:
+                chunk = chunk[start:]
+    if chunk:
+        yield chunk
+
+
+def read_array(source, block_size: int = BLOCK_SIZE) -> array:
+    """Все числа из source одним массивом array('q')."""
+
+    values = array('q')
+    with _Source(source) as file:
+        for block in iter_blocks(file, block_size):
+            values.extend(parse_block(block))
+    return values
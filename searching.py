@@ -0,0 +1,84 @@
+"""Двоичный поиск в отсортированной по возрастанию последовательности для задания 22.9.1.
+
+lower_bound(sequence, x) - первый индекс i, для которого sequence[i] >= x, upper_bound - первый индекс, для
+которого sequence[i] > x (len(sequence), если такого нет). position(sequence, x) - индекс i элемента, который
+меньше x, при том что следующий за ним больше или равен x (sequence[i] < x <= sequence[i + 1]), или -1, если
+все элементы больше или равны x.
+
+Поиск итеративный (модуль bisect) и работает с любой последовательностью с индексами: списком, array.array,
+memoryview, numpy.ndarray. Пакетные варианты (searchsorted, positions) отвечают на все запросы сразу: если
+установлен numpy - одним векторизованным вызовом numpy.searchsorted, иначе циклом по bisect. Для миллионов
+запросов к одной последовательности её стоит один раз преобразовать в массив (as_array), иначе список
+копируется в массив при каждом пакетном вызове.
+"""
+
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+LEFT = 'left'
+RIGHT = 'right'
+
+# С этого количества запросов пакетный поиск сначала сортирует запросы
+SORT_QUERIES_MIN = 1000
+
+
+def lower_bound(sequence, x, lo: int = 0, hi: int = None) -> int:
+    return bisect_left(sequence, x, lo, len(sequence) if hi is None else hi)
+
+
+def upper_bound(sequence, x, lo: int = 0, hi: int = None) -> int:
+    return bisect_right(sequence, x, lo, len(sequence) if hi is None else hi)
+
+
+def position(sequence, x) -> int:
+    return bisect_left(sequence, x) - 1
+
+
+def count_range(sequence, low, high) -> int:
+    """Количество элементов sequence в диапазоне [low, high]."""
+
+    return max(bisect_right(sequence, high) - bisect_left(sequence, low), 0)
+
+
+def as_array(sequence):
+    """Отсортированная последовательность в виде массива numpy (array.array и memoryview - без копирования).
+    Без numpy возвращает sequence как есть."""
+
+    if np is None or isinstance(sequence, np.ndarray):
+        return sequence
+    return np.asarray(sequence)
+
+
+def searchsorted(sequence, queries, side: str = LEFT):
+    """Индексы вставки для всех значений queries с семантикой numpy.searchsorted: side='left' -
+    lower_bound, side='right' - upper_bound. С numpy возвращает numpy.ndarray, без него - список."""
+
+    if side not in (LEFT, RIGHT):
+        raise Exception(f'side должен быть {LEFT!r} или {RIGHT!r}, а не {side!r}')
+    if np is not None:
+        sequence = as_array(sequence)
+        queries = np.asarray(queries)
+        if len(queries) < SORT_QUERIES_MIN or np.all(queries[1:] >= queries[:-1]):
+            return np.searchsorted(sequence, queries, side)
+        # Запросы по возрастанию обращаются к соседним участкам последовательности и ищутся в несколько раз
+        # быстрее, чем вразброс, даже с учётом сортировки самих запросов
+        order = np.argsort(queries, kind='stable')
+        found = np.empty(len(queries), dtype=np.intp)
+        found[order] = np.searchsorted(sequence, queries[order], side)
+        return found
+    search = bisect_left if side == LEFT else bisect_right
+    return [search(sequence, x) for x in queries]
+
+
+def positions(sequence, queries):
+    """position для всех значений queries."""
+
+    found = searchsorted(sequence, queries, LEFT)
+    if np is not None:
+        return found - 1
+    return [index - 1 for index in found]
@@ -0,0 +1,232 @@
+"""Файл отсортированного индекса целых чисел для повторных запросов задания 22.9.1.
+
+Формат: заголовок HEADER_SIZE байт (сигнатура MAGIC, количество значений, наименьшее и наибольшее значение) и
+следом отсортированные по возрастанию значения int64 (little-endian) подряд. Индекс строится один раз
+(build_index), а открывается через mmap (SortedIndex): открытие не читает значения и занимает одинаковое время
+при любом размере файла, запросы выполняются двоичным поиском прямо по отображению файла в память, в память
+подгружаются только нужные страницы.
+
+Последовательности, которые не помещаются в память, сортируются внешней сортировкой: значения читаются частями
+по chunk_size, каждая часть сортируется и записывается во временный файл, затем части сливаются в индекс.
+Текстовые файлы с числами читаются потоково (int_stream), поэтому размер исходного файла не ограничен.
+
+Пример:
+    python sorted_index.py build numbers.txt numbers.idx
+    python sorted_index.py query numbers.idx 10 500
+"""
+
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import islice
+
+import searching
+from int_stream import iter_chunks
+from sorting import sort
+
+
+MAGIC = b'QAPIDX1\0'
+# Сигнатура, количество значений, наименьшее и наибольшее значение
+HEADER = struct.Struct('<8sQqq')
+HEADER_SIZE = HEADER.size
+
+# Размер части внешней сортировки и блока чтения и записи, значений
+CHUNK_SIZE = 1 << 22
+BLOCK_SIZE = 1 << 16
+
+
+def is_index(path: str) -> bool:
+    """Начинается ли файл path с сигнатуры файла индекса."""
+
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def _check_platform():
+    # Значения записываются и читаются в порядке байт платформы, формат файла - little-endian
+    if sys.byteorder != 'little':
+        raise Exception('Файл индекса поддерживается только на платформах с порядком байт little-endian')
+
+
+def _read_blocks(file, count: int):
+    """Значения одной отсортированной части из file блоками по BLOCK_SIZE."""
+
+    while count:
+        block = array('q')
+        block.fromfile(file, min(BLOCK_SIZE, count))
+        count -= len(block)
+        yield from block
+
+
+def build_index(values, path: str, chunk_size: int = CHUNK_SIZE, tmp_dir: str = None) -> int:
+    """Строит файл индекса path из значений values (итерируемый набор целых чисел) и возвращает количество
+    значений. В памяти одновременно находится не больше chunk_size значений."""
+
+    values = iter(values)
+    chunks = iter(lambda: array('q', islice(values, chunk_size)), array('q'))
+    return build_index_from_chunks(chunks, path, tmp_dir)
+
+
+def build_index_from_chunks(chunks, path: str, tmp_dir: str = None) -> int:
+    """Строит файл индекса path из частей chunks (например, массивов array('q') из int_stream.iter_chunks), каждая
+    часть сортируется в памяти отдельно. Возвращает количество значений."""
+
+    _check_platform()
+    count = 0
+    low = high = 0
+    tmp_path = path + '.tmp'
+    try:
+        with tempfile.TemporaryDirectory(dir=tmp_dir) as directory:
+            # Отсортированные части во временном файле: список (смещение в значениях, количество)
+            runs = []
+            runs_path = os.path.join(directory, 'runs.bin')
+            with open(runs_path, 'wb') as runs_file:
+                for run in chunks:
+                    if not len(run):
+                        continue
+                    run = sort(run)
+                    low = run[0] if not count else min(low, run[0])
+                    high = run[-1] if not count else max(high, run[-1])
+                    run.tofile(runs_file)
+                    runs.append((count, len(run)))
+                    count += len(run)
+
+            with open(tmp_path, 'wb') as output:
+                output.write(HEADER.pack(MAGIC, count, low, high))
+                if len(runs) == 1:
+                    with open(runs_path, 'rb') as runs_file:
+                        while True:
+                            data = runs_file.read(BLOCK_SIZE * 8)
+                            if not data:
+                                break
+                            output.write(data)
+                elif runs:
+                    # Слияние частей: у каждой части открыт свой файл, значения читаются блоками
+                    files = [open(runs_path, 'rb') for _ in runs]
+                    try:
+                        streams = []
+                        for file, (offset, length) in zip(files, runs):
+                            file.seek(offset * 8)
+                            streams.append(_read_blocks(file, length))
+                        block = array('q')
+                        for value in heapq.merge(*streams):
+                            block.append(value)
+                            if len(block) >= BLOCK_SIZE:
+                                block.tofile(output)
+                                block = array('q')
+                        block.tofile(output)
+                    finally:
+                        for file in files:
+                            file.close()
+        # Индекс заменяется целиком, чтобы при ошибке построения не остался недописанный файл
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Недописанный индекс не оставляется рядом с файлом path
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+class SortedIndex:
+    """Открытый только для чтения файл индекса. Значения доступны как последовательность (values - memoryview
+    int64 поверх отображения файла в память), запросы отвечаются двоичным поиском по отображению."""
+
+    def __init__(self, path: str):
+        _check_platform()
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise Exception(f'{path} не является файлом индекса: файл пуст')
+        magic, self.count, self.min, self.max = (b'', 0, 0, 0)
+        if len(self._mmap) >= HEADER_SIZE:
+            magic, self.count, self.min, self.max = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or len(self._mmap) != HEADER_SIZE + self.count * 8:
+            self.close()
+            raise Exception(f'{path} не является файлом индекса или повреждён')
+        self.values = memoryview(self._mmap)[HEADER_SIZE:].cast('q')
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def lower_bound(self, x) -> int:
+        return searching.lower_bound(self.values, x)
+
+    def upper_bound(self, x) -> int:
+        return searching.upper_bound(self.values, x)
+
+    def position(self, x) -> int:
+        return searching.position(self.values, x)
+
+    def count_range(self, low, high) -> int:
+        """Количество значений в диапазоне [low, high]."""
+
+        return searching.count_range(self.values, low, high)
+
+    def searchsorted(self, queries, side: str = searching.LEFT):
+        return searching.searchsorted(self.values, queries, side)
+
+    def positions(self, queries):
+        return searching.positions(self.values, queries)
+
+    def close(self):
+        values = getattr(self, 'values', None)
+        self.values = None
+        try:
+            if values is not None:
+                values.release()
+            self._mmap.close()
+        except BufferError:
+            # Отображение ещё используется (например, массивом numpy поверх values) и закроется вместе с ним
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Файл отсортированного индекса целых чисел')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='построить индекс из текстового файла с числами')
+    build.add_argument('source', help="текстовый файл с целыми числами через пробел ('-' - стандартный ввод)")
+    build.add_argument('index', help='файл индекса')
+    build.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='размер части внешней сортировки')
+    build.add_argument('--tmp-dir', default=None, help='каталог для временных файлов')
+    query = commands.add_parser('query', help='позиции чисел в индексе')
+    query.add_argument('index', help='файл индекса')
+    query.add_argument('numbers', type=int, nargs='+')
+    count_range = commands.add_parser('count', help='количество значений в диапазоне [low, high]')
+    count_range.add_argument('index', help='файл индекса')
+    count_range.add_argument('low', type=int)
+    count_range.add_argument('high', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        count = build_index_from_chunks(iter_chunks(args.source, args.chunk_size), args.index, args.tmp_dir)
+        print(f'Значений в индексе: {count}')
+    elif args.command == 'query':
+        with SortedIndex(args.index) as index:
+            for number, position in zip(args.numbers, index.positions(args.numbers)):
+                print(f'{number}: {position}')
+    else:
+        with SortedIndex(args.index) as index:
+            print(index.count_range(args.low, args.high))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""Сортировка последовательностей для задания 22.9.1 с выбором алгоритма по размеру и диапазону значений.
+
+Стратегии: timsort - встроенная сортировка Python (любые сравнимые значения), radix - LSD-сортировка целых
+чисел по разрядам (при диапазоне значений не больше длины последовательности - один проход подсчётом),
+numpy - сортировка массива NumPy (если numpy установлен), selection - сортировка выбором O(n²), оставлена
+только для сравнения в бенчмарке. sort выбирает стратегию автоматически (choose_strategy).
+
+Результат имеет тот же вид, что и входные данные: список для списка и любой другой последовательности,
+array.array с тем же типом элементов для array.array, numpy.ndarray для numpy.ndarray.
+
+Бенчмарк стратегий на случайных целых числах от 10 до 10^7 элементов:
+    python sorting.py --max-size 10000000 --span 1000
+"""
+
+import argparse
+import random
+import time
+from array import array
+from itertools import chain, repeat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+AUTO = 'auto'
+TIMSORT = 'timsort'
+RADIX = 'radix'
+NUMPY = 'numpy'
+SELECTION = 'selection'
+
+# Последовательности короче SMALL_SIZE всегда сортируются timsort: на них он быстрее любой подготовки данных
+SMALL_SIZE = 64
+# С этой длины сортировка NumPy быстрее timsort с учётом преобразования списка в массив и обратно
+NUMPY_MIN_SIZE = 1000
+# Ширина разряда LSD-сортировки, бит
+RADIX_BITS = 16
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def integer_range(values) -> tuple:
+    """Наименьшее и наибольшее значение, если все элементы values - целые числа, иначе None."""
+
+    if np is not None and isinstance(values, np.ndarray):
+        if values.dtype.kind not in 'iu' or not len(values):
+            return None
+        return int(values.min()), int(values.max())
+    if isinstance(values, array):
+        if values.typecode not in 'bBhHiIlLqQ' or not values:
+            return None
+    elif not values or not all(type(value) is int for value in values):
+        return None
+    return min(values), max(values)
+
+
+def choose_strategy(values) -> str:
+    """Выбирает стратегию сортировки values:
+    короткие последовательности и последовательности не из целых чисел - timsort (numpy.ndarray - numpy);
+    целые числа, начиная с NUMPY_MIN_SIZE элементов, если numpy установлен и значения помещаются в int64, -
+    numpy;
+    остальные целые числа - radix, если диапазон значений не больше длины последовательности (сортировка
+    подсчётом за один проход), иначе timsort."""
+
+    if np is not None and isinstance(values, np.ndarray):
+        return NUMPY
+    if len(values) < SMALL_SIZE:
+        return TIMSORT
+    bounds = integer_range(values)
+    if bounds is None:
+        return TIMSORT
+    low, high = bounds
+    if np is not None and len(values) >= NUMPY_MIN_SIZE and INT64_MIN <= low and high <= INT64_MAX:
+        return NUMPY
+    if high - low <= len(values):
+        return RADIX
+    return TIMSORT
+
+
+def sort(values, strategy: str = AUTO):
+    """Возвращает отсортированную по возрастанию копию values. strategy - одна из STRATEGIES или AUTO."""
+
+    if strategy == AUTO:
+        strategy = choose_strategy(values)
+    if strategy not in STRATEGIES:
+        raise Exception(f'Неизвестная стратегия сортировки {strategy!r}, доступны: {", ".join(STRATEGIES)}')
+    return STRATEGIES[strategy](values)
+
+
+def _like(values, items):
+    # Результат в том же виде, что и входные данные
+    if isinstance(values, array):
+        return array(values.typecode, items)
+    if np is not None and isinstance(values, np.ndarray):
+        return np.array(items, dtype=values.dtype)
+    return items
+
+
+def _items(values) -> list:
+    if np is not None and isinstance(values, np.ndarray):
+        return values.tolist()
+    return list(values)
+
+
+def timsort(values):
+    items = _items(values)
+    items.sort()
+    return _like(values, items)
+
+
+def radix_sort(values, bits: int = RADIX_BITS):
+    """LSD-сортировка целых чисел: значения сдвигаются к нулю и раскладываются по корзинам разряд за разрядом
+    (не больше bits бит) от младшего к старшему. Если диапазон значений не больше длины последовательности,
+    сортировка сводится к подсчёту количества каждого значения за один проход."""
+
+    items = _items(values)
+    if not items:
+        return _like(values, items)
+    low, high = min(items), max(items)
+    span = high - low
+
+    if span <= len(items):
+        counts = [0] * (span + 1)
+        for value in items:
+            counts[value - low] += 1
+        items = []
+        for offset, count in enumerate(counts):
+            if count:
+                items.extend(repeat(low + offset, count))
+        return _like(values, items)
+
+    # Корзин в разряде не больше, чем элементов: на коротких последовательностях разряды уже
+    bits = max(4, min(bits, len(items).bit_length()))
+    mask = (1 << bits) - 1
+    items = [value - low for value in items]
+    shift = 0
+    while span >> shift:
+        buckets = [[] for _ in range(mask + 1)]
+        append = [bucket.append for bucket in buckets]
+        for value in items:
+            append[(value >> shift) & mask](value)
+        items = list(chain.from_iterable(buckets))
+        shift += bits
+    return _like(values, [value + low for value in items])
+
+
+def numpy_sort(values):
+    if np is None:
+        raise Exception('Для сортировки numpy нужен установленный пакет numpy')
+    if isinstance(values, np.ndarray):
+        return np.sort(values)
+    if isinstance(values, array):
+        # array.array передаётся в NumPy без копирования через протокол буфера
+        return array(values.typecode, np.sort(np.frombuffer(values, dtype=values.typecode)).tobytes())
+    bounds = integer_range(values)
+    dtype = np.int64 if bounds is not None and INT64_MIN <= bounds[0] and bounds[1] <= INT64_MAX else None
+    return np.sort(np.array(values, dtype=dtype)).tolist()
+
+
+def selection_sort(values):
+    """Сортировка выбором O(n²) из первой версии задания 22.9.1."""
+
+    items = _items(values)
+    for i in range(len(items)):
+        idx_min = i
+        for j in range(i, len(items)):
+            if items[j] < items[idx_min]:
+                idx_min = j
+        if i != idx_min:
+            items[i], items[idx_min] = items[idx_min], items[i]
+    return _like(values, items)
+
+
+STRATEGIES = {TIMSORT: timsort, RADIX: radix_sort, NUMPY: numpy_sort, SELECTION: selection_sort}
+
+# Наибольший размер, на котором стратегия запускается в бенчмарке
+BENCHMARK_LIMITS = {SELECTION: 10 ** 4}
+BENCHMARK_SIZES = tuple(10 ** power for power in range(1, 8))
+
+
+def benchmark(sizes=BENCHMARK_SIZES, strategies=(AUTO, TIMSORT, RADIX, NUMPY, SELECTION), span: int = None,
+              repeats: int = 3, seed: int = None) -> list:
+    """Время сортировки случайных целых чисел из [0, span) (по умолчанию span = 2^32) для каждого размера из
+    sizes и каждой стратегии: лучшее из repeats запусков. Возвращает строки {'size', 'strategy', 'seconds'};
+    для AUTO дополнительно указывается выбранная стратегия ('chosen')."""
+
+    generator = random.Random(seed)
+    rows = []
+    for size in sizes:
+        values = [generator.randrange(span or 2 ** 32) for _ in range(size)]
+        expected = sorted(values)
+        for strategy in strategies:
+            if strategy == NUMPY and np is None or size > BENCHMARK_LIMITS.get(strategy, size):
+                continue
+            best = None
+            for _ in range(max(1, repeats if size < 10 ** 6 else 1)):
+                start = time.perf_counter()
+                result = sort(values, strategy)
+                seconds = time.perf_counter() - start
+                best = seconds if best is None else min(best, seconds)
+            if list(result) != expected:
+                raise Exception(f'Стратегия {strategy} отсортировала {size} элементов неверно')
+            row = {'size': size, 'strategy': strategy, 'seconds': best}
+            if strategy == AUTO:
+                row['chosen'] = choose_strategy(values)
+            rows.append(row)
+    return rows
+
+
+def print_benchmark(rows: list):
+    print(f'{"size":>10}  {"strategy":<18}{"seconds":>10}{"elements/s":>14}')
+    for row in rows:
+        strategy = f'{row["strategy"]} ({row["chosen"]})' if 'chosen' in row else row['strategy']
+        rate = row['size'] / row['seconds'] if row['seconds'] else float('inf')
+        print(f'{row["size"]:>10}  {strategy:<18}{row["seconds"]:>10.4f}{rate:>14.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк стратегий сортировки')
+    parser.add_argument('--max-size', type=int, default=10 ** 6, help='наибольший размер последовательности')
+    parser.add_argument('--span', type=int, default=None, help='диапазон значений [0, span), по умолчанию 2^32')
+    parser.add_argument('--strategies', default=','.join((AUTO,) + tuple(STRATEGIES)),
+                        help='стратегии через запятую')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    sizes = [size for size in BENCHMARK_SIZES if size <= args.max_size]
+    print_benchmark(benchmark(sizes, args.strategies.split(','), args.span, args.repeats, args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""Пошаговый профилировщик тестов pytest для наборов QAP 24.7.2 и QAP 30.5.1.
+
+Время каждого теста раскладывается по корзинам: fixture - подготовка фикстур (запуск браузера, вход, получение
+API ключа), http - запросы requests, webdriver - команды WebDriver, wait - явные ожидания, test - собственный код
+теста (проверки и логика вне перечисленных вызовов), teardown - завершение теста. Для каждого шага учитывается
+собственное время без вложенных шагов, поэтому сумма по корзинам равна длительности теста.
+
+Подключается из conftest.py набора: add_options(parser) в pytest_addoption и configure(config) в
+pytest_configure. Функции, которые нельзя подменить через instrument, отмечают свои шаги блоком span.
+Включается опцией --profile-steps; --profile-trace PATH сохраняет трассу в формате свёрнутых стеков (.folded,
+для flamegraph.pl и speedscope) или Chrome Trace (.json, для chrome://tracing и Perfetto). При запуске через
+pytest-xdist процессы-исполнители передают собранные шаги управляющему процессу (workeroutput), который выводит
+общую сводку и записывает одну трассу.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import pytest
+
+
+# Сегменты адресов с ID питомцев заменяются на <id>, чтобы запросы к одному методу API попадали в один шаг
+ID_SEGMENT = re.compile(r'/[0-9a-fA-F-]{16,}')
+
+
+def add_options(parser):
+    group = parser.getgroup('step-profiler', 'пошаговый профилировщик тестов')
+    group.addoption('--profile-steps', action='store_true', help='разложить время тестов по шагам')
+    group.addoption('--profile-trace', metavar='PATH',
+                    help='сохранить трассу шагов: .folded - свёрнутые стеки, .json - Chrome Trace')
+    group.addoption('--profile-top', type=int, default=15, metavar='N', help='количество самых долгих шагов')
+
+
+def configure(config) -> 'StepProfiler':
+    """Регистрирует профилировщик, если передана --profile-steps или --profile-trace, и возвращает его."""
+
+    if not (config.getoption('--profile-steps') or config.getoption('--profile-trace')):
+        return None
+    global active
+    profiler = StepProfiler(config.getoption('--profile-trace'), config.getoption('--profile-top'))
+    profiler.instrument_defaults()
+    config.pluginmanager.register(profiler, 'step_profiler')
+    active = profiler
+    return profiler
+
+
+# Профилировщик текущей сессии pytest (None, если профилирование выключено)
+active = None
+
+
+@contextmanager
+def span(bucket: str, name: str):
+    """Отмечает блок кода как шаг корзины bucket. Если профилирование выключено, ничего не делает."""
+
+    profiler = active
+    if profiler is None:
+        yield
+        return
+    profiler.enter(bucket, name)
+    try:
+        yield
+    finally:
+        profiler.exit()
+
+
+class StepProfiler:
+    """Плагин pytest, собирающий время шагов тестов. Вызовы функций отмечаются как шаги через instrument."""
+
+    def __init__(self, trace_path: str = None, top: int = 15):
+        self.trace_path = trace_path
+        self.top = top
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._patched = []
+        self.test = '-'
+        # Выполняемый этап теста: 'setup', 'call', 'teardown' или None между тестами
+        self.phase = None
+        self.start = time.perf_counter()
+        # (корзина, шаг) -> [количество, собственное время, максимум]
+        self.steps = defaultdict(lambda: [0, 0.0, 0.0])
+        self.buckets = defaultdict(float)
+        # свёрнутый стек -> собственное время, с
+        self.folded = defaultdict(float)
+        # события Chrome Trace
+        self.events = []
+
+    # Шаги
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self, bucket: str, name: str):
+        self._stack().append([bucket, name, time.perf_counter(), 0.0])
+
+    def exit(self):
+        stack = self._stack()
+        bucket, name, start, children = stack.pop()
+        end = time.perf_counter()
+        total = end - start
+        own = max(total - children, 0.0)
+        if stack:
+            stack[-1][3] += total
+        path = ';'.join([self.test] + [f'{frame[0]}:{frame[1]}' for frame in stack] + [f'{bucket}:{name}'])
+        with self._lock:
+            step = self.steps[(bucket, name)]
+            step[0] += 1
+            step[1] += own
+            step[2] = max(step[2], own)
+            self.buckets[bucket] += own
+            self.folded[path] += own
+            if self.trace_path and self.trace_path.endswith('.json'):
+                self.events.append({'name': f'{bucket}:{name}', 'cat': bucket, 'ph': 'X', 'pid': os.getpid(),
+                                    'tid': threading.get_ident(), 'ts': (start - self.start) * 1e6,
+                                    'dur': total * 1e6, 'args': {'test': self.test}})
+
+    def instrument(self, owner, attribute: str, bucket, label=None):
+        """Заменяет функцию owner.attribute обёрткой, которая отмечает каждый её вызов как шаг корзины bucket.
+        bucket - имя корзины или функция без аргументов, возвращающая его в момент вызова (например, по этапу
+        теста phase). label(args, kwargs) возвращает имя шага; по умолчанию - имя функции."""
+
+        original = getattr(owner, attribute)
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            profiler.enter(bucket() if callable(bucket) else bucket,
+                           label(args, kwargs) if label is not None else attribute)
+            try:
+                return original(*args, **kwargs)
+            finally:
+                profiler.exit()
+
+        wrapper.__wrapped__ = original
+        setattr(owner, attribute, wrapper)
+        self._patched.append((owner, attribute, original))
+
+    def instrument_defaults(self):
+        """Отмечает запросы requests, команды WebDriver и ожидания WebDriverWait (если selenium установлен)."""
+
+        import requests
+
+        self.instrument(requests.Session, 'send', 'http', _http_label)
+        try:
+            from selenium.webdriver.remote.webdriver import WebDriver
+            from selenium.webdriver.support.wait import WebDriverWait
+        except ImportError:
+            return
+        self.instrument(WebDriver, 'execute', 'webdriver', lambda args, kwargs: str(args[1]))
+        self.instrument(WebDriverWait, 'until', 'wait', _wait_label)
+
+    # Хуки pytest
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        self.test = item.nodeid
+        self.phase = 'setup'
+        self.enter('fixture', 'setup')
+        yield
+        self.exit()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        self.phase = 'call'
+        self.enter('test', item.name)
+        yield
+        self.exit()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item):
+        self.phase = 'teardown'
+        self.enter('teardown', item.name)
+        yield
+        self.exit()
+        self.test = '-'
+        self.phase = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef):
+        self.enter('fixture', fixturedef.argname)
+        yield
+        self.exit()
+
+    def pytest_sessionfinish(self, session):
+        # Процесс-исполнитель pytest-xdist не выводит сводку: шаги передаются управляющему процессу
+        workeroutput = getattr(session.config, 'workeroutput', None)
+        if workeroutput is not None:
+            workeroutput['step_profiler'] = self.dump()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        data = getattr(node, 'workeroutput', {}).get('step_profiler')
+        if data is not None:
+            self.merge(data)
+
+    def dump(self) -> dict:
+        """Собранные шаги в виде, который можно передать между процессами."""
+
+        with self._lock:
+            return {'steps': [[bucket, name, *step] for (bucket, name), step in self.steps.items()],
+                    'buckets': dict(self.buckets), 'folded': dict(self.folded), 'events': list(self.events)}
+
+    def merge(self, data: dict):
+        """Добавляет шаги, собранные другим процессом (dump)."""
+
+        with self._lock:
+            for bucket, name, count, own, longest in data['steps']:
+                step = self.steps[(bucket, name)]
+                step[0] += count
+                step[1] += own
+                step[2] = max(step[2], longest)
+            for bucket, seconds in data['buckets'].items():
+                self.buckets[bucket] += seconds
+            for stack, seconds in data['folded'].items():
+                self.folded[stack] += seconds
+            self.events.extend(data['events'])
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if hasattr(terminalreporter.config, 'workerinput'):
+            return
+        total = sum(self.buckets.values())
+        terminalreporter.write_sep('-', f'шаги тестов: всего {total:.3f} с')
+        for bucket, seconds in sorted(self.buckets.items(), key=lambda item: item[1], reverse=True):
+            share = seconds / total if total else 0
+            terminalreporter.write_line(f'{bucket:<12}{seconds:>10.3f} с{share:>8.1%}')
+        terminalreporter.write_line('')
+        terminalreporter.write_line(f'{"всего, с":>10}{"макс, с":>10}{"раз":>7}  шаг')
+        steps = sorted(self.steps.items(), key=lambda item: item[1][1], reverse=True)[:self.top]
+        for (bucket, name), (count, seconds, longest) in steps:
+            terminalreporter.write_line(f'{seconds:>10.3f}{longest:>10.3f}{count:>7}  {bucket}:{name}')
+        if self.trace_path:
+            self.write_trace(self.trace_path)
+            terminalreporter.write_line(f'трасса шагов: {self.trace_path}')
+
+    def pytest_unconfigure(self, config):
+        global active
+        if active is self:
+            active = None
+        for owner, attribute, original in reversed(self._patched):
+            setattr(owner, attribute, original)
+        self._patched = []
+
+    def write_trace(self, path: str):
+        with open(path, 'w', encoding='utf-8') as file:
+            if path.endswith('.json'):
+                json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, file, ensure_ascii=False)
+            else:
+                # Формат свёрнутых стеков: "кадр;кадр;кадр значение", значение - собственное время в микросекундах
+                for stack, seconds in sorted(self.folded.items()):
+                    file.write(f'{stack.replace(" ", "_")} {round(seconds * 1e6)}\n')
+
+
+def _http_label(args, kwargs) -> str:
+    request = args[1]
+    return f'{request.method} {ID_SEGMENT.sub("/<id>", urlsplit(request.url).path)}'
+
+
+def _wait_label(args, kwargs) -> str:
+    method = args[1] if len(args) > 1 else kwargs.get('method')
+    return getattr(method, '__qualname__', type(method).__name__).split('.<locals>')[0]
@@ -0,0 +1,329 @@
+"""Пакетный расчёт стоимости заказов билетов по правилам задания 18.8.19.
+
+Заказ - список возрастов посетителей. Цена билета определяется ценовой группой по возрасту (по умолчанию младше
+18 лет - бесплатно, от 18 до 25 лет - 990 руб., старше 25 лет - 1390 руб.), на заказ не меньше чем из
+discount_from билетов (по умолчанию больше трёх) даётся скидка discount (10%). Тариф можно загрузить из JSON:
+    {"bands": [[0, 0], [18, 990], [26, 1390]], "discount": 0.1, "discount_from": 4}
+
+Заказы читаются пакетами из CSV (строка - заказ, возрасты через запятую) или JSON Lines (строка - список
+возрастов или объект {"id": ..., "ages": [...]}), каждый пакет рассчитывается векторно (если установлен numpy),
+стоимость заказов сразу записывается в выходной CSV: order,tickets,amount,discount,total.
+
+Пример:
+    python tickets.py orders.csv --tariff tariff.json --output totals.csv
+    python tickets.py --benchmark 1000000
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+import warnings
+from array import array
+from bisect import bisect_right
+from itertools import islice
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+CSV = 'csv'
+JSONL = 'jsonl'
+
+# Количество заказов в пакете
+BATCH_SIZE = 1 << 16
+
+OUTPUT_HEADER = 'order,tickets,amount,discount,total\n'
+OUTPUT_ROW = '%s,%d,%.2f,%.2f,%.2f\n'
+
+
+class Tariff(NamedTuple):
+    """Тариф: bands - ценовые группы (наименьший возраст группы, цена билета) по возрастанию возраста, посетители
+    младше первой группы платят по её цене; discount - доля скидки на заказ не меньше чем из discount_from
+    билетов."""
+
+    bands: tuple = ((0, 0), (18, 990), (26, 1390))
+    discount: float = 0.10
+    discount_from: int = 4
+
+    @classmethod
+    def load(cls, path: str) -> 'Tariff':
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+        tariff = cls(tuple((int(age), float(price)) for age, price in data['bands']),
+                     float(data.get('discount', cls._field_defaults['discount'])),
+                     int(data.get('discount_from', cls._field_defaults['discount_from'])))
+        ages = [age for age, _ in tariff.bands]
+        if not ages or ages != sorted(set(ages)):
+            raise Exception(f'Ценовые группы тарифа {path} должны быть заданы по возрастанию возраста без повторов')
+        if not 0 <= tariff.discount <= 1:
+            raise Exception(f'Скидка тарифа {path} должна быть от 0 до 1, а не {tariff.discount}')
+        return tariff
+
+    def price(self, age: int) -> float:
+        index = bisect_right([band[0] for band in self.bands], age) - 1
+        return self.bands[max(index, 0)][1]
+
+    def order(self, ages) -> tuple:
+        """Стоимость заказа без скидки и размер скидки."""
+
+        amount = sum(self.price(age) for age in ages)
+        discount = amount * self.discount if len(ages) >= self.discount_from else 0
+        return amount, discount
+
+
+DEFAULT_TARIFF = Tariff()
+
+
+class OrderBatch(NamedTuple):
+    """Пакет заказов: номера заказов, возрасты всех посетителей подряд и количество билетов в каждом заказе."""
+
+    ids: list
+    ages: object
+    lengths: object
+
+
+def price_orders(ages, lengths, tariff: Tariff = DEFAULT_TARIFF) -> tuple:
+    """Стоимость без скидки и скидка для каждого заказа пакета: ages - возрасты всех посетителей подряд, lengths -
+    количество билетов в каждом заказе. С numpy расчёт векторный и возвращает массивы numpy, без него - списки."""
+
+    if np is None:
+        amounts, discounts = [], []
+        start = 0
+        for length in lengths:
+            amount, discount = tariff.order(ages[start:start + length])
+            amounts.append(amount)
+            discounts.append(discount)
+            start += length
+        return amounts, discounts
+
+    ages = np.asarray(ages, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    limits = np.array([band[0] for band in tariff.bands], dtype=np.int64)
+    prices = np.array([band[1] for band in tariff.bands], dtype=np.float64)
+    # Ценовая группа каждого билета и сумма цен билетов по заказам
+    groups = np.maximum(np.searchsorted(limits, ages, 'right') - 1, 0)
+    orders = np.repeat(np.arange(len(lengths)), lengths)
+    amounts = np.bincount(orders, weights=prices[groups], minlength=len(lengths))
+    discounts = np.where(lengths >= tariff.discount_from, amounts * tariff.discount, 0.0)
+    return amounts, discounts
+
+
+def _parse_csv_exact(lines: list, first: int) -> tuple:
+    ids, lengths = [], []
+    ages = array('q')
+    for number, line in enumerate(lines, first):
+        # Пустые строки пропускаются, как и в JSON Lines
+        if not line.strip():
+            continue
+        fields = line.split(b',')
+        try:
+            ages.extend(int(field) for field in fields)
+        except ValueError:
+            raise Exception(f'Заказ {number}: возрасты должны быть целыми числами через запятую: '
+                            f'{line.decode("utf-8", "replace").strip()!r}')
+        ids.append(number)
+        lengths.append(len(fields))
+    return ids, ages, lengths
+
+
+def _parse_csv(lines: list, first: int) -> tuple:
+    if np is None:
+        return _parse_csv_exact(lines, first)
+    block = b''.join(lines)
+    if not block.endswith(b'\n'):
+        block += b'\n'
+    # Количество возрастов в строке - количество запятых плюс один, считается по всему пакету сразу
+    buffer = np.frombuffer(block, dtype=np.uint8)
+    commas = np.cumsum(buffer == ord(','))[buffer == ord('\n')]
+    lengths = np.diff(commas, prepend=0) + 1
+    try:
+        with warnings.catch_warnings():
+            # Нераспознанные данные numpy сообщает предупреждением, а не исключением
+            warnings.simplefilter('error', DeprecationWarning)
+            ages = np.fromstring(block.replace(b'\n', b','), dtype=np.int64, sep=',')
+    except (ValueError, DeprecationWarning):
+        ages = None
+    # Пустые строки, лишние пробелы и другие отклонения от формата разбираются построчно
+    if ages is None or len(ages) != lengths.sum():
+        return _parse_csv_exact(lines, first)
+    return range(first, first + len(lines)), ages, lengths
+
+
+def _parse_jsonl(lines: list, first: int) -> tuple:
+    ids, lengths = [], []
+    ages = array('q')
+    for number, line in enumerate(lines, first):
+        if not line.strip():
+            continue
+        try:
+            order = orjson.loads(line) if orjson is not None else json.loads(line)
+        except ValueError:
+            raise Exception(f'Заказ {number}: строка не является JSON')
+        if isinstance(order, dict):
+            ids.append(order.get('id', number))
+            order = order.get('ages', [])
+        else:
+            ids.append(number)
+        if not isinstance(order, list) or not all(type(age) is int for age in order):
+            raise Exception(f'Заказ {number}: возрасты должны быть списком целых чисел')
+        ages.extend(order)
+        lengths.append(len(order))
+    return ids, ages, lengths
+
+
+def _is_header(line: bytes) -> bool:
+    # Заголовок CSV - непустая первая строка, ни одно поле которой не является целым числом. Строка, в которой
+    # есть и числа, и нечисловые поля, - ошибочный заказ, а не заголовок: она разбирается и вызывает исключение
+    fields = [field.strip() for field in line.split(b',')]
+    if not any(fields):
+        return False
+    for field in fields:
+        try:
+            int(field)
+            return False
+        except ValueError:
+            pass
+    return True
+
+
+def read_orders(file, fmt: str = CSV, batch_size: int = BATCH_SIZE):
+    """Пакеты заказов OrderBatch по batch_size из двоичного файла file в формате fmt (CSV или JSONL). Первая
+    строка CSV пропускается, если ни одно её поле не является целым числом (заголовок), пустые строки в обоих
+    форматах пропускаются. Номер заказа - номер его строки в файле (без заголовка CSV) или поле id объекта JSON."""
+
+    first = 1
+    lines = list(islice(file, batch_size))
+    if fmt == CSV and lines and _is_header(lines[0]):
+        lines = lines[1:] + list(islice(file, 1))
+    while lines:
+        if fmt == CSV:
+            ids, ages, lengths = _parse_csv(lines, first)
+        else:
+            ids, ages, lengths = _parse_jsonl(lines, first)
+        yield OrderBatch(ids, ages, lengths)
+        first += len(lines)
+        lines = list(islice(file, batch_size))
+
+
+def _sum(values):
+    return values.sum() if np is not None and isinstance(values, np.ndarray) else sum(values)
+
+
+def write_totals(output, batch: OrderBatch, amounts, discounts):
+    lengths = batch.lengths.tolist() if np is not None and isinstance(batch.lengths, np.ndarray) else batch.lengths
+    if np is not None:
+        totals = (amounts - discounts).tolist()
+        amounts, discounts = amounts.tolist(), discounts.tolist()
+    else:
+        totals = [amount - discount for amount, discount in zip(amounts, discounts)]
+    # Форматирование строк - самая долгая часть расчёта, оператор % с map заметно быстрее f-строк в генераторе
+    output.write(''.join(map(OUTPUT_ROW.__mod__, zip(batch.ids, lengths, amounts, discounts, totals))))
+
+
+def price_stream(file, output, fmt: str = CSV, tariff: Tariff = DEFAULT_TARIFF,
+                 batch_size: int = BATCH_SIZE) -> dict:
+    """Рассчитывает все заказы из двоичного файла file пакетами и записывает стоимость каждого заказа в текстовый
+    файл output сразу после расчёта пакета. Возвращает итоги: количество заказов и билетов, суммы и время."""
+
+    start = time.perf_counter()
+    summary = {'orders': 0, 'tickets': 0, 'amount': 0.0, 'discount': 0.0, 'total': 0.0}
+    if output is not None:
+        output.write(OUTPUT_HEADER)
+    for batch in read_orders(file, fmt, batch_size):
+        amounts, discounts = price_orders(batch.ages, batch.lengths, tariff)
+        if output is not None:
+            write_totals(output, batch, amounts, discounts)
+        summary['orders'] += len(batch.lengths)
+        summary['tickets'] += int(_sum(batch.lengths))
+        summary['amount'] += float(_sum(amounts))
+        summary['discount'] += float(_sum(discounts))
+    summary['total'] = summary['amount'] - summary['discount']
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def generate_orders(count: int, fmt: str = CSV, max_tickets: int = 8, seed: int = None) -> bytes:
+    """Случайные заказы для бенчмарка: от 1 до max_tickets посетителей от 1 до 80 лет."""
+
+    generator = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        ages = [generator.randint(1, 80) for _ in range(generator.randint(1, max_tickets))]
+        lines.append(json.dumps(ages) if fmt == JSONL else ','.join(map(str, ages)))
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def benchmark(count: int = 10 ** 6, fmt: str = CSV, batch_size: int = BATCH_SIZE, seed: int = None) -> dict:
+    """Заказов в секунду: полный расчёт (чтение, расчёт и запись стоимости в память), только расчёт пакетов и
+    расчёт по одному заказу циклом Python, как в первой версии задания."""
+
+    data = generate_orders(count, fmt, seed=seed)
+    result = {}
+
+    summary = price_stream(io.BytesIO(data), io.StringIO(), fmt, batch_size=batch_size)
+    result['stream'] = count / summary['seconds']
+
+    batches = list(read_orders(io.BytesIO(data), fmt, batch_size))
+    start = time.perf_counter()
+    for batch in batches:
+        price_orders(batch.ages, batch.lengths)
+    result['price_orders'] = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for batch in batches:
+        ages = list(batch.ages)
+        offset = 0
+        for length in batch.lengths:
+            DEFAULT_TARIFF.order(ages[offset:offset + length])
+            offset += length
+    result['python_loop'] = count / (time.perf_counter() - start)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Пакетный расчёт стоимости заказов билетов')
+    parser.add_argument('source', nargs='?', default='-', help="файл заказов ('-' - стандартный ввод)")
+    parser.add_argument('--format', choices=(CSV, JSONL), default=None,
+                        help='формат заказов, по умолчанию по расширению файла (.jsonl, .ndjson - JSON Lines)')
+    parser.add_argument('--tariff', default=None, help='тариф в JSON, по умолчанию тариф задания 18.8.19')
+    parser.add_argument('--output', default='-', help="файл для стоимости заказов ('-' - стандартный вывод)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='заказов в пакете')
+    parser.add_argument('--benchmark', type=int, metavar='ORDERS', default=None,
+                        help='измерить скорость расчёта на ORDERS случайных заказах')
+    args = parser.parse_args()
+    fmt = args.format or (JSONL if args.source.endswith(('.jsonl', '.ndjson')) else CSV)
+
+    if args.benchmark:
+        for name, rate in benchmark(args.benchmark, fmt, args.batch_size).items():
+            print(f'{name:<14}{rate:>14.0f} заказов/с')
+        return
+
+    tariff = Tariff.load(args.tariff) if args.tariff else DEFAULT_TARIFF
+    source = sys.stdin.buffer if args.source == '-' else open(args.source, 'rb')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        summary = price_stream(source, output, fmt, tariff, args.batch_size)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    # Итоги выводятся в stderr, чтобы не смешиваться со стоимостью заказов в стандартном выводе
+    print(f'Заказов: {summary["orders"]}, билетов: {summary["tickets"]}, сумма: {summary["amount"]:.2f} руб., '
+          f'скидки: {summary["discount"]:.2f} руб., к оплате: {summary["total"]:.2f} руб., '
+          f'{summary["orders"] / summary["seconds"] if summary["seconds"] else 0:.0f} заказов/с', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()